@@ -24,10 +24,115 @@ def get_required_env_var(var_name):
 # Set the GVM socket path, defaulting to the expected path if not set
 GVM_SOCKET_PATH = os.getenv("GVM_SOCKET_PATH", "/tmp/gvmd/gvmd/gvmd.sock")
 
-# Credentials 
+# Credentials
 USER = os.getenv("USER", "admin")
 PASSWORD = os.getenv("PASSWORD", "admin")
 
+##################################################################
+# GMP connection settings                                        #
+##################################################################
+
+# Backend used for GMP commands: "socket" (pooled python-gvm sessions) or "cli" (one gvm-cli process per call)
+GMP_BACKEND = os.getenv("GMP_BACKEND", "socket")
+
+# Maximum number of authenticated sessions kept open against gvmd
+GMP_POOL_SIZE = int(os.getenv("GMP_POOL_SIZE", "4"))
+
+# Maximum number of sessions used by the asyncio client serving the API routes
+GMP_ASYNC_POOL_SIZE = int(os.getenv("GMP_ASYNC_POOL_SIZE", "8"))
+
+# Seconds to wait for a free session before giving up
+GMP_POOL_TIMEOUT = float(os.getenv("GMP_POOL_TIMEOUT", "30"))
+
+# Socket read timeout in seconds for a single GMP response
+GMP_SOCKET_TIMEOUT = float(os.getenv("GMP_SOCKET_TIMEOUT", "300"))
+
+# Sessions older than this are closed and re-authenticated (seconds)
+GMP_SESSION_MAX_AGE = float(os.getenv("GMP_SESSION_MAX_AGE", "3600"))
+
+# Sessions idle for longer than this are health-checked before reuse (seconds)
+GMP_SESSION_IDLE_CHECK = float(os.getenv("GMP_SESSION_IDLE_CHECK", "60"))
+
+##################################################################
+# Report inventory                                               #
+##################################################################
+
+# Seconds a metadata-only report listing is reused before it is fetched again
+INVENTORY_TTL_SECONDS = float(os.getenv("INVENTORY_TTL_SECONDS", "300"))
+
+# Seconds an expired listing is still served to the API while it is refreshed in the background
+INVENTORY_STALE_SECONDS = float(os.getenv("INVENTORY_STALE_SECONDS", "600"))
+
+# Seconds between scheduled refreshes of the listing; keep it below INVENTORY_TTL_SECONDS
+INVENTORY_REFRESH_SECONDS = float(os.getenv("INVENTORY_REFRESH_SECONDS", "240"))
+
+# Page size of the listing endpoints when a client filters or pages without giving a limit
+REPORT_LIST_DEFAULT_LIMIT = int(os.getenv("REPORT_LIST_DEFAULT_LIMIT", "100"))
+
+# Largest page of reports the listing endpoints return; gvmd's "Rows Per Page" limit should allow it
+REPORT_LIST_MAX_LIMIT = int(os.getenv("REPORT_LIST_MAX_LIMIT", "1000"))
+
+# Bytes of NDJSON or JSON collected before a chunk of a streamed response is sent
+STREAM_CHUNK_BYTES = int(os.getenv("STREAM_CHUNK_BYTES", str(64 * 1024)))
+
+##################################################################
+# Detailed report retrieval                                      #
+##################################################################
+
+# Number of results requested per page of a detailed report
+GMP_REPORT_PAGE_SIZE = int(os.getenv("GMP_REPORT_PAGE_SIZE", "1000"))
+
+# Number of pages fetched at once, each over its own GMP session
+GMP_REPORT_PAGE_CONCURRENCY = int(os.getenv("GMP_REPORT_PAGE_CONCURRENCY", "2"))
+
+# "stitched" writes one file per report, "pages" writes one file per page
+GMP_REPORT_PAGE_OUTPUT = os.getenv("GMP_REPORT_PAGE_OUTPUT", "stitched")
+
+# Reports fetched at once; each may use up to GMP_REPORT_PAGE_CONCURRENCY sessions,
+# so keep GMP_POOL_SIZE >= GMP_FETCH_WORKERS * GMP_REPORT_PAGE_CONCURRENCY
+GMP_FETCH_WORKERS = int(os.getenv("GMP_FETCH_WORKERS", "2"))
+
+# Seconds after which fetching one report is given up (checked between pages)
+GMP_FETCH_TIMEOUT = float(os.getenv("GMP_FETCH_TIMEOUT", "1800"))
+
+# Page requests per second sent to gvmd by the fetch stage, 0 disables the limit
+GMP_FETCH_RATE = float(os.getenv("GMP_FETCH_RATE", "5"))
+
+# Page requests that may be sent at once before the rate limit kicks in
+GMP_FETCH_BURST = int(os.getenv("GMP_FETCH_BURST", "5"))
+
+##################################################################
+# Targets, port lists and scan configs                           #
+##################################################################
+
+# Seconds the target, port list and scan config listings are cached
+RESOURCE_CACHE_TTL_SECONDS = float(os.getenv("RESOURCE_CACHE_TTL_SECONDS", "600"))
+
+# Scans reuse an existing target with the same hosts and port list instead of creating one each time
+REUSE_TARGETS = os.getenv("REUSE_TARGETS", "true").lower() == "true"
+
+# Port list of new targets when a scan request names none ("All IANA assigned TCP")
+DEFAULT_PORT_LIST_ID = os.getenv("DEFAULT_PORT_LIST_ID", "33d0cd82-57c6-11e1-8ed1-406186ea4fc5")
+
+# Scan config used when a scan request names none ("Full and fast")
+DEFAULT_SCAN_CONFIG_ID = os.getenv("DEFAULT_SCAN_CONFIG_ID", "daba56c8-73ec-11df-a475-002264764cea")
+
+##################################################################
+# Batch scan submission                                          #
+##################################################################
+
+# Largest number of scans accepted by one POST /scans/batch
+SCAN_BATCH_MAX_ITEMS = int(os.getenv("SCAN_BATCH_MAX_ITEMS", "500"))
+
+# Scans of a batch whose target and task are created at once; capped by GMP_ASYNC_POOL_SIZE
+SCAN_BATCH_CONCURRENCY = int(os.getenv("SCAN_BATCH_CONCURRENCY", "4"))
+
+# Default seconds between two scan starts of a batch, 0 starts them all right away
+SCAN_BATCH_STAGGER_SECONDS = float(os.getenv("SCAN_BATCH_STAGGER_SECONDS", "0"))
+
+# Finished batches kept in memory for GET /scans/batch/{batch_id}
+SCAN_BATCH_HISTORY = int(os.getenv("SCAN_BATCH_HISTORY", "50"))
+
 ##################################################################
 # Setting directories for workers and parser                     #
 ##################################################################
@@ -39,6 +144,95 @@ DETAILED_REPORTS_DIR = os.getenv("DETAILED_REPORTS_DIR", "/app/detailed_reports"
 ARCHIVE_DIR = os.getenv("ARCHIVE_DIR", "/app/detailed_reports/archive")
 PARSED_DIR = os.path.join(DETAILED_REPORTS_DIR, "parsed")
 
+##################################################################
+# XML parsing                                                    #
+##################################################################
+
+# Processes parsing XML reports in parallel; defaults to the CPU cores available
+# to this process, 1 parses in the worker thread without a process pool
+PARSE_WORKERS = int(os.getenv(
+    "PARSE_WORKERS",
+    str(len(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else (os.cpu_count() or 1))
+))
+
+# Batches of XML files smaller than this in total (bytes) are parsed in the worker
+# thread: starting the pool's processes would cost more than the parse itself
+PARSE_POOL_MIN_BYTES = int(os.getenv("PARSE_POOL_MIN_BYTES", str(8 * 1024 * 1024)))
+
+# Parsed output: "ndjson" (one vulnerability per line) or "json" (pretty, for debugging)
+PARSED_FORMAT = os.getenv("PARSED_FORMAT", "ndjson")
+
+# Compression of NDJSON output: "none", "gzip" or "zstd" (needs the zstandard package)
+PARSED_COMPRESSION = os.getenv("PARSED_COMPRESSION", "none")
+
+##################################################################
+# XML archive                                                    #
+##################################################################
+
+# Compression of archived XML reports: "gzip" or "zstd" (needs the zstandard package)
+ARCHIVE_COMPRESSION = os.getenv("ARCHIVE_COMPRESSION", "gzip")
+
+# Archived reports older than this many days are removed, 0 keeps them forever
+ARCHIVE_RETENTION_DAYS = float(os.getenv("ARCHIVE_RETENTION_DAYS", "0"))
+
+# Newest reports kept in the archive per task, 0 keeps all
+ARCHIVE_KEEP_PER_TASK = int(os.getenv("ARCHIVE_KEEP_PER_TASK", "0"))
+
+# Upper bound for the compressed archive size in bytes, oldest reports go first; 0 disables
+ARCHIVE_MAX_BYTES = int(os.getenv("ARCHIVE_MAX_BYTES", "0"))
+
+##################################################################
+# Incremental report sync                                        #
+##################################################################
+
+# Legacy JSON sync state, only read once when migrating into the state store
+SYNC_STATE_FILE = os.getenv("SYNC_STATE_FILE", os.path.join(REPORTS_DIR, "sync_state.json"))
+
+# The delta query starts this many seconds before the watermark to tolerate clock skew
+SYNC_WATERMARK_OVERLAP_SECONDS = int(os.getenv("SYNC_WATERMARK_OVERLAP_SECONDS", "300"))
+
+##################################################################
+# Pipeline state store                                           #
+##################################################################
+
+# SQLite database tracking every report through listed/fetched/parsed/ingested
+STATE_DB_PATH = os.getenv("STATE_DB_PATH", os.path.join(REPORTS_DIR, "pipeline_state.db"))
+
+##################################################################
+# Pipeline hand-off                                              #
+##################################################################
+
+# Seconds between delta syncs against gvmd; new reports are queued for fetching right away
+PIPELINE_SYNC_SECONDS = float(os.getenv("PIPELINE_SYNC_SECONDS", "60"))
+
+# Minutes between safety sweeps that queue work the hand-off missed
+PIPELINE_SWEEP_MINUTES = float(os.getenv("PIPELINE_SWEEP_MINUTES", "10"))
+
+# Items a stage takes from its queue at once
+PIPELINE_BATCH_SIZE = int(os.getenv("PIPELINE_BATCH_SIZE", "10"))
+
+# Seconds an idle stage sleeps before checking for retries that became ready
+PIPELINE_IDLE_WAIT = float(os.getenv("PIPELINE_IDLE_WAIT", "30"))
+
+# Delay before the first retry of a failed item in seconds, doubled on every further attempt
+PIPELINE_RETRY_DELAY = float(os.getenv("PIPELINE_RETRY_DELAY", "60"))
+
+# Attempts after which a failing item is dropped from its queue until the next sweep
+PIPELINE_MAX_ATTEMPTS = int(os.getenv("PIPELINE_MAX_ATTEMPTS", "5"))
+
+##################################################################
+# Report worker scheduling                                       #
+##################################################################
+
+# Failing jobs back off exponentially up to this multiple of their interval
+SCHEDULER_MAX_BACKOFF_FACTOR = float(os.getenv("SCHEDULER_MAX_BACKOFF_FACTOR", "8"))
+
+# Jobs with a backlog speed up to at most this fraction of their interval
+SCHEDULER_MAX_SPEEDUP_FACTOR = float(os.getenv("SCHEDULER_MAX_SPEEDUP_FACTOR", "8"))
+
+# A job's interval is at least this multiple of its last runtime
+SCHEDULER_RUNTIME_FACTOR = float(os.getenv("SCHEDULER_RUNTIME_FACTOR", "2"))
+
 ##################################################################
 # Elasticsearch credentials                                      #
 ##################################################################
@@ -47,3 +241,35 @@ ES_HOST = get_required_env_var("ES_HOST")
 ES_USER = get_required_env_var("ES_USERNAME")
 ES_PASS = get_required_env_var("ES_PASSWORD")
 
+##################################################################
+# Elasticsearch client                                           #
+##################################################################
+
+# HTTP connections kept open per Elasticsearch node
+ES_CONNECTIONS_PER_NODE = int(os.getenv("ES_CONNECTIONS_PER_NODE", "10"))
+
+# Timeout in seconds for a single Elasticsearch request
+ES_REQUEST_TIMEOUT = float(os.getenv("ES_REQUEST_TIMEOUT", "30"))
+
+# Retries for failed or timed out requests
+ES_MAX_RETRIES = int(os.getenv("ES_MAX_RETRIES", "3"))
+
+##################################################################
+# Elasticsearch bulk ingestion                                   #
+##################################################################
+
+# Documents per bulk request
+ES_BULK_CHUNK_SIZE = int(os.getenv("ES_BULK_CHUNK_SIZE", "500"))
+
+# Upper bound for the size of one bulk request in bytes
+ES_BULK_MAX_BYTES = int(os.getenv("ES_BULK_MAX_BYTES", str(10 * 1024 * 1024)))
+
+# 1 uses streaming_bulk, more uses parallel_bulk with this many threads
+ES_BULK_THREADS = int(os.getenv("ES_BULK_THREADS", "1"))
+
+# Retries for chunks rejected with 429 (streaming_bulk only)
+ES_BULK_MAX_RETRIES = int(os.getenv("ES_BULK_MAX_RETRIES", "3"))
+
+# Unchanged documents get a last_seen update instead of being re-indexed;
+# with "false" last_seen is only kept in the state store
+ES_TOUCH_UNCHANGED = os.getenv("ES_TOUCH_UNCHANGED", "true").lower() == "true"
@@ -0,0 +1,362 @@
+# app/api/modules/greenbone/services/async_gmp.py
+
+##################################################################
+# Importing packages                                             #
+##################################################################
+
+import time
+import asyncio
+import logging
+from collections import deque
+from contextlib import asynccontextmanager
+
+import xmltodict
+from lxml import etree
+
+from app.api.core.config import (
+    GVM_SOCKET_PATH,
+    USER,
+    PASSWORD,
+    GMP_BACKEND,
+    GMP_ASYNC_POOL_SIZE,
+    GMP_POOL_TIMEOUT,
+    GMP_SOCKET_TIMEOUT,
+    GMP_SESSION_MAX_AGE,
+    GMP_SESSION_IDLE_CHECK,
+    DEFAULT_PORT_LIST_ID
+)
+from app.api.modules.greenbone.services.gmp_pool import (
+    ResponseFramer,
+    GmpAuthenticationError,
+    GmpPoolTimeout,
+    build_authenticate_command,
+    command_name
+)
+from app.api.modules.greenbone.utils.metrics import observe_gmp_command
+from app.api.modules.greenbone.services.scan_service import (
+    create_target_command,
+    delete_target_command,
+    create_task_command,
+    start_task_command,
+    get_report_command
+)
+
+##################################################################
+# Create a Logger                                                #
+##################################################################
+
+logger = logging.getLogger(__name__)
+
+# Bytes requested from the socket per read
+READ_CHUNK_SIZE = 64 * 1024
+
+##################################################################
+# A single asyncio GMP session                                   #
+##################################################################
+
+class AsyncGmpSession:
+    """
+    One authenticated GMP session over the gvmd Unix socket, driven by asyncio streams.
+    """
+    def __init__(self, socket_path: str, username: str, password: str, timeout: float):
+        self._socket_path = socket_path
+        self._username = username
+        self._password = password
+        self._timeout = timeout
+        self._reader = None
+        self._writer = None
+        self.created_at = 0.0
+        self.last_used = 0.0
+        self.reused = False
+
+    async def open(self) -> None:
+        self._reader, self._writer = await asyncio.wait_for(
+            asyncio.open_unix_connection(self._socket_path), timeout=self._timeout
+        )
+        self.created_at = time.monotonic()
+        await self.authenticate()
+
+    async def close(self) -> None:
+        if self._writer is not None:
+            self._writer.close()
+            try:
+                await self._writer.wait_closed()
+            except OSError as e:
+                logger.debug(f"Error while closing GMP session: {e}")
+            self._reader = self._writer = None
+
+    async def authenticate(self) -> None:
+        await self.send_command(build_authenticate_command(self._username, self._password))
+
+    async def send_command(self, xml_command: str) -> bytes:
+        """
+        Sends one command and returns the complete raw response.
+        """
+        chunks = []
+        framer = await self._exchange(xml_command, chunks.append)
+        framer.raise_for_status(command_name(xml_command))
+        return b"".join(chunks)
+
+    async def _exchange(self, xml_command: str, write) -> ResponseFramer:
+        # Sends the command and hands every received chunk to write() until the response is complete
+        if self._writer is None:
+            raise ConnectionError("GMP session is not connected")
+        self._writer.write(xml_command.encode("utf-8"))
+        await self._writer.drain()
+        framer = ResponseFramer()
+        while not framer.complete:
+            data = await asyncio.wait_for(self._reader.read(READ_CHUNK_SIZE), timeout=self._timeout)
+            if not data:
+                raise ConnectionError("Remote closed the connection")
+            framer.feed(data)
+            write(data)
+        self.last_used = time.monotonic()
+        return framer
+
+    async def ping(self) -> bool:
+        try:
+            await self.send_command("<get_version/>")
+            return True
+        except Exception:
+            return False
+
+    @property
+    def age(self) -> float:
+        return time.monotonic() - self.created_at
+
+    @property
+    def idle_for(self) -> float:
+        return time.monotonic() - self.last_used
+
+##################################################################
+# The asyncio connection pool                                    #
+##################################################################
+
+class AsyncGmpPool:
+    """
+    Bounded pool of AsyncGmpSession objects, the asyncio counterpart of
+    GmpConnectionPool. Many requests can be in flight at once, each on its
+    own session, without blocking the event loop.
+    """
+    def __init__(
+        self,
+        socket_path: str = GVM_SOCKET_PATH,
+        username: str = USER,
+        password: str = PASSWORD,
+        size: int = GMP_ASYNC_POOL_SIZE,
+        acquire_timeout: float = GMP_POOL_TIMEOUT,
+        socket_timeout: float = GMP_SOCKET_TIMEOUT,
+        max_age: float = GMP_SESSION_MAX_AGE,
+        idle_check: float = GMP_SESSION_IDLE_CHECK
+    ):
+        self._socket_path = socket_path
+        self._username = username
+        self._password = password
+        self._acquire_timeout = acquire_timeout
+        self._socket_timeout = socket_timeout
+        self._max_age = max_age
+        self._idle_check = idle_check
+        self._idle = deque()
+        self._slots = asyncio.Semaphore(max(1, size))
+        self.size = max(1, size)
+
+    @asynccontextmanager
+    async def session(self):
+        """
+        Checks out a session for exclusive use. Sessions that fail while
+        checked out are closed instead of being returned to the pool.
+        """
+        try:
+            await asyncio.wait_for(self._slots.acquire(), timeout=self._acquire_timeout)
+        except asyncio.TimeoutError:
+            raise GmpPoolTimeout(f"No GMP session available after {self._acquire_timeout}s") from None
+        session = None
+        try:
+            session = await self._checkout()
+            yield session
+        except (OSError, etree.XMLSyntaxError, asyncio.TimeoutError, asyncio.CancelledError):
+            if session is not None:
+                await session.close()
+                session = None
+            raise
+        finally:
+            if session is not None:
+                self._idle.append(session)
+            self._slots.release()
+
+    async def run_command(self, xml_command: str) -> bytes:
+        """
+        Runs a single command on a pooled session and returns the raw response.
+        """
+        # A reused session may have been dropped by gvmd in the meantime;
+        # in that case we retry once on a fresh session.
+        for attempt in (1, 2):
+            reused = False
+            try:
+                async with self.session() as session:
+                    reused = session.reused
+                    try:
+                        return await session.send_command(xml_command)
+                    except GmpAuthenticationError:
+                        logger.info("GMP session expired, re-authenticating.")
+                        await session.authenticate()
+                        return await session.send_command(xml_command)
+            except ConnectionError as e:
+                if not reused or attempt == 2:
+                    raise
+                logger.warning(f"Stale GMP session ({e}), retrying on a new one.")
+
+    async def _checkout(self) -> AsyncGmpSession:
+        session = self._idle.pop() if self._idle else None
+        if session is not None and session.age > self._max_age:
+            await session.close()
+            session = None
+        if session is not None and session.idle_for > self._idle_check and not await session.ping():
+            await session.close()
+            session = None
+        if session is not None:
+            session.reused = True
+            return session
+        session = AsyncGmpSession(self._socket_path, self._username, self._password, self._socket_timeout)
+        try:
+            await session.open()
+        except BaseException:
+            await session.close()
+            raise
+        return session
+
+    async def close(self) -> None:
+        """
+        Closes all idle sessions.
+        """
+        while self._idle:
+            await self._idle.pop().close()
+
+##################################################################
+# Shared pool instance                                           #
+##################################################################
+
+# asyncio primitives belong to one event loop, so the pool is kept per loop
+_pools = {}
+
+def get_async_pool() -> AsyncGmpPool:
+    loop = asyncio.get_running_loop()
+    pool = _pools.get(loop)
+    if pool is None:
+        pool = _pools[loop] = AsyncGmpPool()
+    return pool
+
+async def close_async_pool() -> None:
+    pool = _pools.pop(asyncio.get_running_loop(), None)
+    if pool is not None:
+        await pool.close()
+
+##################################################################
+# Define functions for communication                             #
+##################################################################
+
+# Main function to run gvm commands without blocking the event loop
+async def run_gvm_command(xml_command: str) -> dict:
+    """
+    Executes a GMP command over the configured backend and returns the parsed XML response.
+    """
+    output = await run_gvm_command_raw(xml_command)
+    # Large responses take a while to convert, so that happens off the event loop
+    return await asyncio.to_thread(xmltodict.parse, output)
+
+# Runs a gvm command and returns the raw XML bytes
+async def run_gvm_command_raw(xml_command: str, backend: str = None) -> bytes:
+    """
+    Executes a GMP command and returns the unparsed response.
+    """
+    backend = backend or GMP_BACKEND
+    command = command_name(xml_command)
+    started = time.perf_counter()
+    try:
+        if backend == "cli":
+            output = await _run_gvm_cli(xml_command)
+        else:
+            output = await get_async_pool().run_command(xml_command)
+    except Exception as e:
+        observe_gmp_command(command, backend, "async", time.perf_counter() - started, ok=False)
+        if backend != "cli":
+            logger.error(f"Error running GMP command <{command}>: {e}")
+        raise
+    elapsed = time.perf_counter() - started
+    observe_gmp_command(command, backend, "async", elapsed, len(output))
+    logger.debug(f"GMP command <{command}> via async {backend} took {elapsed:.3f}s")
+    return output
+
+# Fallback backend: gvm-cli as an asyncio subprocess
+async def _run_gvm_cli(xml_command: str) -> bytes:
+    cmd = [
+        "gvm-cli",
+        "--gmp-username", USER,
+        "--gmp-password", PASSWORD,
+        "socket",
+        "--socketpath", GVM_SOCKET_PATH,
+        "--xml", xml_command
+    ]
+    process = await asyncio.create_subprocess_exec(
+        *cmd, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.STDOUT
+    )
+    output, _ = await process.communicate()
+    if process.returncode != 0:
+        logger.error(f"Error running gvm-cli command: {output.decode()}")
+        raise RuntimeError(f"gvm-cli exited with status {process.returncode}")
+    return output
+
+##################################################################
+# Async variants of the scan_service operations                  #
+##################################################################
+
+# Retrieve version information of Greenbone via gvm
+async def get_version() -> dict:
+    """
+    Retrieves the GVM version.
+    """
+    return await run_gvm_command("<get_version/>")
+
+# Retrieve an overview of all available reports via gvm
+async def get_all_reports() -> dict:
+    return await run_gvm_command("<get_reports/>")
+
+# Create a scan target
+async def create_target(name: str, hosts: str, port_list_id: str = DEFAULT_PORT_LIST_ID) -> str:
+    """
+    Creates a new target and returns its ID.
+    """
+    response = await run_gvm_command(create_target_command(name, hosts, port_list_id))
+    return response.get("create_target_response", {}).get("@id")
+
+# Delete a scan target
+async def delete_target(target_id: str) -> None:
+    """
+    Moves a target to the trashcan; gvmd refuses while a task uses it.
+    """
+    await run_gvm_command(delete_target_command(target_id))
+
+# Create a scan task
+async def create_task(name: str, target_id: str, scan_config_id: str) -> str:
+    """
+    Creates a scan task for the given target and configuration.
+    Returns the task ID.
+    """
+    response = await run_gvm_command(create_task_command(name, target_id, scan_config_id))
+    return response.get("create_task_response", {}).get("@id")
+
+# Start a scan task
+async def start_task(task_id: str) -> str:
+    """
+    Starts a scan task given its ID.
+    Returns the ID of the report the scan writes to.
+    """
+    response = await run_gvm_command(start_task_command(task_id))
+    return response.get("start_task_response", {}).get("report_id")
+
+# Get report details of a scan
+async def get_report(report_id: str) -> dict:
+    """
+    Retrieves the report details.
+    """
+    return await run_gvm_command(get_report_command(report_id))
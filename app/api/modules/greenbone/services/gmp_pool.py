@@ -0,0 +1,359 @@
+# app/api/modules/greenbone/services/gmp_pool.py
+
+##################################################################
+# Importing packages                                             #
+##################################################################
+
+import time
+import logging
+import threading
+from collections import deque
+from contextlib import contextmanager
+from xml.sax.saxutils import escape
+
+from lxml import etree
+from gvm.connections import UnixSocketConnection
+from gvm.errors import GvmError
+
+from app.api.core.config import (
+    GVM_SOCKET_PATH,
+    USER,
+    PASSWORD,
+    GMP_POOL_SIZE,
+    GMP_POOL_TIMEOUT,
+    GMP_SOCKET_TIMEOUT,
+    GMP_SESSION_MAX_AGE,
+    GMP_SESSION_IDLE_CHECK
+)
+
+##################################################################
+# Create a Logger                                                #
+##################################################################
+
+logger = logging.getLogger(__name__)
+
+##################################################################
+# Errors                                                         #
+##################################################################
+
+class GmpCommandError(RuntimeError):
+    """
+    Raised when gvmd answers a command with a non-2xx status.
+    """
+    def __init__(self, command: str, status: str, status_text: str):
+        super().__init__(f"GMP command <{command}> failed with status {status}: {status_text}")
+        self.command = command
+        self.status = status
+        self.status_text = status_text
+
+class GmpAuthenticationError(GmpCommandError):
+    """
+    Raised when gvmd rejects the credentials or asks to authenticate first.
+    """
+
+class GmpPoolTimeout(RuntimeError):
+    """
+    Raised when no session becomes available within GMP_POOL_TIMEOUT.
+    """
+
+##################################################################
+# Response framing                                               #
+##################################################################
+
+# gvmd does not delimit responses, so we feed the bytes into an
+# incremental parser and stop reading once the root element closes.
+class ResponseFramer:
+    """
+    Incrementally parses a GMP response to detect where it ends.
+    Elements are discarded as soon as they are closed, so memory stays
+    flat no matter how large the response is.
+    """
+    def __init__(self):
+        self._parser = etree.XMLPullParser(events=("start", "end"), huge_tree=True)
+        self._depth = 0
+        self.root_tag = None
+        self.root_attrib = {}
+        self.complete = False
+
+    def feed(self, data: bytes) -> None:
+        self._parser.feed(data)
+        for event, elem in self._parser.read_events():
+            if event == "start":
+                if self._depth == 0:
+                    self.root_tag = elem.tag
+                    self.root_attrib = dict(elem.attrib)
+                self._depth += 1
+                continue
+            self._depth -= 1
+            if self._depth == 0:
+                self.complete = True
+            # Drop the finished element and everything before it
+            elem.clear(keep_tail=False)
+            parent = elem.getparent()
+            if parent is not None:
+                while elem.getprevious() is not None:
+                    del parent[0]
+
+    def raise_for_status(self, command: str) -> None:
+        """
+        Raises a GmpCommandError if the response status is not 2xx.
+        """
+        status = self.root_attrib.get("status", "")
+        if status.startswith("2"):
+            return
+        status_text = self.root_attrib.get("status_text", "")
+        if status == "401" or (self.root_tag == "authenticate_response" and status == "400"):
+            raise GmpAuthenticationError(command, status, status_text)
+        raise GmpCommandError(command, status, status_text)
+
+# Name of the root element of a command, used for logging and errors
+def command_name(xml_command: str) -> str:
+    start = xml_command.find("<") + 1
+    end = start
+    while end < len(xml_command) and xml_command[end] not in " />\t\n":
+        end += 1
+    return xml_command[start:end] or "unknown"
+
+# XML for the <authenticate> command
+def build_authenticate_command(username: str, password: str) -> str:
+    return (
+        f"<authenticate><credentials>"
+        f"<username>{escape(username)}</username>"
+        f"<password>{escape(password)}</password>"
+        f"</credentials></authenticate>"
+    )
+
+##################################################################
+# A single authenticated session                                 #
+##################################################################
+
+class GmpSession:
+    """
+    One authenticated GMP session over the gvmd Unix socket.
+    """
+    def __init__(self, socket_path: str, username: str, password: str, timeout: float):
+        self._socket_path = socket_path
+        self._username = username
+        self._password = password
+        self._timeout = timeout
+        self._connection = None
+        self.created_at = 0.0
+        self.last_used = 0.0
+        self.reused = False
+
+    def open(self) -> None:
+        self._connection = UnixSocketConnection(path=self._socket_path, timeout=self._timeout)
+        self._connection.connect()
+        self.created_at = time.monotonic()
+        self.authenticate()
+
+    def close(self) -> None:
+        if self._connection is not None:
+            self._connection.disconnect()
+            self._connection = None
+
+    def authenticate(self) -> None:
+        self.send_command(build_authenticate_command(self._username, self._password))
+        logger.debug(f"Authenticated GMP session on {self._socket_path}")
+
+    def send_command(self, xml_command: str) -> bytes:
+        """
+        Sends one command and returns the complete raw response.
+        """
+        chunks = []
+        framer = self._exchange(xml_command, chunks.append)
+        framer.raise_for_status(command_name(xml_command))
+        return b"".join(chunks)
+
+    def stream_command(self, xml_command: str, fileobj) -> int:
+        """
+        Sends one command and writes the raw response to fileobj chunk by chunk.
+        Returns the number of bytes written.
+        """
+        written = 0
+        def write(data: bytes) -> None:
+            nonlocal written
+            fileobj.write(data)
+            written += len(data)
+        framer = self._exchange(xml_command, write)
+        framer.raise_for_status(command_name(xml_command))
+        return written
+
+    def _exchange(self, xml_command: str, write) -> ResponseFramer:
+        # Sends the command and hands every received chunk to write() until the response is complete
+        if self._connection is None:
+            raise GvmError("GMP session is not connected")
+        self._connection.send(xml_command.encode("utf-8"))
+        framer = ResponseFramer()
+        while not framer.complete:
+            data = self._connection.read()
+            framer.feed(data)
+            write(data)
+        self.last_used = time.monotonic()
+        return framer
+
+    def ping(self) -> bool:
+        try:
+            self.send_command("<get_version/>")
+            return True
+        except (GvmError, OSError, GmpCommandError, etree.XMLSyntaxError):
+            return False
+
+    @property
+    def age(self) -> float:
+        return time.monotonic() - self.created_at
+
+    @property
+    def idle_for(self) -> float:
+        return time.monotonic() - self.last_used
+
+##################################################################
+# The connection pool                                            #
+##################################################################
+
+class GmpConnectionPool:
+    """
+    A bounded, thread-safe pool of authenticated GMP sessions.
+    Sessions are health-checked after being idle, rotated once they
+    reach their maximum age and re-authenticated when gvmd asks for it.
+    """
+    def __init__(
+        self,
+        socket_path: str = GVM_SOCKET_PATH,
+        username: str = USER,
+        password: str = PASSWORD,
+        size: int = GMP_POOL_SIZE,
+        acquire_timeout: float = GMP_POOL_TIMEOUT,
+        socket_timeout: float = GMP_SOCKET_TIMEOUT,
+        max_age: float = GMP_SESSION_MAX_AGE,
+        idle_check: float = GMP_SESSION_IDLE_CHECK
+    ):
+        self._socket_path = socket_path
+        self._username = username
+        self._password = password
+        self._acquire_timeout = acquire_timeout
+        self._socket_timeout = socket_timeout
+        self._max_age = max_age
+        self._idle_check = idle_check
+        self._idle = deque()
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(max(1, size))
+        self.size = max(1, size)
+
+    @contextmanager
+    def session(self):
+        """
+        Checks out a session for exclusive use. Sessions that fail while
+        checked out are closed instead of being returned to the pool.
+        """
+        if not self._slots.acquire(timeout=self._acquire_timeout):
+            raise GmpPoolTimeout(f"No GMP session available after {self._acquire_timeout}s")
+        session = None
+        try:
+            session = self._checkout()
+            yield session
+        except (GvmError, OSError, etree.XMLSyntaxError):
+            if session is not None:
+                session.close()
+                session = None
+            raise
+        finally:
+            if session is not None:
+                self._checkin(session)
+            self._slots.release()
+
+    def run_command(self, xml_command: str) -> bytes:
+        """
+        Runs a single command on a pooled session and returns the raw response.
+        """
+        return self._with_session(lambda session: session.send_command(xml_command))
+
+    def stream_command(self, xml_command: str, fileobj) -> int:
+        """
+        Runs a single command on a pooled session and streams the raw response into fileobj.
+        The file is rewound before every attempt so a retry never leaves partial output behind.
+        """
+        def action(session: GmpSession) -> int:
+            fileobj.seek(0)
+            fileobj.truncate()
+            return session.stream_command(xml_command, fileobj)
+        return self._with_session(action)
+
+    def _with_session(self, action):
+        # A reused session may have been dropped by gvmd in the meantime;
+        # in that case we retry once on a fresh session.
+        for attempt in (1, 2):
+            reused = False
+            try:
+                with self.session() as session:
+                    reused = session.reused
+                    try:
+                        return action(session)
+                    except GmpAuthenticationError:
+                        logger.info("GMP session expired, re-authenticating.")
+                        session.authenticate()
+                        return action(session)
+            except (GvmError, OSError) as e:
+                if not reused or attempt == 2:
+                    raise
+                logger.warning(f"Stale GMP session ({e}), retrying on a new one.")
+
+    def _checkout(self) -> GmpSession:
+        with self._lock:
+            session = self._idle.pop() if self._idle else None
+        if session is not None and session.age > self._max_age:
+            logger.debug("Rotating GMP session after reaching its maximum age.")
+            session.close()
+            session = None
+        if session is not None and session.idle_for > self._idle_check and not session.ping():
+            logger.debug("Discarding GMP session that failed its health check.")
+            session.close()
+            session = None
+        if session is not None:
+            session.reused = True
+            return session
+        session = GmpSession(self._socket_path, self._username, self._password, self._socket_timeout)
+        try:
+            session.open()
+        except Exception:
+            session.close()
+            raise
+        return session
+
+    def _checkin(self, session: GmpSession) -> None:
+        with self._lock:
+            self._idle.append(session)
+
+    def close(self) -> None:
+        """
+        Closes all idle sessions.
+        """
+        with self._lock:
+            sessions = list(self._idle)
+            self._idle.clear()
+        for session in sessions:
+            session.close()
+
+##################################################################
+# Shared pool instance                                           #
+##################################################################
+
+_pool = None
+_pool_lock = threading.Lock()
+
+# Returns the process-wide pool, creating it on first use
+def get_pool() -> GmpConnectionPool:
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = GmpConnectionPool()
+    return _pool
+
+# Closes the process-wide pool, e.g. on application shutdown
+def close_pool() -> None:
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.close()
+            _pool = None
@@ -0,0 +1,107 @@
+# app/api/modules/greenbone/services/report_fetcher.py
+
+##################################################################
+# Importing packages                                             #
+##################################################################
+
+import time
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from app.api.core.config import GMP_FETCH_WORKERS, GMP_FETCH_TIMEOUT
+
+##################################################################
+# Create a Logger                                                #
+##################################################################
+
+logger = logging.getLogger(__name__)
+
+##################################################################
+# Concurrent fetch stage                                         #
+##################################################################
+
+class ReportFetchStage:
+    """
+    Fetches pending reports with up to `workers` reports in flight at once.
+    Each report gets a deadline of `timeout` seconds, handed to the fetch
+    function, which is expected to stop between pages once it has passed.
+    Queue depth and in-flight count are available through stats() while
+    a run is going on.
+    """
+    def __init__(self, workers: int = GMP_FETCH_WORKERS, timeout: float = GMP_FETCH_TIMEOUT):
+        self._workers = max(1, workers)
+        self._timeout = timeout
+        self._lock = threading.Lock()
+        self._run_lock = threading.Lock()
+        self._queued = 0
+        self._in_flight = 0
+        self._completed = 0
+        self._failed = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "workers": self._workers,
+                "queued": self._queued,
+                "in_flight": self._in_flight,
+                "completed": self._completed,
+                "failed": self._failed
+            }
+
+    def run(self, pending: dict, fetch, on_success=None) -> dict:
+        """
+        Calls fetch(report_id, version, deadline) for every entry of pending and
+        on_success(report_id, version) for each fetch that returned True.
+        Returns {report_id: bool}. Runs do not overlap; a second caller waits.
+        """
+        with self._run_lock:
+            with self._lock:
+                self._queued = len(pending)
+                self._in_flight = 0
+                self._completed = 0
+                self._failed = 0
+            started = time.perf_counter()
+
+            def work(item):
+                report_id, version = item
+                with self._lock:
+                    self._queued -= 1
+                    self._in_flight += 1
+                ok = False
+                try:
+                    ok = bool(fetch(report_id, version, time.monotonic() + self._timeout))
+                    if ok and on_success is not None:
+                        on_success(report_id, version)
+                except Exception as e:
+                    logger.warning(f"Fetching report {report_id} failed: {e}")
+                    ok = False
+                finally:
+                    with self._lock:
+                        self._in_flight -= 1
+                        if ok:
+                            self._completed += 1
+                        else:
+                            self._failed += 1
+                        queued, in_flight = self._queued, self._in_flight
+                    logger.info(f"Report {report_id} {'fetched' if ok else 'failed'} ({queued} queued, {in_flight} in flight)")
+                return report_id, ok
+
+            if self._workers == 1:
+                results = dict(map(work, pending.items()))
+            else:
+                with ThreadPoolExecutor(max_workers=self._workers, thread_name_prefix="report-fetch") as executor:
+                    results = dict(executor.map(work, pending.items()))
+
+            stats = self.stats()
+            logger.info(
+                f"Fetch run finished: {stats['completed']} fetched, {stats['failed']} failed "
+                f"in {time.perf_counter() - started:.1f}s with {self._workers} workers."
+            )
+            return results
+
+##################################################################
+# Shared fetch stage                                             #
+##################################################################
+
+report_fetcher = ReportFetchStage()
@@ -0,0 +1,270 @@
+# app/api/modules/greenbone/services/report_inventory.py
+
+##################################################################
+# Importing packages                                             #
+##################################################################
+
+import json
+import time
+import asyncio
+import hashlib
+import logging
+import threading
+from email.utils import formatdate, parsedate_to_datetime
+
+from app.api.core.config import INVENTORY_TTL_SECONDS, INVENTORY_STALE_SECONDS
+from app.api.modules.greenbone.services import scan_service, async_gmp
+from app.api.modules.greenbone.utils.gvm_parser import parse_all_reports
+from app.api.modules.greenbone.utils.metrics import observe_inventory_lookup, observe_inventory_refresh
+
+##################################################################
+# Create a Logger                                                #
+##################################################################
+
+logger = logging.getLogger(__name__)
+
+# Lists every report without result details; we only need ids, tasks and counts
+INVENTORY_COMMAND = '<get_reports details="0" ignore_pagination="1" filter="first=1 rows=-1 sort-reverse=date"/>'
+
+##################################################################
+# Snapshot of the report listing                                 #
+##################################################################
+
+class InventorySnapshot:
+    """
+    One metadata-only report listing and the views derived from it.
+    """
+    def __init__(self, response: dict, previous: "InventorySnapshot" = None):
+        self.response = response
+        self.fetched_at = time.time()
+        reports = response.get("get_reports_response", {}).get("report", [])
+        # Ensure reports is always a list
+        if not isinstance(reports, list):
+            reports = [reports]
+        self.reports = reports
+        self._summaries = None
+        # The validators only change when the listing does, so a refresh that
+        # finds nothing new keeps answering If-None-Match with 304
+        serialized = json.dumps(reports, sort_keys=True, separators=(",", ":"))
+        self.etag = f'"{hashlib.sha1(serialized.encode("utf-8")).hexdigest()}"'
+        if previous is not None and previous.etag == self.etag:
+            self.last_modified = previous.last_modified
+        else:
+            self.last_modified = self.fetched_at
+
+    @property
+    def report_ids(self) -> list:
+        return [report.get("@id") for report in self.reports if report.get("@id")]
+
+    @property
+    def report_task_mapping(self) -> dict:
+        mapping = {}
+        for report in self.reports:
+            report_id = report.get("@id")
+            task_id = (report.get("task") or {}).get("@id")
+            if report_id and task_id:
+                mapping[report_id] = task_id
+        return mapping
+
+    @property
+    def summaries(self) -> list:
+        if self._summaries is None:
+            self._summaries = parse_all_reports(self.response)
+        return self._summaries
+
+    @property
+    def age(self) -> float:
+        return time.time() - self.fetched_at
+
+    @property
+    def last_modified_http(self) -> str:
+        return formatdate(self.last_modified, usegmt=True)
+
+    def not_modified(self, if_none_match: str = None, if_modified_since: str = None) -> bool:
+        """
+        Evaluates the conditional request headers against this snapshot.
+        If-None-Match takes precedence over If-Modified-Since, as in RFC 9110.
+        """
+        if if_none_match:
+            tags = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+            return "*" in tags or self.etag in tags
+        if if_modified_since:
+            try:
+                since = parsedate_to_datetime(if_modified_since).timestamp()
+            except (TypeError, ValueError):
+                return False
+            return int(self.last_modified) <= since
+        return False
+
+##################################################################
+# The inventory cache                                            #
+##################################################################
+
+class ReportInventory:
+    """
+    Keeps the latest InventorySnapshot in memory. Worker jobs and API routes
+    share it, so one listing per cycle serves the report IDs, the report-task
+    mapping and the summaries.
+
+    Snapshots are fresh for `ttl` seconds. The API routes keep serving an
+    expired snapshot for up to `stale` more seconds while one background
+    refresh replaces it (stale-while-revalidate); only older or missing
+    snapshots make a request wait for gvmd. The report worker also refreshes
+    the inventory on a schedule, so dashboards normally only see hits.
+    """
+    def __init__(self, ttl: float = INVENTORY_TTL_SECONDS, stale: float = INVENTORY_STALE_SECONDS):
+        self._ttl = ttl
+        self._stale = stale
+        self._snapshot = None
+        self._lock = threading.Lock()
+        self._async_locks = {}
+        self._refreshing = False
+        self._refresh_task = None
+        self._stats = {"hits": 0, "stale_hits": 0, "misses": 0, "not_modified": 0, "refreshes": 0, "refresh_errors": 0}
+        self._last_error = None
+
+    def _fresh(self):
+        snapshot = self._snapshot
+        if snapshot is not None and snapshot.age < self._ttl:
+            return snapshot
+        return None
+
+    def _usable_stale(self):
+        snapshot = self._snapshot
+        if snapshot is not None and snapshot.age < self._ttl + self._stale:
+            return snapshot
+        return None
+
+    def _count(self, result: str) -> None:
+        self._stats[result] += 1
+        observe_inventory_lookup(result)
+
+    def get(self) -> InventorySnapshot:
+        """
+        Returns the cached snapshot, fetching a new one over the sync GMP pool if it expired.
+        """
+        snapshot = self._fresh()
+        if snapshot is not None:
+            self._count("hits")
+            return snapshot
+        with self._lock:
+            snapshot = self._fresh()
+            if snapshot is None:
+                self._count("misses")
+                snapshot = self._fetch()
+            else:
+                self._count("hits")
+        return snapshot
+
+    async def get_async(self) -> InventorySnapshot:
+        """
+        Same as get(), but fetches over the asyncio GMP client and serves a
+        stale snapshot while a background refresh runs.
+        """
+        snapshot = self._fresh()
+        if snapshot is not None:
+            self._count("hits")
+            return snapshot
+        snapshot = self._usable_stale()
+        if snapshot is not None:
+            self._count("stale_hits")
+            self._refresh_in_background()
+            return snapshot
+        loop = asyncio.get_running_loop()
+        lock = self._async_locks.setdefault(loop, asyncio.Lock())
+        async with lock:
+            snapshot = self._fresh()
+            if snapshot is None:
+                self._count("misses")
+                snapshot = await self._fetch_async()
+            else:
+                self._count("hits")
+        return snapshot
+
+    def refresh(self) -> InventorySnapshot:
+        """
+        Fetches a new snapshot right away; used by the scheduled refresh job.
+        """
+        with self._lock:
+            return self._fetch()
+
+    def _fetch(self) -> InventorySnapshot:
+        try:
+            response = scan_service.run_gvm_command(INVENTORY_COMMAND)
+        except Exception as e:
+            self._failed(e)
+            raise
+        return self._store(response)
+
+    async def _fetch_async(self) -> InventorySnapshot:
+        try:
+            response = await async_gmp.run_gvm_command(INVENTORY_COMMAND)
+        except Exception as e:
+            self._failed(e)
+            raise
+        return self._store(response)
+
+    # Starts one refresh task on the running loop unless one is already going
+    def _refresh_in_background(self) -> None:
+        if self._refreshing:
+            return
+        self._refreshing = True
+        async def refresh() -> None:
+            try:
+                await self._fetch_async()
+            except Exception as e:
+                logger.warning(f"Background refresh of the report inventory failed, serving the stale listing: {e}")
+            finally:
+                self._refreshing = False
+                self._refresh_task = None
+        # Keep a reference so the task is not garbage collected while it runs
+        self._refresh_task = asyncio.get_running_loop().create_task(refresh())
+
+    def _store(self, response: dict) -> InventorySnapshot:
+        snapshot = InventorySnapshot(response, self._snapshot)
+        # Summaries are derived once per snapshot, not on every request
+        snapshot.summaries
+        self._snapshot = snapshot
+        self._stats["refreshes"] += 1
+        self._last_error = None
+        observe_inventory_refresh(True, snapshot.fetched_at)
+        logger.info(f"Report inventory refreshed with {len(snapshot.reports)} reports.")
+        return snapshot
+
+    def _failed(self, error: Exception) -> None:
+        self._stats["refresh_errors"] += 1
+        self._last_error = str(error)
+        observe_inventory_refresh(False)
+
+    # Counts a conditional request answered with 304
+    def record_not_modified(self) -> None:
+        self._count("not_modified")
+
+    def invalidate(self) -> None:
+        self._snapshot = None
+
+    def stats(self) -> dict:
+        """
+        Lookup counters and the state of the cached snapshot.
+        """
+        snapshot = self._snapshot
+        lookups = self._stats["hits"] + self._stats["stale_hits"] + self._stats["misses"]
+        return dict(
+            self._stats,
+            hit_ratio=round((self._stats["hits"] + self._stats["stale_hits"]) / lookups, 3) if lookups else None,
+            ttl_seconds=self._ttl,
+            stale_seconds=self._stale,
+            age_seconds=round(snapshot.age, 1) if snapshot is not None else None,
+            state="empty" if snapshot is None else ("fresh" if snapshot.age < self._ttl else "stale"),
+            refreshing=self._refreshing,
+            reports=len(snapshot.reports) if snapshot is not None else 0,
+            etag=snapshot.etag if snapshot is not None else None,
+            last_modified=snapshot.last_modified_http if snapshot is not None else None,
+            last_error=self._last_error
+        )
+
+##################################################################
+# Shared inventory instance                                      #
+##################################################################
+
+inventory = ReportInventory()
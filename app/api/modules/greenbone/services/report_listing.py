@@ -0,0 +1,157 @@
+# app/api/modules/greenbone/services/report_listing.py
+
+##################################################################
+# Importing packages                                             #
+##################################################################
+
+import re
+import math
+import logging
+import datetime
+
+from app.api.core.config import REPORT_LIST_DEFAULT_LIMIT, REPORT_LIST_MAX_LIMIT
+from app.api.modules.greenbone.services import async_gmp
+from app.api.modules.greenbone.utils.gvm_parser import parse_all_reports
+
+##################################################################
+# Create a Logger                                                #
+##################################################################
+
+logger = logging.getLogger(__name__)
+
+# API sort keys and the gvmd report columns they map to
+SORT_FIELDS = {
+    "date": "date",
+    "modified": "modified",
+    "severity": "severity",
+    "task": "task",
+    "hosts": "hosts"
+}
+
+UUID_PATTERN = re.compile(r"^[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}$")
+
+##################################################################
+# Building the GMP filter                                        #
+##################################################################
+
+# Normalizes an ISO date or datetime to the timestamp format gvmd filters accept
+def _filter_time(value: str, name: str) -> str:
+    try:
+        parsed = datetime.datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        raise ValueError(f"{name} must be an ISO 8601 date or datetime, got {value!r}")
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(datetime.timezone.utc)
+    return parsed.strftime("%Y-%m-%dT%H:%M:%SZ")
+
+def build_report_filter(
+    offset: int = 0,
+    limit: int = REPORT_LIST_DEFAULT_LIMIT,
+    sort: str = "date",
+    order: str = "desc",
+    since: str = None,
+    until: str = None,
+    task_id: str = None,
+    min_severity: float = None
+) -> str:
+    """
+    Translates the listing parameters into a GMP filter string, so gvmd does
+    the filtering, sorting and paging. Every value is validated first; nothing
+    from the request reaches the filter unchecked.
+    """
+    if sort not in SORT_FIELDS:
+        raise ValueError(f"sort must be one of {', '.join(SORT_FIELDS)}")
+    if order not in ("asc", "desc"):
+        raise ValueError("order must be asc or desc")
+    if offset < 0 or not 1 <= limit <= REPORT_LIST_MAX_LIMIT:
+        raise ValueError(f"offset must be >= 0 and limit between 1 and {REPORT_LIST_MAX_LIMIT}")
+    terms = []
+    if since:
+        terms.append(f"created>{_filter_time(since, 'since')}")
+    if until:
+        terms.append(f"created<{_filter_time(until, 'until')}")
+    if task_id:
+        if not UUID_PATTERN.match(task_id):
+            raise ValueError("task_id must be a UUID")
+        terms.append(f"task_id={task_id}")
+    if min_severity is not None:
+        if not 0 <= min_severity <= 10:
+            raise ValueError("min_severity must be between 0 and 10")
+        # gvmd only knows ">", and severities have one decimal: round the bound
+        # up to a decimal first, so 7.04 asks for 7.1 and up, not 7.0
+        threshold = math.ceil(round(min_severity * 10, 6)) / 10
+        terms.append(f"severity>{threshold - 0.1:.1f}")
+    terms.append(f"{'sort-reverse' if order == 'desc' else 'sort'}={SORT_FIELDS[sort]}")
+    terms.append(f"first={offset + 1} rows={limit}")
+    return " ".join(terms)
+
+# The filter for a listing request, or None when the client asked for nothing but the full listing
+def listing_filter(
+    offset: int = None,
+    limit: int = None,
+    sort: str = None,
+    order: str = None,
+    since: str = None,
+    until: str = None,
+    task_id: str = None,
+    min_severity: float = None
+):
+    if all(value is None for value in (offset, limit, sort, order, since, until, task_id, min_severity)):
+        return None
+    return build_report_filter(
+        offset=offset or 0,
+        limit=limit or REPORT_LIST_DEFAULT_LIMIT,
+        sort=sort or "date",
+        order=order or "desc",
+        since=since,
+        until=until,
+        task_id=task_id,
+        min_severity=min_severity
+    )
+
+# Metadata-only listing of the reports matching report_filter
+def report_listing_command(report_filter: str) -> str:
+    return f'<get_reports details="0" filter="{report_filter}"/>'
+
+##################################################################
+# Querying gvmd                                                  #
+##################################################################
+
+# Runs one filtered listing; returns the parsed response and the number of matches before paging
+async def _query(report_filter: str) -> tuple:
+    response = await async_gmp.run_gvm_command(report_listing_command(report_filter))
+    report_count = response.get("get_reports_response", {}).get("report_count") or {}
+    total = report_count.get("filtered") if isinstance(report_count, dict) else None
+    return response, int(total) if total is not None else None
+
+async def query_reports(report_filter: str) -> dict:
+    """
+    Returns the page of reports matching report_filter and the total number
+    of matching reports, so clients can page through them.
+    """
+    response, total = await _query(report_filter)
+    reports = response.get("get_reports_response", {}).get("report", [])
+    # Ensure reports is always a list
+    if not isinstance(reports, list):
+        reports = [reports]
+    return {"reports": reports, "total": total}
+
+async def query_report_summaries(report_filter: str) -> dict:
+    """
+    Same as query_reports(), with the reports reduced to their summaries.
+    """
+    response, total = await _query(report_filter)
+    return {"reports": parse_all_reports(response), "total": total}
+
+# Response body of a filtered listing, with what a client needs to request the next page
+def listing_page(page: dict, offset: int, limit: int, report_filter: str) -> dict:
+    offset = offset or 0
+    limit = limit or REPORT_LIST_DEFAULT_LIMIT
+    following = offset + len(page["reports"])
+    return dict(
+        page,
+        offset=offset,
+        limit=limit,
+        next_offset=following if page["total"] is not None and following < page["total"] else None,
+        filter=report_filter
+    )
@@ -0,0 +1,198 @@
+# app/api/modules/greenbone/services/report_pages.py
+
+##################################################################
+# Importing packages                                             #
+##################################################################
+
+import os
+import time
+import shutil
+import logging
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from lxml import etree
+
+from app.api.core.config import (
+    GMP_REPORT_PAGE_SIZE,
+    GMP_REPORT_PAGE_CONCURRENCY,
+    GMP_REPORT_PAGE_OUTPUT,
+    GMP_FETCH_RATE,
+    GMP_FETCH_BURST
+)
+from app.api.modules.greenbone.services.scan_service import run_gvm_command_to_file
+
+##################################################################
+# Create a Logger                                                #
+##################################################################
+
+logger = logging.getLogger(__name__)
+
+# Filter used for detailed report retrieval, without the paging keywords. Pages
+# are cut with first/rows, so the sort key must be unique: on a shared key such as
+# the NVT name gvmd may order tied results differently for every page query, and
+# pages fetched side by side would then repeat some results and miss others
+DETAILED_REPORT_FILTER = "apply_overrides=0 levels=hml min_qod=50 sort=uuid"
+
+# Anonymous XML report format
+DETAILED_REPORT_FORMAT_ID = "a994b278-1f62-11e1-96ac-406186ea4fc5"
+
+class ReportFetchTimeout(TimeoutError):
+    """
+    Raised when a report is still not complete at its fetch deadline.
+    """
+
+##################################################################
+# Rate limiting                                                  #
+##################################################################
+
+class RateLimiter:
+    """
+    Token bucket shared by all threads: allows `rate` acquisitions per second
+    on average and up to `burst` at once. A rate of 0 disables the limit.
+    """
+    def __init__(self, rate: float, burst: int = 1):
+        self._rate = rate
+        self._burst = max(1, burst)
+        self._tokens = float(self._burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        if self._rate <= 0:
+            return
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self._burst, self._tokens + (now - self._updated) * self._rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self._rate
+            time.sleep(wait)
+
+# Limits the page requests every report fetch sends to gvmd
+gvmd_rate_limiter = RateLimiter(GMP_FETCH_RATE, GMP_FETCH_BURST)
+
+##################################################################
+# Building and inspecting pages                                  #
+##################################################################
+
+# GMP command for one page of a detailed report
+def detailed_report_page_command(report_id: str, first: int, rows: int) -> str:
+    return (
+        f'<get_reports report_id="{report_id}" '
+        f'filter="{DETAILED_REPORT_FILTER} first={first} rows={rows}" '
+        f'details="1" format_id="{DETAILED_REPORT_FORMAT_ID}"/>'
+    )
+
+# Reads the number of filtered results from a report page
+def read_filtered_result_count(page_path: str) -> int:
+    """
+    Returns <result_count><filtered> of the report in page_path.
+    gvmd writes <result_count> after the <results> of the page, so the results
+    are streamed past and freed as they go; parsing stops at the count.
+    """
+    for _, elem in etree.iterparse(page_path, events=("end",), huge_tree=True):
+        parent = elem.getparent()
+        if elem.tag == "filtered" and parent is not None and parent.tag == "result_count":
+            return int((elem.text or "0").strip() or 0)
+        if elem.tag == "result" and parent is not None and parent.tag == "results":
+            elem.clear(keep_tail=False)
+            while elem.getprevious() is not None:
+                del parent[0]
+    raise ValueError(f"No result count found in {page_path}")
+
+##################################################################
+# Paginated retrieval                                            #
+##################################################################
+
+def fetch_report_paginated(
+    report_id: str,
+    file_path: str,
+    page_size: int = GMP_REPORT_PAGE_SIZE,
+    concurrency: int = GMP_REPORT_PAGE_CONCURRENCY,
+    output: str = GMP_REPORT_PAGE_OUTPUT,
+    deadline: float = None
+) -> list:
+    """
+    Fetches the detailed report page by page and saves it next to file_path.
+    The first page tells us how many results there are; the remaining pages are
+    fetched up to `concurrency` at a time, each over its own pooled GMP session.
+
+    With output="stitched" all pages end up in file_path, wrapped in a
+    <report_pages> root element so the streaming parser sees every result.
+    With output="pages" each page is saved as <file_path>_pNNNN.xml.
+    Every page request waits for gvmd_rate_limiter. If deadline (a time.monotonic()
+    value) passes before all pages are requested, ReportFetchTimeout is raised.
+    Returns the list of written files in page order.
+    """
+    directory = os.path.dirname(file_path) or "."
+    work_dir = tempfile.mkdtemp(prefix=f".pages_{report_id}_", dir=directory)
+    try:
+        def fetch_page(number: int) -> str:
+            gvmd_rate_limiter.acquire()
+            if deadline is not None and time.monotonic() > deadline:
+                raise ReportFetchTimeout(f"Fetching report {report_id} timed out before page {number}")
+            page_path = os.path.join(work_dir, f"{number:04d}.page")
+            first = (number - 1) * page_size + 1
+            run_gvm_command_to_file(detailed_report_page_command(report_id, first, page_size), page_path)
+            return page_path
+
+        pages = [fetch_page(1)]
+        total = read_filtered_result_count(pages[0])
+        page_count = max(1, -(-total // page_size))
+        if page_count > 1:
+            logger.info(f"Report {report_id} has {total} results, fetching {page_count} pages of {page_size}")
+            with ThreadPoolExecutor(max_workers=max(1, concurrency)) as executor:
+                pages.extend(executor.map(fetch_page, range(2, page_count + 1)))
+
+        # A single page is already a complete GMP response
+        if page_count == 1:
+            os.replace(pages[0], file_path)
+            return [file_path]
+        if output == "pages":
+            return _save_pages(pages, file_path)
+        return [_stitch_pages(report_id, pages, file_path)]
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+# Moves every page to its own numbered file
+def _save_pages(pages: list, file_path: str) -> list:
+    base, ext = os.path.splitext(file_path)
+    paths = []
+    for number, page_path in enumerate(pages, start=1):
+        target = f"{base}_p{number:04d}{ext}"
+        os.replace(page_path, target)
+        paths.append(target)
+    return paths
+
+# Concatenates the pages into one document, in page order
+def _stitch_pages(report_id: str, pages: list, file_path: str) -> str:
+    fd, tmp_path = tempfile.mkstemp(prefix=".", suffix=".part", dir=os.path.dirname(file_path) or ".")
+    try:
+        with os.fdopen(fd, "wb") as out:
+            out.write(f'<report_pages report_id="{report_id}" pages="{len(pages)}">\n'.encode("utf-8"))
+            for page_path in pages:
+                with open(page_path, "rb") as page:
+                    _skip_xml_declaration(page)
+                    shutil.copyfileobj(page, out, 1024 * 1024)
+                out.write(b"\n")
+            out.write(b"</report_pages>\n")
+        os.replace(tmp_path, file_path)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return file_path
+
+# Positions the file after a leading <?xml ...?> declaration, if any
+def _skip_xml_declaration(page) -> None:
+    head = page.read(256)
+    offset = 0
+    stripped = head.lstrip()
+    if stripped.startswith(b"<?xml"):
+        offset = head.index(b"?>") + 2
+    page.seek(offset)
@@ -0,0 +1,179 @@
+# app/api/modules/greenbone/services/report_streaming.py
+
+##################################################################
+# Importing packages                                             #
+##################################################################
+
+import os
+import json
+import shutil
+import asyncio
+import logging
+import tempfile
+from typing import Iterator, Dict
+
+import xmltodict
+from lxml import etree
+
+from app.api.core.config import DETAILED_REPORTS_DIR, STREAM_CHUNK_BYTES
+from app.api.modules.greenbone.services.scan_service import run_gvm_command_to_file
+from app.api.modules.greenbone.services.report_pages import fetch_report_paginated
+from app.api.modules.greenbone.services.report_inventory import inventory
+from app.api.modules.greenbone.services.report_listing import report_listing_command
+from app.api.modules.greenbone.utils.xml_parser import parse_large_xml
+from app.api.modules.greenbone.utils.report_archive import open_report_xml
+from app.api.modules.greenbone.utils.state_store import state_store
+
+##################################################################
+# Create a Logger                                                #
+##################################################################
+
+logger = logging.getLogger(__name__)
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+##################################################################
+# Encoding records in chunks                                     #
+##################################################################
+
+# One compact JSON document per record
+def _dumps(record) -> str:
+    return json.dumps(record, ensure_ascii=False, separators=(",", ":"))
+
+def ndjson_chunks(records, chunk_bytes: int = STREAM_CHUNK_BYTES) -> Iterator[bytes]:
+    """
+    Encodes records as NDJSON. Lines are collected into chunks of about
+    chunk_bytes, so the response is not flushed (and, for sync iterators,
+    handed over from the thread pool) once per record.
+    """
+    lines = []
+    size = 0
+    for record in records:
+        line = _dumps(record) + "\n"
+        lines.append(line)
+        size += len(line)
+        if size >= chunk_bytes:
+            yield "".join(lines).encode("utf-8")
+            lines = []
+            size = 0
+    if lines:
+        yield "".join(lines).encode("utf-8")
+
+def json_array_chunks(records, key: str, extra: dict = None, chunk_bytes: int = STREAM_CHUNK_BYTES) -> Iterator[bytes]:
+    """
+    Encodes {**extra, key: [records]} as one JSON document, written one record
+    at a time in chunks of about chunk_bytes.
+    """
+    head = _dumps(extra or {})[:-1]
+    parts = [f'{head}{"," if extra else ""}"{key}":[']
+    size = len(parts[0])
+    first = True
+    for record in records:
+        part = ("" if first else ",") + _dumps(record)
+        first = False
+        parts.append(part)
+        size += len(part)
+        if size >= chunk_bytes:
+            yield "".join(parts).encode("utf-8")
+            parts = []
+            size = 0
+    parts.append("]}")
+    yield "".join(parts).encode("utf-8")
+
+##################################################################
+# Report listings                                                #
+##################################################################
+
+# Fetches a listing command's raw response into a temporary file
+async def fetch_listing_to_file(xml_command: str) -> str:
+    fd, path = tempfile.mkstemp(prefix=".listing_", suffix=".part")
+    os.close(fd)
+    try:
+        await asyncio.to_thread(run_gvm_command_to_file, xml_command, path)
+    except Exception:
+        os.remove(path)
+        raise
+    return path
+
+def iter_listing_file(path: str, remove: bool = True) -> Iterator[Dict]:
+    """
+    Streams the <report> elements of a saved <get_reports_response> and yields
+    each one as the dict xmltodict would have produced for it, so streamed and
+    buffered listings look the same. Only one report is in memory at a time;
+    the file is removed once it has been read (or the consumer went away).
+    """
+    try:
+        for _, elem in etree.iterparse(path, events=("end",), tag="report", huge_tree=True):
+            parent = elem.getparent()
+            # Only the top-level reports; every one of them has a nested <report> too
+            if parent is None or parent.getparent() is not None:
+                continue
+            yield xmltodict.parse(etree.tostring(elem))["report"]
+            elem.clear(keep_tail=False)
+            while elem.getprevious() is not None:
+                del parent[0]
+    finally:
+        if remove and os.path.exists(path):
+            os.remove(path)
+
+async def open_listing_stream(report_filter: str = None) -> Iterator[Dict]:
+    """
+    Returns the reports of a listing as a lazy iterator. Without a filter they
+    come from the inventory snapshot, which is in memory anyway; gvmd's answer
+    to a filtered listing is saved to a temporary file and read back one
+    report at a time. Anything that can fail against gvmd happens before this
+    returns, so errors still become a proper HTTP status.
+    """
+    if report_filter is None:
+        return iter((await inventory.get_async()).reports)
+    return iter_listing_file(await fetch_listing_to_file(report_listing_command(report_filter)))
+
+##################################################################
+# Vulnerabilities of one report                                  #
+##################################################################
+
+# XML files of the report on disk, fetched or archived, in page order
+def local_report_files(report_id: str) -> list:
+    report = state_store.get_report(report_id)
+    if report is None:
+        return []
+    paths = report["xml_paths"]
+    # Retention may have removed some pages; a partial report is not served
+    if not paths or not all(os.path.exists(path) for path in paths):
+        return []
+    return paths
+
+# Streams the vulnerabilities of a list of (possibly compressed) XML files
+def iter_report_vulnerabilities(paths: list, cleanup: str = None) -> Iterator[Dict]:
+    try:
+        for path in paths:
+            with open_report_xml(path) as f:
+                yield from parse_large_xml(f)
+    finally:
+        if cleanup:
+            shutil.rmtree(cleanup, ignore_errors=True)
+
+async def open_vulnerability_stream(report_id: str) -> tuple:
+    """
+    Returns the vulnerability records of a report as a lazy iterator and where
+    they come from. The XML the pipeline keeps (fetched or archived) is used
+    when it is there; otherwise the report is fetched from gvmd into a
+    temporary directory first, which is removed once the stream is consumed.
+    Either way the XML goes through the streaming parser, so memory use does
+    not depend on the report size.
+    """
+    paths = local_report_files(report_id)
+    if paths:
+        return iter_report_vulnerabilities(paths), "local"
+    # A dot-directory, so the parse stage never picks up the files; the worker
+    # may not have created DETAILED_REPORTS_DIR yet on a fresh install
+    os.makedirs(DETAILED_REPORTS_DIR, exist_ok=True)
+    work_dir = tempfile.mkdtemp(prefix=".stream_", dir=DETAILED_REPORTS_DIR)
+    try:
+        paths = await asyncio.to_thread(
+            fetch_report_paginated, report_id, os.path.join(work_dir, f"{report_id}.xml"), output="pages"
+        )
+    except Exception:
+        shutil.rmtree(work_dir, ignore_errors=True)
+        raise
+    return iter_report_vulnerabilities(paths, cleanup=work_dir), "gvmd"
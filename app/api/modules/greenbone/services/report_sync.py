@@ -0,0 +1,136 @@
+# app/api/modules/greenbone/services/report_sync.py
+
+##################################################################
+# Importing packages                                             #
+##################################################################
+
+import logging
+import datetime
+
+from app.api.core.config import SYNC_WATERMARK_OVERLAP_SECONDS
+from app.api.modules.greenbone.services import scan_service
+from app.api.modules.greenbone.utils.state_store import PipelineStateStore, state_store
+
+##################################################################
+# Create a Logger                                                #
+##################################################################
+
+logger = logging.getLogger(__name__)
+
+##################################################################
+# Delta query                                                    #
+##################################################################
+
+# Lists reports modified after the given time, without result details
+def delta_reports_command(modified_after: str = None) -> str:
+    report_filter = "first=1 rows=-1 sort=modified"
+    if modified_after:
+        report_filter = f"modified>{modified_after} {report_filter}"
+    return f'<get_reports details="0" ignore_pagination="1" filter="{report_filter}"/>'
+
+# Parses a gvmd timestamp to an aware UTC datetime; None if it is not ISO 8601
+def _parse_time(timestamp: str):
+    try:
+        parsed = datetime.datetime.fromisoformat(timestamp.replace("Z", "+00:00"))
+    except (AttributeError, ValueError):
+        return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=datetime.timezone.utc)
+    return parsed.astimezone(datetime.timezone.utc)
+
+# UTC timestamp in the format gvmd filters accept
+def _format_time(parsed: datetime.datetime) -> str:
+    return parsed.strftime("%Y-%m-%dT%H:%M:%SZ")
+
+# Moves an ISO timestamp back by the configured overlap
+def _with_overlap(timestamp: str, overlap: int) -> str:
+    parsed = _parse_time(timestamp)
+    if parsed is None:
+        return timestamp
+    return _format_time(parsed - datetime.timedelta(seconds=overlap))
+
+##################################################################
+# Incremental sync                                               #
+##################################################################
+
+class ReportSync:
+    """
+    Incremental sync of the report listing.
+
+    Keeps a high-water mark of the newest report modification time (in UTC)
+    and, per report, the modification time it had when we last fetched it,
+    both in the pipeline state store. Each sync() only asks gvmd for reports
+    modified since the watermark, so a cycle costs O(new or changed reports)
+    instead of O(all reports).
+    """
+    def __init__(self, store: PipelineStateStore = state_store, overlap: int = SYNC_WATERMARK_OVERLAP_SECONDS):
+        self._store = store
+        self._overlap = overlap
+
+    @property
+    def watermark(self) -> str:
+        return self._store.get_meta("watermark")
+
+    def sync(self) -> dict:
+        """
+        Pulls the reports modified since the watermark and records them.
+        Returns {report_id: task_id} for the reports that are new or changed.
+        """
+        watermark = self.watermark
+        modified_after = _with_overlap(watermark, self._overlap) if watermark else None
+        response = scan_service.run_gvm_command(delta_reports_command(modified_after))
+        reports = response.get("get_reports_response", {}).get("report", [])
+        if not isinstance(reports, list):
+            reports = [reports]
+
+        listed = []
+        # gvmd writes times in the user's timezone, so offsets change with DST;
+        # they are compared as UTC datetimes, never as strings
+        newest = _parse_time(watermark) if watermark else None
+        for report in reports:
+            report_id = report.get("@id")
+            task_id = (report.get("task") or {}).get("@id")
+            modified = report.get("modification_time") or ""
+            if not report_id or not task_id:
+                continue
+            listed.append((report_id, task_id, modified))
+            modified_at = _parse_time(modified)
+            if modified_at is not None and (newest is None or modified_at > newest):
+                newest = modified_at
+        changed_ids = self._store.record_listed(listed)
+        if newest is not None and _format_time(newest) != watermark:
+            self._store.set_meta("watermark", _format_time(newest))
+
+        tasks = {report_id: task_id for report_id, task_id, _ in listed}
+        changed = {report_id: tasks[report_id] for report_id in changed_ids}
+        logger.info(
+            f"Delta sync since {modified_after or 'the beginning'}: "
+            f"{len(reports)} listed, {len(changed)} new or changed."
+        )
+        return changed
+
+    def mapping(self) -> dict:
+        """
+        Returns the report-task mapping of every report seen so far.
+        """
+        return self._store.report_task_mapping()
+
+    def pending(self) -> dict:
+        """
+        Returns the reports whose current version has not been fetched yet as
+        {report_id: {"modified": ..., "refetch": ...}}. refetch is True if an
+        older version of the report was fetched before.
+        """
+        return self._store.pending_fetch()
+
+    def mark_fetched(self, report_id: str, modified: str) -> None:
+        """
+        Records that the version of the report with the given modification time is on disk.
+        """
+        self._store.set_fetched_version(report_id, modified)
+
+##################################################################
+# Shared sync instance                                           #
+##################################################################
+
+report_sync = ReportSync()
@@ -0,0 +1,327 @@
+# app/api/modules/greenbone/services/resource_resolver.py
+
+##################################################################
+# Importing packages                                             #
+##################################################################
+
+import re
+import time
+import asyncio
+import logging
+import ipaddress
+
+from app.api.core.config import (
+    RESOURCE_CACHE_TTL_SECONDS,
+    REUSE_TARGETS,
+    DEFAULT_PORT_LIST_ID,
+    DEFAULT_SCAN_CONFIG_ID
+)
+from app.api.modules.greenbone.services import async_gmp
+from app.api.modules.greenbone.services.gmp_pool import GmpCommandError
+from app.api.modules.greenbone.services.report_listing import UUID_PATTERN
+from app.api.modules.greenbone.utils.metrics import observe_resource_lookup, observe_resource_load
+
+##################################################################
+# Create a Logger                                                #
+##################################################################
+
+logger = logging.getLogger(__name__)
+
+# Listing command and response element of every resource kind
+RESOURCE_COMMANDS = {
+    "target": ('<get_targets filter="first=1 rows=-1"/>', "get_targets_response"),
+    "port_list": ('<get_port_lists filter="first=1 rows=-1"/>', "get_port_lists_response"),
+    "config": ('<get_configs filter="first=1 rows=-1"/>', "get_configs_response")
+}
+
+# Target settings that change what a scan does; targets using any of them are never reused
+TARGET_CREDENTIALS = ("ssh_credential", "smb_credential", "esxi_credential", "snmp_credential")
+
+##################################################################
+# Normalizing target hosts                                       #
+##################################################################
+
+# One host entry as gvmd would compare it: addresses and networks in canonical form, names lowercased
+def _normalize_host(entry: str) -> str:
+    try:
+        network = ipaddress.ip_network(entry, strict=False)
+    except ValueError:
+        return entry.lower()
+    if network.num_addresses == 1:
+        return str(network.network_address)
+    return str(network)
+
+def normalize_hosts(hosts: str) -> tuple:
+    """
+    The set of hosts of a gvmd hosts string, sorted, so "10.0.0.2, 10.0.0.1"
+    and "10.0.0.1,10.0.0.2/32" give the same target key.
+    """
+    entries = (entry.strip() for entry in re.split(r"[,\s]+", hosts or ""))
+    return tuple(sorted({_normalize_host(entry) for entry in entries if entry}))
+
+# Key a target is reused by
+def target_key(hosts: str, port_list_id: str) -> tuple:
+    return normalize_hosts(hosts), port_list_id
+
+# Text of an element xmltodict gave us; empty elements come back as None
+def _text(value) -> str:
+    if isinstance(value, dict):
+        value = value.get("#text")
+    return value or ""
+
+def _as_list(value) -> list:
+    if value is None:
+        return []
+    return value if isinstance(value, list) else [value]
+
+##################################################################
+# The resource cache                                             #
+##################################################################
+
+class ResourceResolver:
+    """
+    Caches the targets, port lists and scan configs of gvmd, so a scan does
+    not cost extra listings and scan configs and port lists can be named
+    instead of looked up by hand.
+
+    Listings are loaded on first use and reloaded after `ttl` seconds, or
+    right away when a name is not found. Targets are indexed by their
+    normalized hosts and port list: a scan whose target already exists uses
+    it instead of adding one more target to gvmd. Targets created or deleted
+    through the resolver update the cache at once; changes made elsewhere
+    are picked up with the next reload.
+    """
+    def __init__(self, ttl: float = RESOURCE_CACHE_TTL_SECONDS, reuse_targets: bool = REUSE_TARGETS):
+        self._ttl = ttl
+        self._reuse_targets = reuse_targets
+        self._tables = {}
+        self._async_locks = {}
+        self._creating = {}
+        self._stats = {"hits": 0, "misses": 0, "loads": 0, "targets_reused": 0, "targets_created": 0}
+
+    def _count(self, kind: str, result: str) -> None:
+        self._stats["hits" if result == "hit" else "misses"] += 1
+        observe_resource_lookup(kind, result)
+
+    def _fresh(self, kind: str):
+        table = self._tables.get(kind)
+        if table is not None and time.time() - table["loaded_at"] < self._ttl:
+            return table
+        return None
+
+    async def _table(self, kind: str, reload: bool = False) -> dict:
+        """
+        Returns the cached listing of a resource kind, loading it when it
+        expired (or reload is set). Concurrent callers share one load.
+        """
+        table = None if reload else self._fresh(kind)
+        if table is not None:
+            return table
+        loop = asyncio.get_running_loop()
+        lock = self._async_locks.setdefault((loop, kind), asyncio.Lock())
+        started = time.time()
+        async with lock:
+            table = self._tables.get(kind)
+            # Someone else loaded it while we waited for the lock
+            if table is not None and table["loaded_at"] >= started:
+                return table
+            if not reload:
+                table = self._fresh(kind)
+                if table is not None:
+                    return table
+            table = await self._load(kind)
+        return table
+
+    async def _load(self, kind: str) -> dict:
+        command, response_tag = RESOURCE_COMMANDS[kind]
+        response = await async_gmp.run_gvm_command(command)
+        items = [
+            self._item(kind, element)
+            for element in _as_list(response.get(response_tag, {}).get(kind))
+        ]
+        if kind == "target":
+            index = {item["key"]: item["id"] for item in items if item["reusable"]}
+        else:
+            index = {item["name"].lower(): item["id"] for item in items if item["name"]}
+        table = {"loaded_at": time.time(), "items": items, "index": index}
+        self._tables[kind] = table
+        self._stats["loads"] += 1
+        observe_resource_load(kind)
+        logger.info(f"Loaded {len(items)} {kind} entries from gvmd.")
+        return table
+
+    @staticmethod
+    def _item(kind: str, element: dict) -> dict:
+        item = {"id": element.get("@id"), "name": _text(element.get("name"))}
+        if kind != "target":
+            item["comment"] = _text(element.get("comment"))
+            return item
+        port_list_id = (element.get("port_list") or {}).get("@id")
+        item.update(hosts=_text(element.get("hosts")), port_list_id=port_list_id)
+        item["key"] = target_key(item["hosts"], port_list_id)
+        item["reusable"] = not _text(element.get("exclude_hosts")) and not any(
+            (element.get(credential) or {}).get("@id") for credential in TARGET_CREDENTIALS
+        )
+        return item
+
+    async def _resolve(self, kind: str, value: str, default: str) -> str:
+        # IDs are passed through unchecked, gvmd rejects unknown ones anyway
+        if not value:
+            return default
+        value = value.strip()
+        if UUID_PATTERN.match(value):
+            return value
+        table = await self._table(kind)
+        resource_id = table["index"].get(value.lower())
+        if resource_id is None:
+            # Maybe created since the last load
+            table = await self._table(kind, reload=True)
+            resource_id = table["index"].get(value.lower())
+        if resource_id is None:
+            self._count(kind, "miss")
+            raise LookupError(f"Unknown {kind.replace('_', ' ')} {value!r}")
+        self._count(kind, "hit")
+        return resource_id
+
+    async def resolve_config(self, value: str = None) -> str:
+        """
+        ID of a scan config given by ID or name (case-insensitive), e.g. "Full and fast".
+        """
+        return await self._resolve("config", value, DEFAULT_SCAN_CONFIG_ID)
+
+    async def resolve_port_list(self, value: str = None) -> str:
+        """
+        ID of a port list given by ID or name (case-insensitive), e.g. "All IANA assigned TCP".
+        """
+        return await self._resolve("port_list", value, DEFAULT_PORT_LIST_ID)
+
+    async def get_or_create_target(self, name: str, hosts: str, port_list_id: str = DEFAULT_PORT_LIST_ID) -> tuple:
+        """
+        Returns (target_id, reused): an existing target with the same hosts
+        and port list, or a new one named `name`. Concurrent requests for the
+        same hosts wait for one creation instead of each adding a target.
+        """
+        if not self._reuse_targets:
+            return await self._create_target(name, hosts, port_list_id, None), False
+        key = target_key(hosts, port_list_id)
+        table = await self._table("target")
+        target_id = table["index"].get(key)
+        if target_id is not None:
+            self._count("target", "hit")
+            self._stats["targets_reused"] += 1
+            return target_id, True
+        pending_key = (asyncio.get_running_loop(), key)
+        pending = self._creating.get(pending_key)
+        if pending is not None:
+            target_id = await asyncio.shield(pending)
+            self._count("target", "hit")
+            self._stats["targets_reused"] += 1
+            return target_id, True
+        task = asyncio.get_running_loop().create_task(self._create_target(name, hosts, port_list_id, key))
+        self._creating[pending_key] = task
+        task.add_done_callback(lambda _: self._creating.pop(pending_key, None))
+        return await asyncio.shield(task), False
+
+    async def _create_target(self, name: str, hosts: str, port_list_id: str, key) -> str:
+        target_id = await async_gmp.create_target(name, hosts, port_list_id)
+        observe_resource_lookup("target", "created")
+        self._stats["targets_created"] += 1
+        table = self._tables.get("target")
+        if key is not None and table is not None and target_id:
+            table["items"].append(
+                {"id": target_id, "name": name, "hosts": hosts, "port_list_id": port_list_id, "key": key, "reusable": True}
+            )
+            table["index"][key] = target_id
+        return target_id
+
+    def forget_target(self, target_id: str) -> None:
+        """
+        Drops a target from the cache, e.g. after gvmd no longer knew it.
+        """
+        table = self._tables.get("target")
+        if table is None:
+            return
+        table["items"] = [item for item in table["items"] if item["id"] != target_id]
+        table["index"] = {key: value for key, value in table["index"].items() if value != target_id}
+
+    async def delete_target(self, target_id: str) -> None:
+        """
+        Deletes a target in gvmd and drops it from the cache.
+        """
+        await async_gmp.delete_target(target_id)
+        self.forget_target(target_id)
+
+    async def entries(self, kind: str) -> list:
+        """
+        The cached entries of a resource kind, without the internal lookup keys.
+        """
+        table = await self._table(kind)
+        return [{key: value for key, value in item.items() if key != "key"} for item in table["items"]]
+
+    def invalidate(self, kind: str = None) -> None:
+        if kind is None:
+            self._tables.clear()
+        else:
+            self._tables.pop(kind, None)
+
+    def stats(self) -> dict:
+        """
+        Lookup counters and the age and size of every cached listing.
+        """
+        lookups = self._stats["hits"] + self._stats["misses"]
+        now = time.time()
+        return dict(
+            self._stats,
+            hit_ratio=round(self._stats["hits"] / lookups, 3) if lookups else None,
+            ttl_seconds=self._ttl,
+            reuse_targets=self._reuse_targets,
+            listings={
+                kind: {"entries": len(table["items"]), "age_seconds": round(now - table["loaded_at"], 1)}
+                for kind, table in self._tables.items()
+            }
+        )
+
+##################################################################
+# Shared resolver instance                                       #
+##################################################################
+
+resolver = ResourceResolver()
+
+##################################################################
+# Preparing a scan                                               #
+##################################################################
+
+async def prepare_scan_task(
+    target_name: str,
+    hosts: str,
+    scan_config: str = None,
+    port_list: str = None,
+    progress: dict = None
+) -> dict:
+    """
+    Resolves the scan config and port list, finds or creates the target and
+    creates the task. Returns target_id, target_reused and task_id. `progress`
+    (if given) is updated as it goes, so on failure it holds the step that
+    failed and the IDs known by then.
+
+    A reused target may have been deleted in gvmd since the cache was loaded;
+    the task is then retried once on a new target.
+    """
+    progress = {} if progress is None else progress
+    progress["step"] = "resolve"
+    config_id = await resolver.resolve_config(scan_config)
+    port_list_id = await resolver.resolve_port_list(port_list)
+    for attempt in (1, 2):
+        progress["step"] = "create_target"
+        target_id, reused = await resolver.get_or_create_target(target_name, hosts, port_list_id)
+        progress.update(step="create_task", target_id=target_id, target_reused=reused)
+        try:
+            task_id = await async_gmp.create_task(f"{target_name} Scan", target_id, config_id)
+        except GmpCommandError as e:
+            if not reused or attempt == 2 or e.status != "404":
+                raise
+            logger.warning(f"Cached target {target_id} is gone in gvmd, creating a new one: {e}")
+            resolver.forget_target(target_id)
+            continue
+        progress["task_id"] = task_id
+        return {"target_id": target_id, "target_reused": reused, "task_id": task_id}
@@ -0,0 +1,223 @@
+# app/api/modules/greenbone/services/scan_batch.py
+
+##################################################################
+# Importing packages                                             #
+##################################################################
+
+import time
+import uuid
+import asyncio
+import logging
+import datetime
+from collections import OrderedDict
+
+from app.api.core.config import (
+    GMP_ASYNC_POOL_SIZE,
+    SCAN_BATCH_CONCURRENCY,
+    SCAN_BATCH_HISTORY
+)
+from app.api.modules.greenbone.services import async_gmp
+from app.api.modules.greenbone.services.resource_resolver import prepare_scan_task
+
+##################################################################
+# Create a Logger                                                #
+##################################################################
+
+logger = logging.getLogger(__name__)
+
+# ISO timestamp of a time.time() value
+def _iso(timestamp: float) -> str:
+    return datetime.datetime.fromtimestamp(timestamp, datetime.timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+##################################################################
+# A batch of scans                                               #
+##################################################################
+
+class ScanBatch:
+    """
+    The scans of one POST /scans/batch and the outcome of every item.
+    Item status moves from "pending" to "created" (target and task exist),
+    "scheduled" (start waiting for its slot), "started" or "failed"; failed
+    items record the step that failed and keep the IDs created before it.
+    """
+    def __init__(self, items: list, start: bool, stagger: float):
+        self.batch_id = str(uuid.uuid4())
+        self.created_at = time.time()
+        self.start = start
+        self.stagger = stagger
+        self.items = [
+            {
+                "index": index,
+                "target_name": item["target_name"],
+                "status": "pending",
+                "target_id": None,
+                "target_reused": None,
+                "task_id": None,
+                "report_id": None,
+                "start_at": None,
+                "error": None,
+                "failed_step": None
+            }
+            for index, item in enumerate(items)
+        ]
+        self._requests = items
+        self._start_times = {}
+        self._runner = None
+        self._starter = None
+
+    @property
+    def done(self) -> bool:
+        return all(item["status"] in ("created", "started", "failed") for item in self.items) and all(
+            task is None or task.done() for task in (self._runner, self._starter)
+        )
+
+    def as_dict(self) -> dict:
+        counts = {}
+        for item in self.items:
+            counts[item["status"]] = counts.get(item["status"], 0) + 1
+        return {
+            "batch_id": self.batch_id,
+            "created_at": _iso(self.created_at),
+            "done": self.done,
+            "submitted": len(self.items),
+            "counts": counts,
+            "results": self.items
+        }
+
+    # Marks the items that never got their outcome, e.g. when the batch was cancelled
+    def _fail_unfinished(self, error: str) -> None:
+        for item in self.items:
+            if item["status"] in ("pending", "scheduled"):
+                item.update(status="failed", failed_step=item["failed_step"] or "batch", error=error)
+
+    async def _step(self, item: dict, step: str, call):
+        # Runs one GMP call for an item; a failure is recorded on the item and re-raised
+        try:
+            return await call
+        except Exception as e:
+            item.update(status="failed", failed_step=step, error=str(e))
+            logger.warning(f"Batch {self.batch_id}: {step} failed for '{item['target_name']}': {e}")
+            raise
+
+    async def _create(self, index: int, slots: asyncio.Semaphore) -> None:
+        request = self._requests[index]
+        item = self.items[index]
+        progress = {}
+        async with slots:
+            try:
+                await prepare_scan_task(
+                    request["target_name"],
+                    request["hosts"],
+                    request.get("scan_config_id") or request.get("scan_config"),
+                    request.get("port_list"),
+                    progress
+                )
+            except Exception as e:
+                item.update(
+                    status="failed",
+                    failed_step=progress.get("step"),
+                    error=str(e),
+                    target_id=progress.get("target_id"),
+                    target_reused=progress.get("target_reused")
+                )
+                logger.warning(f"Batch {self.batch_id}: {progress.get('step')} failed for '{item['target_name']}': {e}")
+                return
+        item.update(
+            status="created",
+            target_id=progress["target_id"],
+            target_reused=progress["target_reused"],
+            task_id=progress["task_id"]
+        )
+
+    async def _start(self, item: dict) -> None:
+        try:
+            item["report_id"] = await self._step(item, "start_task", async_gmp.start_task(item["task_id"]))
+        except Exception:
+            return
+        item["status"] = "started"
+
+    async def _start_staggered(self, items: list) -> None:
+        # One start per slot; the slots were announced to the client as start_at
+        try:
+            for item in items:
+                await asyncio.sleep(max(0.0, self._start_times[item["index"]] - time.time()))
+                await self._start(item)
+        except asyncio.CancelledError:
+            self._fail_unfinished("Batch cancelled before the start")
+            raise
+        logger.info(f"Batch {self.batch_id}: all staggered starts sent.")
+
+    async def run(self, concurrency: int) -> None:
+        """
+        Creates every target and task, up to `concurrency` items at once, so the
+        GMP round trips of different items overlap on the pooled sessions. Then
+        starts the created tasks: all at once without a stagger, otherwise one
+        every `stagger` seconds from a background task, so the HTTP request does
+        not wait for the last slot.
+        """
+        slots = asyncio.Semaphore(max(1, min(concurrency, GMP_ASYNC_POOL_SIZE)))
+        await asyncio.gather(*(self._create(index, slots) for index in range(len(self.items))))
+        created = [item for item in self.items if item["status"] == "created"]
+        if not self.start or not created:
+            return
+        if self.stagger <= 0:
+            async def start(item: dict) -> None:
+                async with slots:
+                    await self._start(item)
+            await asyncio.gather(*(start(item) for item in created))
+            return
+        now = time.time()
+        for position, item in enumerate(created):
+            self._start_times[item["index"]] = now + position * self.stagger
+            item.update(status="scheduled", start_at=_iso(self._start_times[item["index"]]))
+        self._starter = asyncio.get_running_loop().create_task(self._start_staggered(created))
+
+    def launch(self, concurrency: int) -> asyncio.Task:
+        """
+        Runs the batch in its own task, which finishes even if the caller is cancelled.
+        """
+        self._runner = asyncio.get_running_loop().create_task(self._run_logged(concurrency))
+        return self._runner
+
+    async def _run_logged(self, concurrency: int) -> None:
+        started = time.perf_counter()
+        try:
+            await self.run(concurrency)
+        except asyncio.CancelledError:
+            self._fail_unfinished("Batch cancelled")
+            raise
+        except Exception as e:
+            logger.error(f"Batch {self.batch_id} failed: {e}")
+            self._fail_unfinished(str(e))
+        logger.info(
+            f"Batch {self.batch_id}: {len(self.items)} scans processed in {time.perf_counter() - started:.1f}s: "
+            f"{self.as_dict()['counts']}"
+        )
+
+##################################################################
+# Batches kept for status requests                               #
+##################################################################
+
+_batches = OrderedDict()
+
+async def submit_scan_batch(items: list, start: bool = True, stagger: float = 0.0, concurrency: int = SCAN_BATCH_CONCURRENCY) -> ScanBatch:
+    """
+    Runs a batch of scan requests (dicts with target_name, hosts and
+    optionally scan_config_id or scan_config and port_list) and keeps it
+    for get_scan_batch().
+    """
+    batch = ScanBatch(items, start, stagger)
+    _batches[batch.batch_id] = batch
+    # Forget the oldest finished batches
+    while len(_batches) > SCAN_BATCH_HISTORY:
+        oldest = next((key for key, value in _batches.items() if value.done), None)
+        if oldest is None:
+            break
+        del _batches[oldest]
+    # The batch runs as its own task: a client that disconnects cancels the
+    # request, not the batch, so no item is left half-created or "pending"
+    await asyncio.shield(batch.launch(concurrency))
+    return batch
+
+def get_scan_batch(batch_id: str) -> ScanBatch:
+    return _batches.get(batch_id)
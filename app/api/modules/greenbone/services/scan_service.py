@@ -4,15 +4,23 @@
 # Importing packages                                             #
 ##################################################################
 
+import os
+import time
+import tempfile
 import subprocess
 import xmltodict
 import logging
+from xml.sax.saxutils import escape, quoteattr
 
 from app.api.core.config import (
     GVM_SOCKET_PATH,
     USER,
-    PASSWORD
+    PASSWORD,
+    GMP_BACKEND,
+    DEFAULT_PORT_LIST_ID
 )
+from app.api.modules.greenbone.services.gmp_pool import get_pool, command_name
+from app.api.modules.greenbone.utils.metrics import observe_gmp_command
 
 ##################################################################
 # Create a Logger                                                #
@@ -35,7 +43,73 @@ SOCKET_PATH = GVM_SOCKET_PATH
 # Main function to run gvm commands
 def run_gvm_command(xml_command: str) -> dict:
     """
-    Executes a gvm-cli command using the Unix socket and returns the parsed XML response.
+    Executes a GMP command over the configured backend and returns the parsed XML response.
+    """
+    output = run_gvm_command_raw(xml_command)
+    # Parse the XML output into a dictionary for easy processing.
+    result = xmltodict.parse(output)
+    return result
+
+# Runs a gvm command and returns the raw XML bytes
+def run_gvm_command_raw(xml_command: str, backend: str = None) -> bytes:
+    """
+    Executes a GMP command and returns the unparsed response.
+    The backend is GMP_BACKEND unless given explicitly: "socket" uses the shared
+    session pool, "cli" spawns gvm-cli (kept as a fallback and for latency comparison).
+    """
+    backend = backend or GMP_BACKEND
+    command = command_name(xml_command)
+    started = time.perf_counter()
+    try:
+        if backend == "cli":
+            output = _run_gvm_cli(xml_command)
+        else:
+            output = get_pool().run_command(xml_command)
+    except Exception as e:
+        observe_gmp_command(command, backend, "sync", time.perf_counter() - started, ok=False)
+        if backend != "cli":
+            logger.error(f"Error running GMP command <{command}>: {e}")
+        raise
+    elapsed = time.perf_counter() - started
+    observe_gmp_command(command, backend, "sync", elapsed, len(output))
+    logger.debug(f"GMP command <{command}> via {backend} took {elapsed:.3f}s")
+    return output
+
+# Runs a gvm command and writes the raw response to a file
+def run_gvm_command_to_file(xml_command: str, file_path: str, backend: str = None) -> int:
+    """
+    Streams the unparsed response of a GMP command into file_path.
+    The data goes to a temporary file in the same directory first and is renamed
+    into place once complete, so readers never see a partial file.
+    Returns the number of bytes written.
+    """
+    backend = backend or GMP_BACKEND
+    started = time.perf_counter()
+    fd, tmp_path = tempfile.mkstemp(prefix=".", suffix=".part", dir=os.path.dirname(file_path) or ".")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            if backend == "cli":
+                written = _stream_gvm_cli(xml_command, f)
+            else:
+                written = get_pool().stream_command(xml_command, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, file_path)
+    except Exception as e:
+        observe_gmp_command(command_name(xml_command), backend, "sync", time.perf_counter() - started, ok=False)
+        logger.error(f"Error streaming GMP command <{command_name(xml_command)}> to {file_path}: {e}")
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    elapsed = time.perf_counter() - started
+    observe_gmp_command(command_name(xml_command), backend, "sync", elapsed, written)
+    logger.debug(f"GMP command <{command_name(xml_command)}> via {backend} wrote {written} bytes in {elapsed:.3f}s")
+    return written
+
+# Legacy backend: one gvm-cli process per command
+def _run_gvm_cli(xml_command: str) -> bytes:
+    """
+    Executes a gvm-cli command using the Unix socket and returns the raw XML output.
     """
     try:
         cmd = [
@@ -47,14 +121,74 @@ def run_gvm_command(xml_command: str) -> dict:
             "--xml", xml_command
         ]
         logger.debug(f"Running command: {' '.join(cmd)}")
-        output = subprocess.check_output(cmd, stderr=subprocess.STDOUT)
-        # Parse the XML output into a dictionary for easy processing.
-        result = xmltodict.parse(output)
-        return result
+        return subprocess.check_output(cmd, stderr=subprocess.STDOUT)
     except subprocess.CalledProcessError as e:
         logger.error(f"Error running gvm-cli command: {e.output.decode()}")
         raise
 
+# Legacy backend, streaming the gvm-cli output instead of buffering it
+def _stream_gvm_cli(xml_command: str, fileobj, chunk_size: int = 64 * 1024) -> int:
+    cmd = [
+        "gvm-cli",
+        "--gmp-username", USER,
+        "--gmp-password", PASSWORD,
+        "socket",
+        "--socketpath", SOCKET_PATH,
+        "--xml", xml_command
+    ]
+    written = 0
+    # stderr goes to a file rather than a second pipe: nobody reads that pipe
+    # while stdout is streamed, so a chatty gvm-cli would block once it is full
+    with tempfile.TemporaryFile() as errors:
+        with subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=errors) as process:
+            for chunk in iter(lambda: process.stdout.read(chunk_size), b""):
+                fileobj.write(chunk)
+                written += len(chunk)
+            process.wait()
+        errors.seek(0)
+        stderr = errors.read()
+    if process.returncode != 0:
+        logger.error(f"Error running gvm-cli command: {stderr.decode()}")
+        raise subprocess.CalledProcessError(process.returncode, cmd, stderr=stderr)
+    return written
+
+##################################################################
+# GMP command builders (shared with the async client)            #
+##################################################################
+
+# Names and hosts come from API callers, so text is escaped and attributes quoted
+def create_target_command(name: str, hosts: str, port_list_id: str = DEFAULT_PORT_LIST_ID) -> str:
+    return (
+        f"<create_target>"
+        f"<name>{escape(name)}</name>"
+        f"<hosts>{escape(hosts)}</hosts>"
+        f"<port_list id={quoteattr(port_list_id)}/>"
+        f"</create_target>"
+    )
+
+def delete_target_command(target_id: str) -> str:
+    # Quoted and escaped, so the id cannot add attributes such as ultimate="1"
+    return f"<delete_target target_id={quoteattr(target_id)}/>"
+
+def create_task_command(name: str, target_id: str, scan_config_id: str) -> str:
+    return (
+        f"<create_task>"
+        f"<name>{escape(name)}</name>"
+        f"<config id={quoteattr(scan_config_id)}/>"
+        f"<target id={quoteattr(target_id)}/>"
+        f"</create_task>"
+    )
+
+def start_task_command(task_id: str) -> str:
+    return f"<start_task task_id={quoteattr(task_id)}/>"
+
+def get_report_command(report_id: str) -> str:
+    return f"<get_report report_id={quoteattr(report_id)} details='1'/>"
+
+##################################################################
+# Define GMP operations                                          #
+##################################################################
+
 # Retrieve version information of Greenbone via gvm
 def get_version() -> dict:
     """
@@ -70,55 +204,45 @@ def get_all_reports() -> dict:
     return response  # then extract report IDs as needed
 
 # Create a scan target
-def create_target(name: str, hosts: str) -> str:
+def create_target(name: str, hosts: str, port_list_id: str = DEFAULT_PORT_LIST_ID) -> str:
     """
     Creates a new target and returns its ID.
     """
-    xml = (
-        f"<create_target>"
-        f"<name>{name}</name>"
-        f"<hosts>{hosts}</hosts>"
-        f"<port_list id='33d0cd82-57c6-11e1-8ed1-406186ea4fc5'/>" # Default port range. Need to make it variable later
-        f"</create_target>"
-    )
-    response = run_gvm_command(xml)
+    response = run_gvm_command(create_target_command(name, hosts, port_list_id))
     # Parse the target id from the response.
     target_id = response.get("create_target_response", {}).get("@id")
     return target_id
 
+# Delete a scan target
+def delete_target(target_id: str) -> None:
+    """
+    Moves a target to the trashcan; gvmd refuses while a task uses it.
+    """
+    run_gvm_command(delete_target_command(target_id))
+
 # Create a scan task
 def create_task(name: str, target_id: str, scan_config_id: str) -> str:
     """
     Creates a scan task for the given target and configuration.
     Returns the task ID.
     """
-    xml = (
-        f"<create_task>"
-        f"<name>{name}</name>"
-        f"<config id='{scan_config_id}'/>"
-        f"<target id='{target_id}'/>"
-        f"</create_task>"
-    )
-    response = run_gvm_command(xml)
+    response = run_gvm_command(create_task_command(name, target_id, scan_config_id))
     task_id = response.get("create_task_response", {}).get("@id")
     return task_id
 
 # Start a scan task
-def start_task(task_id: str) -> None:
+def start_task(task_id: str) -> str:
     """
     Starts a scan task given its ID.
+    Returns the ID of the report the scan writes to.
     """
-    xml = f"<start_task task_id='{task_id}'/>"
-    run_gvm_command(xml)
+    response = run_gvm_command(start_task_command(task_id))
+    return response.get("start_task_response", {}).get("report_id")
 
 # Get report details of a scan
 def get_report(report_id: str) -> dict:
     """
     Retrieves the report details.
     """
-    xml = f"<get_report report_id='{report_id}' details='1'/>"
-    response = run_gvm_command(xml)
+    response = run_gvm_command(get_report_command(report_id))
     return response
-
-
-
@@ -0,0 +1,163 @@
+# app/api/modules/greenbone/utils/es_client.py
+
+##################################################################
+# Importing packages                                             #
+##################################################################
+
+import logging
+import threading
+from elasticsearch import Elasticsearch, BadRequestError
+
+from app.api.core.config import (
+    ES_HOST,
+    ES_USER,
+    ES_PASS,
+    ES_CONNECTIONS_PER_NODE,
+    ES_REQUEST_TIMEOUT,
+    ES_MAX_RETRIES
+)
+
+##################################################################
+# Defining our logger                                            #
+##################################################################
+
+logger = logging.getLogger(__name__)
+
+##################################################################
+# Index layout                                                   #
+##################################################################
+
+# Documents are written through this alias; the backing indices follow INDEX_PATTERN
+INDEX_ALIAS = "goldoak_vulnerabilities"
+INDEX_TEMPLATE_NAME = "goldoak_vulnerabilities"
+INDEX_PATTERN = "goldoak_vulnerabilities-*"
+FIRST_INDEX = "goldoak_vulnerabilities-000001"
+
+VULNERABILITY_MAPPING = {
+    "properties": {
+        "id": {"type": "keyword"},
+        "title": {"type": "text"},
+        "creation_time": {"type": "date"},
+        "modification_time": {"type": "date"},
+        "host": {
+            "properties": {
+                "hostname": {"type": "keyword"},
+                "ip": {"type": "ip"}
+            }
+        },
+        "port": {"type": "keyword"},
+        "nvt": {
+            "properties": {
+                "type": {"type": "keyword"},
+                "name": {"type": "text"},
+                "family": {"type": "keyword"},
+                "cvss_base": {"type": "float"},
+                "tags": {"type": "text"},
+                "solution": {"type": "text"},
+                "severity_score": {"type": "float"},
+                "severity_value": {"type": "keyword"}
+            }
+        },
+        "threat": {"type": "keyword"},
+        "severity": {"type": "float"},
+        "qod": {"type": "integer"},
+        "description": {"type": "text"},
+        "content_hash": {"type": "keyword"},
+        "last_seen": {"type": "date"}
+    }
+}
+
+# Fields added since the first release; a concrete index from before the
+# template gets them through a mapping update
+ADDED_FIELDS = ("content_hash", "last_seen")
+
+##################################################################
+# Shared client                                                  #
+##################################################################
+
+_client = None
+_client_lock = threading.Lock()
+_bootstrap_lock = threading.Lock()
+_write_target = None
+
+# Returns the process-wide client, creating it on first use
+def get_es_client() -> Elasticsearch:
+    """
+    Returns one long-lived Elasticsearch client, so ingest runs and query
+    endpoints reuse its HTTP connection pool instead of reconnecting.
+    """
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                logger.info(f"Connecting to: '{ES_HOST}'")
+                _client = Elasticsearch(
+                    ES_HOST,
+                    basic_auth=(ES_USER, ES_PASS),
+                    connections_per_node=ES_CONNECTIONS_PER_NODE,
+                    request_timeout=ES_REQUEST_TIMEOUT,
+                    max_retries=ES_MAX_RETRIES,
+                    retry_on_timeout=True
+                )
+    return _client
+
+# Closes the process-wide client, e.g. on application shutdown
+def close_es_client() -> None:
+    global _client
+    with _client_lock:
+        if _client is not None:
+            _client.close()
+            _client = None
+
+##################################################################
+# Index bootstrap                                                #
+##################################################################
+
+def bootstrap_index(es: Elasticsearch = None) -> str:
+    """
+    Installs the index template for goldoak_vulnerabilities-* and makes sure the
+    goldoak_vulnerabilities alias points at a write index, so indices can be
+    rolled over later without touching the ingest code.
+    An existing concrete index with the alias name (from before the template)
+    is kept; it only gets the mappings of the fields added since.
+    Returns the name documents should be written to.
+    """
+    global _write_target
+    es = es or get_es_client()
+    es.indices.put_index_template(
+        name=INDEX_TEMPLATE_NAME,
+        index_patterns=[INDEX_PATTERN],
+        template={"mappings": VULNERABILITY_MAPPING}
+    )
+    if es.indices.exists_alias(name=INDEX_ALIAS):
+        logger.info(f"Index alias '{INDEX_ALIAS}' already exists.")
+    elif es.indices.exists(index=INDEX_ALIAS):
+        logger.info(f"Using existing index '{INDEX_ALIAS}' without alias.")
+        _update_legacy_mapping(es)
+    else:
+        es.indices.create(index=FIRST_INDEX, aliases={INDEX_ALIAS: {"is_write_index": True}})
+        logger.info(f"Index '{FIRST_INDEX}' created with write alias '{INDEX_ALIAS}'.")
+    _write_target = INDEX_ALIAS
+    return _write_target
+
+# Maps the added fields on a pre-template index, before dynamic mapping guesses them
+def _update_legacy_mapping(es: Elasticsearch) -> None:
+    properties = {field: VULNERABILITY_MAPPING["properties"][field] for field in ADDED_FIELDS}
+    try:
+        es.indices.put_mapping(index=INDEX_ALIAS, properties=properties)
+        logger.info(f"Mapped {', '.join(ADDED_FIELDS)} on existing index '{INDEX_ALIAS}'.")
+    except BadRequestError as e:
+        # Already mapped dynamically (e.g. content_hash as text); only a reindex changes that
+        logger.warning(
+            f"Index '{INDEX_ALIAS}' maps {', '.join(ADDED_FIELDS)} differently from the template ({e}). "
+            f"Unchanged-result checks and last_seen queries may misbehave until it is reindexed into "
+            f"'{FIRST_INDEX}' and '{INDEX_ALIAS}' is recreated as an alias of it."
+        )
+
+# Bootstraps the index on first use if startup could not do it
+def ensure_index() -> str:
+    if _write_target is None:
+        with _bootstrap_lock:
+            if _write_target is None:
+                return bootstrap_index()
+    return _write_target
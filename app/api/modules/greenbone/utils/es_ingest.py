@@ -5,12 +5,24 @@
 ##################################################################
 
 import os
-import json
-import glob
+import time
 import logging
-from elasticsearch import Elasticsearch
+import datetime
+from elasticsearch import Elasticsearch, helpers
 
-from app.api.core.config import ES_HOST, ES_USER, ES_PASS, PARSED_DIR
+from app.api.core.config import (
+    PARSED_DIR,
+    ES_BULK_CHUNK_SIZE,
+    ES_BULK_MAX_BYTES,
+    ES_BULK_THREADS,
+    ES_BULK_MAX_RETRIES,
+    ES_TOUCH_UNCHANGED
+)
+from app.api.modules.greenbone.utils.state_store import PipelineStateStore, state_store
+from app.api.modules.greenbone.utils.xml_parser import content_hash
+from app.api.modules.greenbone.utils.parsed_files import read_parsed_records
+from app.api.modules.greenbone.utils.es_client import get_es_client, ensure_index
+from app.api.modules.greenbone.utils.metrics import observe_bulk, ES_UNCHANGED_DOCUMENTS, ES_INGEST_ERRORS
 
 ##################################################################
 # Defining our logger                                            #
@@ -19,108 +31,238 @@ from app.api.core.config import ES_HOST, ES_USER, ES_PASS, PARSED_DIR
 logger = logging.getLogger(__name__)
 
 ##################################################################
-# Defining the ingest                                            #
+# Bulk helpers                                                   #
 ##################################################################
 
-def ingest_parsed_reports():
+# Yields the records that have an id, warning about the others
+def _with_ids(vulnerabilities, filename: str):
+    for vulnerability in vulnerabilities:
+        if not vulnerability.get("id"):
+            logger.warning(f"Skipping vulnerability with missing id in file {filename}")
+            continue
+        yield vulnerability
+
+# Groups an iterable into lists of at most `size` items
+def _batches(iterable, size: int):
+    batch = []
+    for item in iterable:
+        batch.append(item)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+# Sends actions through the bulk API and reports failures per item
+def bulk_index(es: Elasticsearch, actions, label: str, on_result=None) -> tuple:
     """
-    Scans the PARSED_DIR for JSON report files. For each file that hasn't been ingested,
-    it indexes each vulnerability document into Elasticsearch and then marks the file as ingested.
+    Streams the actions to Elasticsearch in chunks of ES_BULK_CHUNK_SIZE documents
+    (at most ES_BULK_MAX_BYTES each). With ES_BULK_THREADS > 1 the chunks are sent
+    by parallel_bulk. on_result(ok, operation, details) is called for every item.
+    Returns the number of successful and failed documents.
     """
-    # Connect to Elasticsearch
-    print(ES_HOST)
-    logger.info(f"Connecting to: '{ES_HOST}'")
-    es = Elasticsearch(ES_HOST, http_auth=(ES_USER, ES_PASS))
-    
-    # Define your index name and mapping
-    index_name = "goldoak_vulnerabilities"
-    mapping = {
-        "mappings": {
-            "properties": {
-                "id": {"type": "keyword"},
-                "title": {"type": "text"},
-                "creation_time": {"type": "date"},
-                "modification_time": {"type": "date"},
-                "host": {
-                    "properties": {
-                        "hostname": {"type": "keyword"},
-                        "ip": {"type": "ip"}
-                    }
-                },
-                "port": {"type": "keyword"},
-                "nvt": {
-                    "properties": {
-                        "type": {"type": "keyword"},
-                        "name": {"type": "text"},
-                        "family": {"type": "keyword"},
-                        "cvss_base": {"type": "float"},
-                        "tags": {"type": "text"},
-                        "solution": {"type": "text"},
-                        "severity_score": {"type": "float"},
-                        "severity_value": {"type": "keyword"}
-                    }
-                },
-                "threat": {"type": "keyword"},
-                "severity": {"type": "float"},
-                "qod": {"type": "integer"},
-                "description": {"type": "text"}
-            }
-        }
+    started = time.perf_counter()
+    options = {
+        "chunk_size": ES_BULK_CHUNK_SIZE,
+        "max_chunk_bytes": ES_BULK_MAX_BYTES,
+        "raise_on_error": False,
+        "raise_on_exception": False
     }
-    
-    # Create the index if it doesn't exist
-    if not es.indices.exists(index=index_name):
-        es.indices.create(index=index_name, body=mapping)
-        logger.info(f"Index '{index_name}' created.")
-
-    # Determine the path for the ingested reports record file
-    ingested_file_path = os.path.join(PARSED_DIR, "ingested_reports.txt")
-    if os.path.exists(ingested_file_path):
-        with open(ingested_file_path, "r") as f:
-            ingested_reports = set(line.strip() for line in f if line.strip())
+    if ES_BULK_THREADS > 1:
+        results = helpers.parallel_bulk(es, actions, thread_count=ES_BULK_THREADS, **options)
     else:
-        ingested_reports = set()
+        results = helpers.streaming_bulk(es, actions, max_retries=ES_BULK_MAX_RETRIES, **options)
+
+    success = 0
+    failed = 0
+    for ok, item in results:
+        operation, details = next(iter(item.items()))
+        if on_result is not None:
+            on_result(ok, operation, details)
+        if ok:
+            success += 1
+            continue
+        # Touching a document that is gone is handled by the caller
+        if operation == "update" and details.get("status") == 404:
+            continue
+        failed += 1
+        logger.error(
+            f"Bulk {operation} of document {details.get('_id')} from {label} failed "
+            f"({details.get('status')}): {details.get('error')}"
+        )
+    observe_bulk(time.perf_counter() - started, success, failed)
+    return success, failed
+
+##################################################################
+# Change detection                                               #
+##################################################################
+
+# Current UTC time in the format gvmd uses
+def _utc_now() -> str:
+    return datetime.datetime.now(datetime.timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+class ChangeTracker:
+    """
+    Compares each vulnerability's content hash with the one stored when the
+    document was last indexed. New or changed documents are indexed in full;
+    unchanged ones only get their last_seen field updated (or, with
+    ES_TOUCH_UNCHANGED=false, nothing is sent at all).
+    The bulk results are collected and written to the state store by commit().
+
+    Hashes are kept per document, i.e. per gvmd result id. gvmd gives every
+    report new result ids, so this skips re-ingesting the same report (a
+    re-fetch of a modified report, a re-parse, a replayed queue entry), but a
+    new scan of a task is always indexed in full, one document per result.
+    """
+    def __init__(self, index_name: str, store: PipelineStateStore = state_store, touch_unchanged: bool = ES_TOUCH_UNCHANGED):
+        self._index_name = index_name
+        self._store = store
+        self._touch_unchanged = touch_unchanged
+        self._sent = {}
+        self._touched = {}
+        self.indexed = []
+        self.seen = []
+        self.missing = set()
+        self.unchanged = 0
+
+    def actions(self, vulnerabilities, filename: str):
+        """
+        Yields an index action per new or changed record and an update of
+        last_seen per unchanged one. Hashes are looked up one chunk at a time.
+        """
+        for batch in _batches(_with_ids(vulnerabilities, filename), ES_BULK_CHUNK_SIZE):
+            known = self._store.known_hashes([vulnerability["id"] for vulnerability in batch])
+            for vulnerability in batch:
+                doc_id = vulnerability["id"]
+                digest = vulnerability.get("content_hash") or content_hash(vulnerability)
+                last_seen = vulnerability.get("modification_time") or _utc_now()
+                if known.get(doc_id) != digest:
+                    yield self._index_action(vulnerability, digest, last_seen)
+                    continue
+                self.unchanged += 1
+                if not self._touch_unchanged:
+                    self.seen.append((doc_id, last_seen))
+                    continue
+                self._touched[doc_id] = last_seen
+                yield {"_op_type": "update", "_index": self._index_name, "_id": doc_id, "doc": {"last_seen": last_seen}}
 
-    # List all JSON files in PARSED_DIR
-    json_files = glob.glob(os.path.join(PARSED_DIR, "*.json"))
-    logger.info(f"Found {len(json_files)} parsed report files in '{PARSED_DIR}'.")
+    def reindex_actions(self, vulnerabilities, filename: str):
+        """
+        Yields full index actions for the records whose documents were missing
+        when we tried to touch them.
+        """
+        for vulnerability in _with_ids(vulnerabilities, filename):
+            if vulnerability["id"] in self.missing:
+                digest = vulnerability.get("content_hash") or content_hash(vulnerability)
+                last_seen = vulnerability.get("modification_time") or _utc_now()
+                yield self._index_action(vulnerability, digest, last_seen)
 
-    for json_file in json_files:
-        filename = os.path.basename(json_file)
-        if filename in ingested_reports:
-            logger.info(f"Skipping already ingested file: {filename}")
+    def _index_action(self, vulnerability: dict, digest: str, last_seen: str) -> dict:
+        self._sent[vulnerability["id"]] = (digest, last_seen)
+        source = dict(vulnerability, content_hash=digest, last_seen=last_seen)
+        return {"_index": self._index_name, "_id": vulnerability["id"], "_source": source}
+
+    def on_result(self, ok: bool, operation: str, details: dict) -> None:
+        doc_id = details.get("_id")
+        if operation == "update":
+            last_seen = self._touched.pop(doc_id, None)
+            if ok:
+                self.seen.append((doc_id, last_seen))
+            elif details.get("status") == 404:
+                self.missing.add(doc_id)
+            return
+        entry = self._sent.pop(doc_id, None)
+        if ok and entry is not None:
+            self.missing.discard(doc_id)
+            self.indexed.append((doc_id,) + entry)
+
+    def commit(self) -> None:
+        """
+        Stores the hashes of the accepted documents and the new last_seen values.
+        """
+        if self.missing:
+            self._store.forget_hashes(list(self.missing))
+        if self.indexed:
+            self._store.record_indexed(self.indexed)
+        if self.seen:
+            self._store.record_seen(self.seen)
+
+##################################################################
+# Defining the ingest                                            #
+##################################################################
+
+def ingest_parsed_reports(parsed_files: list = None) -> dict:
+    """
+    Looks up the parsed report files that haven't been ingested yet (or takes the
+    given paths, as the ingest stage consumer does). For each file it indexes the new
+    or changed vulnerability documents into Elasticsearch through the bulk API, touches
+    last_seen on the unchanged ones and then marks the file as ingested in the state
+    store. Throughput is logged per file and per run.
+    Returns {path: True/False}.
+    """
+    # Reuse the shared client; the index is bootstrapped once, not on every run
+    es = get_es_client()
+    index_name = ensure_index()
+
+    # The state store knows which parsed files are still waiting for ingestion
+    if parsed_files is None:
+        parsed_files = state_store.pending_ingest()
+    results = {}
+    logger.info(f"Found {len(parsed_files)} parsed report files to ingest in '{PARSED_DIR}'.")
+
+    run_started = time.perf_counter()
+    run_docs = 0
+    run_unchanged = 0
+    run_failed = 0
+    for parsed_file in parsed_files:
+        filename = os.path.basename(parsed_file)
+        if not os.path.exists(parsed_file):
+            logger.warning(f"Parsed report file {filename} no longer exists, skipping.")
+            results[parsed_file] = True
+            continue
+        if state_store.is_ingested(filename):
+            results[parsed_file] = True
             continue
 
+        # NDJSON files are streamed record by record straight into the bulk requests
+        tracker = ChangeTracker(index_name)
+        file_started = time.perf_counter()
         try:
-            with open(json_file, "r", encoding="utf-8") as f:
-                data = json.load(f)
+            actions = tracker.actions(read_parsed_records(parsed_file), filename)
+            success, failed = bulk_index(es, actions, filename, tracker.on_result)
+            # Documents we meant to touch but that are gone from the index are sent again in full
+            if tracker.missing:
+                logger.warning(f"{len(tracker.missing)} unchanged documents from {filename} are missing, re-indexing them.")
+                tracker.unchanged -= len(tracker.missing)
+                resent, refailed = bulk_index(es, tracker.reindex_actions(read_parsed_records(parsed_file), filename), filename, tracker.on_result)
+                success += resent
+                failed += refailed
         except Exception as e:
-            logger.error(f"Error loading JSON file {filename}: {e}")
+            ES_INGEST_ERRORS.inc()
+            logger.error(f"Error ingesting {filename}: {e}")
+            results[parsed_file] = False
             continue
-
-        vulnerabilities = data.get("vulnerabilities", [])
-        for vulnerability in vulnerabilities:
-            doc_id = vulnerability.get("id")
-            if not doc_id:
-                logger.warning(f"Skipping vulnerability with missing id in file {filename}")
-                continue
-            try:
-                res = es.index(index=index_name, id=doc_id, body=vulnerability)
-                logger.info(f"Indexed vulnerability {doc_id} from {filename}: {res.get('result')}")
-            except Exception as e:
-                logger.error(f"Error indexing vulnerability {doc_id} from {filename}: {e}")
+        finally:
+            tracker.commit()
+        elapsed = time.perf_counter() - file_started
+        indexed = len(tracker.indexed)
+        run_docs += indexed
+        run_unchanged += tracker.unchanged
+        ES_UNCHANGED_DOCUMENTS.inc(tracker.unchanged)
+        run_failed += failed
 
         # Mark file as ingested
-        ingested_reports.add(filename)
-        logger.info(f"File {filename} ingested.")
-
-    # Save the updated list of ingested files
-    try:
-        with open(ingested_file_path, "w", encoding="utf-8") as f:
-            for fname in sorted(ingested_reports):
-                f.write(fname + "\n")
-        logger.info("Updated ingested reports list.")
-    except Exception as e:
-        logger.error(f"Error saving ingested reports list: {e}")
-
+        state_store.mark_ingested(filename)
+        results[parsed_file] = True
+        logger.info(
+            f"File {filename} ingested: {indexed} indexed, {tracker.unchanged} unchanged, {failed} failed "
+            f"in {elapsed:.2f}s ({success / elapsed if elapsed else 0:.0f} docs/s)."
+        )
 
+    run_elapsed = time.perf_counter() - run_started
+    if parsed_files:
+        logger.info(
+            f"Ingest run finished: {run_docs} documents indexed, {run_unchanged} unchanged, {run_failed} failed "
+            f"in {run_elapsed:.2f}s ({(run_docs + run_unchanged) / run_elapsed if run_elapsed else 0:.0f} docs/s)."
+        )
+    return results
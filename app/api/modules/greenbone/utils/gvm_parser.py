@@ -4,22 +4,12 @@
 # Importing packages                                             #
 ##################################################################
 
-# General
-import os
-import time
-import shutil
-import subprocess
-import logging
-
 # For parsing
-import xmltodict
-import json
-from lxml import etree
 from typing import Optional, List, Dict
-from pydantic import BaseModel, ValidationError
+from pydantic import BaseModel
 
 # Our packages
-from app.api.modules.greenbone.services import scan_service
+from app.api.modules.greenbone.utils.xml_parser import parse_large_xml
 
 ##################################################################
 # Our Parser for report overviews                                #
@@ -84,61 +74,6 @@ def parse_xml_to_json(xml_file_path: str) -> dict:
     """
     Parses the provided XML file and extracts vulnerability result data.
     Returns a dictionary with a single key "vulnerabilities" that holds a list of extracted results.
+    The file is streamed with parse_large_xml(), so no full tree is built in memory.
     """
-    tree = etree.parse(xml_file_path)
-    root = tree.getroot()
-
-    # Use an XPath expression to locate all <result> elements nested under <report>/<results>
-    result_elements = root.xpath(".//report/results/result")
-    
-    vulnerabilities = []
-    for result in result_elements:
-        vuln = {}
-        # Basic fields
-        vuln["id"] = result.get("id")
-        vuln["title"] = result.findtext("name")
-        vuln["creation_time"] = result.findtext("creation_time")
-        vuln["modification_time"] = result.findtext("modification_time")
-        
-        # Process host info
-        host_elem = result.find("host")
-        host_info = {}
-        if host_elem is not None:
-            host_info["hostname"] = host_elem.findtext("hostname")
-            # Sometimes the IP appears as tail text after the hostname element
-            hostname_elem = host_elem.find("hostname")
-            if hostname_elem is not None and hostname_elem.tail:
-                host_info["ip"] = hostname_elem.tail.strip()
-        vuln["host"] = host_info
-
-        # Port info
-        vuln["port"] = result.findtext("port")
-        
-        # Extract details from <nvt>
-        nvt_elem = result.find("nvt")
-        nvt_info = {}
-        if nvt_elem is not None:
-            nvt_info["type"] = nvt_elem.findtext("type")
-            nvt_info["name"] = nvt_elem.findtext("name")
-            nvt_info["family"] = nvt_elem.findtext("family")
-            nvt_info["cvss_base"] = nvt_elem.findtext("cvss_base")
-            nvt_info["tags"] = nvt_elem.findtext("tags")
-            nvt_info["solution"] = nvt_elem.findtext("solution")
-            # Grab one severity detail if available
-            severity_elem = nvt_elem.find(".//severity")
-            if severity_elem is not None:
-                nvt_info["severity_score"] = severity_elem.findtext("score")
-                nvt_info["severity_value"] = severity_elem.findtext("value")
-        vuln["nvt"] = nvt_info
-
-        vuln["threat"] = result.findtext("threat")
-        vuln["severity"] = result.findtext("severity")
-        vuln["qod"] = result.findtext("qod/value")
-        vuln["description"] = result.findtext("description")
-
-        vulnerabilities.append(vuln)
-
-    return {"vulnerabilities": vulnerabilities}
-
-
-
+    return {"vulnerabilities": list(parse_large_xml(xml_file_path))}
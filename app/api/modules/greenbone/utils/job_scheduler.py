@@ -0,0 +1,193 @@
+# app/api/modules/greenbone/utils/job_scheduler.py
+
+##################################################################
+# Importing packages                                             #
+##################################################################
+
+import time
+import logging
+import datetime
+import threading
+from apscheduler.schedulers.background import BackgroundScheduler
+
+from app.api.core.config import (
+    SCHEDULER_MAX_BACKOFF_FACTOR,
+    SCHEDULER_MAX_SPEEDUP_FACTOR,
+    SCHEDULER_RUNTIME_FACTOR
+)
+from app.api.modules.greenbone.utils.metrics import observe_job
+
+##################################################################
+# Defining our logger                                            #
+##################################################################
+
+logger = logging.getLogger(__name__)
+
+##################################################################
+# A single adaptive job                                          #
+##################################################################
+
+class AdaptiveJob:
+    """
+    Wraps a job function with a non-blocking lock, so a run that is still
+    going on makes the next one skip instead of overlapping, and adapts the
+    interval after every run:
+      - errors back off exponentially, up to base * SCHEDULER_MAX_BACKOFF_FACTOR
+      - a backlog halves the interval, down to base / SCHEDULER_MAX_SPEEDUP_FACTOR
+      - otherwise the base interval applies
+    The interval never drops below SCHEDULER_RUNTIME_FACTOR times the last run's
+    duration. The backlog comes from the backlog callable or, without one, from
+    an int returned by the job (the amount of work it found).
+    """
+    def __init__(self, name: str, func, interval: float, backlog=None):
+        self.name = name
+        self._func = func
+        self._backlog_fn = backlog
+        self.base_interval = interval
+        self.interval = interval
+        self.min_interval = max(1.0, interval / SCHEDULER_MAX_SPEEDUP_FACTOR)
+        self.max_interval = interval * SCHEDULER_MAX_BACKOFF_FACTOR
+        self._lock = threading.Lock()
+        self.runs = 0
+        self.skipped = 0
+        self.errors = 0
+        self.consecutive_errors = 0
+        self.last_started = None
+        self.last_duration = None
+        self.last_error = None
+        self.backlog = None
+
+    @property
+    def running(self) -> bool:
+        return self._lock.locked()
+
+    def run(self) -> float:
+        """
+        Runs the job unless it is already running. Returns the next interval.
+        """
+        if not self._lock.acquire(blocking=False):
+            self.skipped += 1
+            observe_job(self.name, "skipped")
+            logger.info(f"Job {self.name} is still running, skipping this run.")
+            return self.interval
+        try:
+            self.last_started = time.time()
+            started = time.perf_counter()
+            result = None
+            try:
+                result = self._func()
+                self.consecutive_errors = 0
+                self.last_error = None
+            except Exception as e:
+                self.errors += 1
+                self.consecutive_errors += 1
+                self.last_error = str(e)
+                logger.error(f"Job {self.name} failed ({self.consecutive_errors} in a row): {e}")
+            self.last_duration = time.perf_counter() - started
+            self.runs += 1
+            self.backlog = self._measure_backlog(result)
+            self.interval = self._next_interval()
+            observe_job(
+                self.name, "error" if self.consecutive_errors else "ok",
+                self.last_duration, self.backlog, self.interval
+            )
+            return self.interval
+        finally:
+            self._lock.release()
+
+    def _measure_backlog(self, result):
+        if self._backlog_fn is not None:
+            try:
+                return self._backlog_fn()
+            except Exception as e:
+                logger.warning(f"Could not measure the backlog of job {self.name}: {e}")
+                return None
+        return result if isinstance(result, int) and not isinstance(result, bool) else None
+
+    def _next_interval(self) -> float:
+        if self.consecutive_errors:
+            interval = min(self.max_interval, self.base_interval * 2 ** self.consecutive_errors)
+        elif self.backlog:
+            interval = max(self.min_interval, min(self.interval, self.base_interval) / 2)
+        else:
+            interval = self.base_interval
+        return max(interval, (self.last_duration or 0) * SCHEDULER_RUNTIME_FACTOR)
+
+    def status(self) -> dict:
+        return {
+            "name": self.name,
+            "running": self.running,
+            "interval_seconds": round(self.interval, 1),
+            "base_interval_seconds": self.base_interval,
+            "last_started": _iso(self.last_started),
+            "last_duration_seconds": round(self.last_duration, 3) if self.last_duration is not None else None,
+            "backlog": self.backlog,
+            "runs": self.runs,
+            "skipped": self.skipped,
+            "errors": self.errors,
+            "consecutive_errors": self.consecutive_errors,
+            "last_error": self.last_error
+        }
+
+# Unix time as an ISO string
+def _iso(timestamp: float) -> str:
+    if timestamp is None:
+        return None
+    return datetime.datetime.fromtimestamp(timestamp, datetime.timezone.utc).isoformat()
+
+##################################################################
+# The scheduler                                                  #
+##################################################################
+
+class AdaptiveScheduler:
+    """
+    BackgroundScheduler running AdaptiveJobs. Every job is registered with
+    max_instances=1 and coalesce=True, so missed runs collapse into one, and
+    is rescheduled with its adapted interval after each run.
+    """
+    def __init__(self):
+        self._scheduler = BackgroundScheduler()
+        self._jobs = {}
+
+    def add(self, name: str, func, seconds: float, backlog=None, run_now: bool = False) -> AdaptiveJob:
+        job = AdaptiveJob(name, func, seconds, backlog)
+        self._jobs[name] = job
+        # APScheduler treats an explicit next_run_time=None as "paused", so it is only passed to run right away
+        options = {"next_run_time": datetime.datetime.now()} if run_now else {}
+        self._scheduler.add_job(
+            self._run,
+            "interval",
+            seconds=seconds,
+            args=[name],
+            id=name,
+            max_instances=1,
+            coalesce=True,
+            misfire_grace_time=max(1, int(seconds)),
+            **options
+        )
+        return job
+
+    def _run(self, name: str) -> None:
+        job = self._jobs[name]
+        previous = job.interval
+        interval = job.run()
+        if round(interval) != round(previous):
+            logger.info(f"Job {name} now runs every {interval:.0f}s (was {previous:.0f}s).")
+        # Always restart the countdown from the end of the run
+        self._scheduler.reschedule_job(name, trigger="interval", seconds=interval)
+
+    def start(self) -> None:
+        self._scheduler.start()
+
+    def shutdown(self) -> None:
+        self._scheduler.shutdown(wait=False)
+
+    def status(self) -> list:
+        statuses = []
+        for name, job in self._jobs.items():
+            status = job.status()
+            scheduled = self._scheduler.get_job(name)
+            next_run = scheduled.next_run_time if scheduled is not None else None
+            status["next_run"] = next_run.isoformat() if next_run else None
+            statuses.append(status)
+        return statuses
@@ -0,0 +1,268 @@
+# app/api/modules/greenbone/utils/metrics.py
+
+##################################################################
+# Importing packages                                             #
+##################################################################
+
+import logging
+from prometheus_client import Counter, Gauge, Histogram, generate_latest, CONTENT_TYPE_LATEST
+
+from app.api.modules.greenbone.utils.state_store import state_store
+from app.api.modules.greenbone.services.report_fetcher import report_fetcher
+
+##################################################################
+# Defining our logger                                            #
+##################################################################
+
+logger = logging.getLogger(__name__)
+
+# Metrics are recorded once per command, report, file or bulk run, never per
+# document, so the hot loops only pay for a counter increment at their end.
+
+# Bucket boundaries in seconds
+FAST_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+SLOW_BUCKETS = (0.1, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600, 1200, 1800, 3600)
+RATE_BUCKETS = (100, 500, 1000, 2500, 5000, 10000, 25000, 50000, 100000)
+
+##################################################################
+# GMP commands                                                   #
+##################################################################
+
+GMP_COMMAND_SECONDS = Histogram(
+    "goldoak_gmp_command_duration_seconds",
+    "Duration of GMP commands, by command, backend (socket or cli) and client (sync or async).",
+    ["command", "backend", "client"],
+    buckets=FAST_BUCKETS
+)
+GMP_COMMAND_ERRORS = Counter(
+    "goldoak_gmp_command_errors_total",
+    "GMP commands that raised an error.",
+    ["command", "backend", "client"]
+)
+GMP_RESPONSE_BYTES = Counter(
+    "goldoak_gmp_response_bytes_total",
+    "Bytes received in GMP responses.",
+    ["command", "backend", "client"]
+)
+
+# Records one GMP command
+def observe_gmp_command(command: str, backend: str, client: str, seconds: float, size: int = None, ok: bool = True) -> None:
+    GMP_COMMAND_SECONDS.labels(command, backend, client).observe(seconds)
+    if not ok:
+        GMP_COMMAND_ERRORS.labels(command, backend, client).inc()
+    elif size:
+        GMP_RESPONSE_BYTES.labels(command, backend, client).inc(size)
+
+##################################################################
+# Report fetch stage                                             #
+##################################################################
+
+REPORT_FETCH_SECONDS = Histogram(
+    "goldoak_report_fetch_duration_seconds",
+    "Time to fetch one detailed report, all pages included.",
+    buckets=SLOW_BUCKETS
+)
+REPORT_FETCH_BYTES = Counter(
+    "goldoak_report_fetch_bytes_total",
+    "Bytes of detailed report XML written to disk."
+)
+REPORT_FETCHES = Counter(
+    "goldoak_report_fetches_total",
+    "Detailed report fetches, by result.",
+    ["result"]
+)
+
+# Records one detailed report fetch
+def observe_report_fetch(seconds: float, size: int, ok: bool) -> None:
+    REPORT_FETCHES.labels("ok" if ok else "failed").inc()
+    if ok:
+        REPORT_FETCH_SECONDS.observe(seconds)
+        REPORT_FETCH_BYTES.inc(size)
+
+##################################################################
+# Parse stage                                                    #
+##################################################################
+
+PARSE_SECONDS = Histogram(
+    "goldoak_parse_duration_seconds",
+    "Time to parse one XML report file.",
+    buckets=SLOW_BUCKETS
+)
+PARSE_RECORDS = Counter(
+    "goldoak_parse_records_total",
+    "Vulnerability records extracted from XML reports."
+)
+PARSE_RATE = Histogram(
+    "goldoak_parse_records_per_second",
+    "Records per second of each parsed XML report file.",
+    buckets=RATE_BUCKETS
+)
+PARSE_FAILURES = Counter(
+    "goldoak_parse_failures_total",
+    "XML report files that could not be parsed."
+)
+
+# Records one parsed XML file; the duration is measured in the worker process
+def observe_parse(seconds: float, records: int) -> None:
+    PARSE_SECONDS.observe(seconds)
+    PARSE_RECORDS.inc(records)
+    if seconds > 0:
+        PARSE_RATE.observe(records / seconds)
+
+##################################################################
+# Elasticsearch ingest                                           #
+##################################################################
+
+ES_BULK_SECONDS = Histogram(
+    "goldoak_es_bulk_duration_seconds",
+    "Duration of one streamed bulk run (all chunks of one parsed file).",
+    buckets=SLOW_BUCKETS
+)
+ES_BULK_DOCUMENTS = Counter(
+    "goldoak_es_bulk_documents_total",
+    "Documents sent through the bulk API, by result (ok or failed).",
+    ["result"]
+)
+ES_UNCHANGED_DOCUMENTS = Counter(
+    "goldoak_es_unchanged_documents_total",
+    "Documents whose content hash was unchanged, so only last_seen was touched (or nothing sent)."
+)
+ES_INGEST_ERRORS = Counter(
+    "goldoak_es_ingest_errors_total",
+    "Parsed files whose ingest raised an error."
+)
+
+# Records one bulk run
+def observe_bulk(seconds: float, success: int, failed: int) -> None:
+    ES_BULK_SECONDS.observe(seconds)
+    if success:
+        ES_BULK_DOCUMENTS.labels("ok").inc(success)
+    if failed:
+        ES_BULK_DOCUMENTS.labels("failed").inc(failed)
+
+##################################################################
+# Scheduled jobs                                                 #
+##################################################################
+
+JOB_SECONDS = Histogram(
+    "goldoak_job_duration_seconds",
+    "Duration of scheduled report worker jobs.",
+    ["job"],
+    buckets=SLOW_BUCKETS
+)
+JOB_RUNS = Counter(
+    "goldoak_job_runs_total",
+    "Scheduled job runs, by result (ok, error or skipped because the previous run was still going).",
+    ["job", "result"]
+)
+JOB_BACKLOG = Gauge(
+    "goldoak_job_backlog",
+    "Backlog reported by the last run of a scheduled job.",
+    ["job"]
+)
+JOB_INTERVAL = Gauge(
+    "goldoak_job_interval_seconds",
+    "Current (adapted) interval of a scheduled job.",
+    ["job"]
+)
+
+# Records one scheduled job run
+def observe_job(job: str, result: str, seconds: float = None, backlog: int = None, interval: float = None) -> None:
+    JOB_RUNS.labels(job, result).inc()
+    if seconds is not None:
+        JOB_SECONDS.labels(job).observe(seconds)
+    if backlog is not None:
+        JOB_BACKLOG.labels(job).set(backlog)
+    if interval is not None:
+        JOB_INTERVAL.labels(job).set(interval)
+
+##################################################################
+# Report inventory cache                                         #
+##################################################################
+
+INVENTORY_LOOKUPS = Counter(
+    "goldoak_inventory_lookups_total",
+    "Report inventory lookups, by result (hits, stale_hits, misses, not_modified).",
+    ["result"]
+)
+INVENTORY_REFRESHES = Counter(
+    "goldoak_inventory_refreshes_total",
+    "Report inventory refreshes from gvmd, by result (ok or error).",
+    ["result"]
+)
+INVENTORY_REFRESHED_AT = Gauge(
+    "goldoak_inventory_refreshed_timestamp_seconds",
+    "Unix time of the last successful report inventory refresh; time() minus this is the snapshot age."
+)
+
+# Records one inventory lookup
+def observe_inventory_lookup(result: str) -> None:
+    INVENTORY_LOOKUPS.labels(result).inc()
+
+# Records one inventory refresh
+def observe_inventory_refresh(ok: bool, fetched_at: float = None) -> None:
+    INVENTORY_REFRESHES.labels("ok" if ok else "error").inc()
+    if fetched_at is not None:
+        INVENTORY_REFRESHED_AT.set(fetched_at)
+
+##################################################################
+# Target, port list and scan config lookups                      #
+##################################################################
+
+RESOURCE_LOOKUPS = Counter(
+    "goldoak_resource_lookups_total",
+    "Cached GMP resource lookups, by kind (target, port_list, config) and result (hit, miss, created).",
+    ["kind", "result"]
+)
+RESOURCE_LOADS = Counter(
+    "goldoak_resource_loads_total",
+    "Resource listings fetched from gvmd, by kind (target, port_list, config).",
+    ["kind"]
+)
+
+# Records one resource lookup
+def observe_resource_lookup(kind: str, result: str) -> None:
+    RESOURCE_LOOKUPS.labels(kind, result).inc()
+
+# Records one resource listing fetched from gvmd
+def observe_resource_load(kind: str) -> None:
+    RESOURCE_LOADS.labels(kind).inc()
+
+##################################################################
+# Pipeline state, read when scraped                              #
+##################################################################
+
+QUEUE_DEPTH = Gauge(
+    "goldoak_pipeline_queue_depth",
+    "Work items in the persistent pipeline queues, by stage and state (queued or claimed).",
+    ["stage", "state"]
+)
+FETCH_STAGE = Gauge(
+    "goldoak_report_fetch_stage",
+    "Progress of the current fetch run (queued, in_flight, completed, failed).",
+    ["state"]
+)
+
+# Refreshes the gauges that mirror the state store and the fetch stage
+def _refresh_pipeline_gauges() -> None:
+    try:
+        depths = state_store.queue_depths()
+    except Exception as e:
+        logger.warning(f"Could not read the pipeline queue depths: {e}")
+        depths = {}
+    for stage in ("fetch", "parse", "ingest"):
+        depth = depths.get(stage, {})
+        claimed = depth.get("claimed", 0)
+        QUEUE_DEPTH.labels(stage, "queued").set(depth.get("queued", 0) - claimed)
+        QUEUE_DEPTH.labels(stage, "claimed").set(claimed)
+    stats = report_fetcher.stats()
+    for state in ("queued", "in_flight", "completed", "failed"):
+        FETCH_STAGE.labels(state).set(stats[state])
+
+# Renders all metrics in the Prometheus text format
+def render_metrics() -> tuple:
+    """
+    Returns the exposition body and its content type.
+    """
+    _refresh_pipeline_gauges()
+    return generate_latest(), CONTENT_TYPE_LATEST
@@ -0,0 +1,122 @@
+# app/api/modules/greenbone/utils/parsed_files.py
+
+##################################################################
+# Importing packages                                             #
+##################################################################
+
+import io
+import json
+import gzip
+import textwrap
+from typing import Iterator, Dict
+
+# zstandard is optional and only needed for PARSED_COMPRESSION=zstd
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+from app.api.core.config import PARSED_FORMAT, PARSED_COMPRESSION
+
+##################################################################
+# File names                                                     #
+##################################################################
+
+COMPRESSION_SUFFIXES = {"none": "", "gzip": ".gz", "zstd": ".zst"}
+
+# Parsed file extension for a format and compression
+def parsed_extension(fmt: str = PARSED_FORMAT, compression: str = PARSED_COMPRESSION) -> str:
+    """
+    ".json" for the pretty debug format (never compressed), otherwise ".ndjson"
+    followed by ".gz" or ".zst".
+    """
+    if fmt == "json":
+        return ".json"
+    if compression not in COMPRESSION_SUFFIXES:
+        raise ValueError(f"Unknown parsed file compression '{compression}'")
+    return ".ndjson" + COMPRESSION_SUFFIXES[compression]
+
+# True for every file name the parser writes
+def is_parsed_file(file_name: str) -> bool:
+    return file_name.endswith(".json") or ".ndjson" in file_name
+
+##################################################################
+# Opening parsed files                                           #
+##################################################################
+
+# Opens a parsed file as text, (de)compressing based on its extension
+def open_parsed(path: str, mode: str = "r"):
+    """
+    mode is "r" or "w". .gz files go through gzip, .zst files through zstandard.
+    """
+    if path.endswith(".gz"):
+        # Level 6 (the zlib default) is much faster than gzip's 9 for a slightly larger file
+        return gzip.open(path, mode + "t", encoding="utf-8", compresslevel=6)
+    if path.endswith(".zst"):
+        if zstandard is None:
+            raise RuntimeError("The zstandard package is required for .zst parsed files")
+        return zstandard.open(path, mode + "t", encoding="utf-8")
+    return io.open(path, mode, encoding="utf-8")
+
+##################################################################
+# Writing                                                        #
+##################################################################
+
+# Writes one compact JSON document per line
+def write_ndjson(records, outfile) -> tuple:
+    """
+    Writes each record as it is produced, so memory use does not depend on the
+    report size. Returns the id of the first record (or None) and the number of records.
+    """
+    first_id = None
+    count = 0
+    for vuln in records:
+        if count == 0:
+            first_id = vuln.get("id")
+        outfile.write(json.dumps(vuln, ensure_ascii=False, separators=(",", ":")))
+        outfile.write("\n")
+        count += 1
+    return first_id, count
+
+# Writes the streamed records in the same layout as json.dump(indent=2)
+def write_parsed_report(records, outfile) -> tuple:
+    """
+    Writes {"vulnerabilities": [...]} to outfile one record at a time.
+    Returns the id of the first record (or None) and the number of records.
+    """
+    first_id = None
+    count = 0
+    outfile.write('{\n  "vulnerabilities": [')
+    for vuln in records:
+        if count == 0:
+            first_id = vuln.get("id")
+        outfile.write(",\n" if count else "\n")
+        outfile.write(textwrap.indent(json.dumps(vuln, indent=2), "    "))
+        count += 1
+    outfile.write("\n  ]\n}" if count else "]\n}")
+    return first_id, count
+
+# Writes records in the given format
+def write_records(records, outfile, fmt: str = PARSED_FORMAT) -> tuple:
+    if fmt == "json":
+        return write_parsed_report(records, outfile)
+    return write_ndjson(records, outfile)
+
+##################################################################
+# Reading                                                        #
+##################################################################
+
+# Iterates over the vulnerabilities of a parsed file of any format
+def read_parsed_records(path: str) -> Iterator[Dict]:
+    """
+    NDJSON files are read line by line, so only one record is in memory at a
+    time. The pretty JSON format has to be loaded as a whole.
+    """
+    with open_parsed(path, "r") as f:
+        if path.endswith(".json"):
+            yield from json.load(f).get("vulnerabilities", [])
+            return
+        for line in f:
+            line = line.strip()
+            if line:
+                yield json.loads(line)
@@ -0,0 +1,132 @@
+# app/api/modules/greenbone/utils/pipeline.py
+
+##################################################################
+# Importing packages                                             #
+##################################################################
+
+import logging
+import threading
+
+from app.api.core.config import (
+    PIPELINE_BATCH_SIZE,
+    PIPELINE_IDLE_WAIT,
+    PIPELINE_RETRY_DELAY,
+    PIPELINE_MAX_ATTEMPTS
+)
+from app.api.modules.greenbone.utils.state_store import PipelineStateStore, state_store
+
+##################################################################
+# Defining our logger                                            #
+##################################################################
+
+logger = logging.getLogger(__name__)
+
+# Pipeline stages, in order
+STAGE_FETCH = "fetch"
+STAGE_PARSE = "parse"
+STAGE_INGEST = "ingest"
+
+##################################################################
+# Persistent work queues                                         #
+##################################################################
+
+class WorkQueue:
+    """
+    Queue of work items for one pipeline stage. Items live in the state
+    store, so they survive restarts; putting items also wakes up the
+    stage's consumer in this process right away.
+    """
+    def __init__(self, stage: str, store: PipelineStateStore = state_store):
+        self.stage = stage
+        self._store = store
+        self._event = threading.Event()
+
+    def put(self, items) -> int:
+        items = list(items)
+        if not items:
+            return 0
+        added = self._store.enqueue(self.stage, items)
+        self._event.set()
+        return added
+
+    def claim(self, limit: int) -> list:
+        return self._store.claim(self.stage, limit)
+
+    def done(self, items: list) -> None:
+        if items:
+            self._store.complete(self.stage, items)
+
+    def failed(self, item: str, error: str = None) -> None:
+        """
+        Retries the item later with exponential backoff, or drops it after
+        PIPELINE_MAX_ATTEMPTS (the safety sweep queues it again if the work is still pending).
+        """
+        attempts = self._store.attempts(self.stage, item) + 1
+        if attempts >= PIPELINE_MAX_ATTEMPTS:
+            logger.error(f"Giving up on {self.stage} item {item} after {attempts} attempts: {error}")
+            self._store.complete(self.stage, [item])
+            return
+        delay = PIPELINE_RETRY_DELAY * 2 ** (attempts - 1)
+        logger.warning(f"{self.stage} item {item} failed ({error}), retrying in {delay:.0f}s")
+        self._store.retry_later(self.stage, item, delay, error)
+
+    def wait(self, timeout: float) -> None:
+        self._event.wait(timeout)
+        self._event.clear()
+
+    def wake(self) -> None:
+        self._event.set()
+
+fetch_queue = WorkQueue(STAGE_FETCH)
+parse_queue = WorkQueue(STAGE_PARSE)
+ingest_queue = WorkQueue(STAGE_INGEST)
+
+##################################################################
+# Stage consumers                                                #
+##################################################################
+
+class StageConsumer(threading.Thread):
+    """
+    Daemon thread that drains one WorkQueue. handler(items) processes a
+    batch and returns {item: True/False}; successful items are removed
+    from the queue, failed ones are retried later. When the queue is empty
+    the thread sleeps until new items are put or PIPELINE_IDLE_WAIT passes
+    (to pick up retries that became ready).
+    """
+    def __init__(self, queue: WorkQueue, handler, batch_size: int = PIPELINE_BATCH_SIZE, idle_wait: float = PIPELINE_IDLE_WAIT):
+        super().__init__(name=f"pipeline-{queue.stage}", daemon=True)
+        self.queue = queue
+        self._handler = handler
+        self._batch_size = max(1, batch_size)
+        self._idle_wait = idle_wait
+        self._stopping = threading.Event()
+
+    def run(self) -> None:
+        logger.info(f"Pipeline consumer for stage '{self.queue.stage}' started.")
+        while not self._stopping.is_set():
+            try:
+                items = self.queue.claim(self._batch_size)
+            except Exception as e:
+                logger.error(f"Could not claim {self.queue.stage} items: {e}")
+                items = []
+            if not items:
+                self.queue.wait(self._idle_wait)
+                continue
+            self._process(items)
+
+    def _process(self, items: list) -> None:
+        try:
+            results = self._handler(items) or {}
+            errors = {}
+        except Exception as e:
+            logger.error(f"Pipeline stage '{self.queue.stage}' failed on {len(items)} items: {e}")
+            results = {}
+            errors = {item: str(e) for item in items}
+        self.queue.done([item for item in items if results.get(item)])
+        for item in items:
+            if not results.get(item):
+                self.queue.failed(item, errors.get(item, "stage reported a failure"))
+
+    def stop(self) -> None:
+        self._stopping.set()
+        self.queue.wake()
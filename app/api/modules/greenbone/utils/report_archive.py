@@ -0,0 +1,236 @@
+# app/api/modules/greenbone/utils/report_archive.py
+
+##################################################################
+# Importing packages                                             #
+##################################################################
+
+import os
+import gzip
+import shutil
+import hashlib
+import logging
+import tempfile
+import threading
+
+# zstandard is optional and only needed for ARCHIVE_COMPRESSION=zstd
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+from app.api.core.config import (
+    ARCHIVE_DIR,
+    DETAILED_REPORTS_DIR,
+    ARCHIVE_COMPRESSION,
+    ARCHIVE_RETENTION_DAYS,
+    ARCHIVE_KEEP_PER_TASK,
+    ARCHIVE_MAX_BYTES
+)
+from app.api.modules.greenbone.utils.state_store import (
+    PipelineStateStore,
+    state_store,
+    report_id_from_filename
+)
+
+##################################################################
+# Defining our logger                                            #
+##################################################################
+
+logger = logging.getLogger(__name__)
+
+OBJECTS_DIR = os.path.join(ARCHIVE_DIR, "objects")
+
+COMPRESSION_SUFFIXES = {"gzip": ".xml.gz", "zstd": ".xml.zst"}
+
+# Compression levels: XML compresses well even at moderate levels
+GZIP_LEVEL = 6
+ZSTD_LEVEL = 10
+
+# Held while files are archived and while unreferenced objects are removed,
+# so an object is never deleted between being written and being recorded
+archive_lock = threading.RLock()
+
+##################################################################
+# Compressed objects                                             #
+##################################################################
+
+# Opens an archive object as a binary stream
+def _open_object(path: str, mode: str):
+    if path.endswith(".zst"):
+        if zstandard is None:
+            raise RuntimeError("The zstandard package is required for .zst archive objects")
+        if "w" in mode:
+            return zstandard.open(path, mode, cctx=zstandard.ZstdCompressor(level=ZSTD_LEVEL))
+        return zstandard.open(path, mode)
+    return gzip.open(path, mode, compresslevel=GZIP_LEVEL)
+
+# Opens a report XML file for reading, whether it is an archive object or a plain file
+def open_report_xml(path: str):
+    if path.endswith((".gz", ".zst")):
+        return _open_object(path, "rb")
+    return open(path, "rb")
+
+# Path of the object holding content with the given digest
+def object_path(digest: str, compression: str = ARCHIVE_COMPRESSION) -> str:
+    if compression not in COMPRESSION_SUFFIXES:
+        raise ValueError(f"Unknown archive compression '{compression}'")
+    return os.path.join(OBJECTS_DIR, digest[:2], digest + COMPRESSION_SUFFIXES[compression])
+
+# Compresses an XML file into the object store and removes the original
+def archive_file(file_path: str, compression: str = ARCHIVE_COMPRESSION) -> dict:
+    """
+    Stores file_path as ARCHIVE_DIR/objects/<aa>/<sha256>.xml.gz (or .zst) and
+    deletes it. Identical content is stored once: if the object already
+    exists, only the original is removed. Only touches files, so it can run
+    in a parse worker process; the caller records the result with
+    ReportArchive.record().
+    Returns the object's digest, path, compression and sizes.
+    """
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    digest = digest.hexdigest()
+    path = object_path(digest, compression)
+    raw_size = os.path.getsize(file_path)
+
+    if not os.path.exists(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # The temporary name ends like the object, so _open_object() picks the same compression
+        fd, tmp_path = tempfile.mkstemp(prefix=".", suffix=".part" + COMPRESSION_SUFFIXES[compression], dir=os.path.dirname(path))
+        os.close(fd)
+        try:
+            with open(file_path, "rb") as src, _open_object(tmp_path, "wb") as dst:
+                shutil.copyfileobj(src, dst, 1024 * 1024)
+            os.replace(tmp_path, path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+    os.remove(file_path)
+    return {
+        "digest": digest,
+        "path": path,
+        "compression": compression,
+        "raw_size": raw_size,
+        "stored_size": os.path.getsize(path)
+    }
+
+##################################################################
+# The archive                                                    #
+##################################################################
+
+class ReportArchive:
+    """
+    Compressed, content-addressed store for processed XML reports.
+    The state store maps every archived file name to its object, so
+    duplicate reports share one object and retention works on entries.
+    """
+    def __init__(
+        self,
+        store: PipelineStateStore = state_store,
+        retention_days: float = ARCHIVE_RETENTION_DAYS,
+        keep_per_task: int = ARCHIVE_KEEP_PER_TASK,
+        max_bytes: int = ARCHIVE_MAX_BYTES
+    ):
+        self._store = store
+        self._retention_days = retention_days
+        self._keep_per_task = keep_per_task
+        self._max_bytes = max_bytes
+
+    def record(self, file_name: str, obj: dict, report_id: str = None) -> None:
+        self._store.record_archived(file_name, report_id or report_id_from_filename(file_name), obj)
+
+    def store(self, file_path: str, report_id: str = None) -> dict:
+        """
+        Archives a file and records it in one step.
+        """
+        with archive_lock:
+            obj = archive_file(file_path)
+            self.record(os.path.basename(file_path), obj, report_id)
+        return obj
+
+    def open(self, file_name: str):
+        """
+        Returns a binary stream of the original XML of an archived file.
+        Decompression happens while reading, so it can be handed straight to
+        parse_large_xml() or copied elsewhere without a temporary copy.
+        """
+        entry = self._store.archive_entry(file_name)
+        if entry is None:
+            raise FileNotFoundError(f"{file_name} is not in the archive")
+        return _open_object(entry["path"], "rb")
+
+    def restore(self, file_name: str, directory: str = DETAILED_REPORTS_DIR) -> str:
+        """
+        Decompresses an archived file back into `directory` (by default the
+        detailed reports directory, so the next parse run picks it up again).
+        """
+        target = os.path.join(directory, file_name)
+        fd, tmp_path = tempfile.mkstemp(prefix=".", suffix=".part", dir=directory)
+        try:
+            with os.fdopen(fd, "wb") as dst, self.open(file_name) as src:
+                shutil.copyfileobj(src, dst, 1024 * 1024)
+            os.replace(tmp_path, target)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        logger.info(f"Restored {file_name} from the archive to {directory}")
+        return target
+
+    def import_loose_files(self) -> int:
+        """
+        Moves uncompressed XML files left in ARCHIVE_DIR by earlier versions into the object store.
+        """
+        if not os.path.isdir(ARCHIVE_DIR):
+            return 0
+        imported = 0
+        for file_name in sorted(os.listdir(ARCHIVE_DIR)):
+            file_path = os.path.join(ARCHIVE_DIR, file_name)
+            if not file_name.endswith(".xml") or not os.path.isfile(file_path):
+                continue
+            try:
+                obj = self.store(file_path)
+                self._store.replace_xml_path(report_id_from_filename(file_name), file_name, obj["path"])
+                imported += 1
+            except Exception as e:
+                logger.error(f"Could not archive {file_name}: {e}")
+        if imported:
+            logger.info(f"Compressed {imported} loose XML files into the archive.")
+        return imported
+
+    def enforce_retention(self) -> dict:
+        """
+        Applies the age, per-task and size rules, then deletes the objects no
+        entry refers to anymore.
+        """
+        with archive_lock:
+            expired = self._store.expire_archive(
+                max_age=self._retention_days * 86400,
+                keep_per_task=self._keep_per_task,
+                max_bytes=self._max_bytes
+            )
+            deleted = 0
+            for obj in self._store.unreferenced_archive_objects():
+                self._store.delete_archive_object(obj["digest"])
+                if os.path.exists(obj["path"]):
+                    os.remove(obj["path"])
+                # Drop the fan-out directory once it is empty
+                try:
+                    os.rmdir(os.path.dirname(obj["path"]))
+                except OSError:
+                    pass
+                deleted += 1
+        if expired or deleted:
+            logger.info(f"Archive retention removed {expired} entries and {deleted} objects.")
+        return {"expired_entries": expired, "deleted_objects": deleted}
+
+    def stats(self) -> dict:
+        return self._store.archive_stats()
+
+##################################################################
+# Shared archive instance                                        #
+##################################################################
+
+report_archive = ReportArchive()
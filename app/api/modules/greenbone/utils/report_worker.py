@@ -6,34 +6,47 @@
 
 # General
 import os
-import json
-import glob
-import shutil
+import time
 import datetime
 import logging
-import subprocess
-import xmltodict
-from apscheduler.schedulers.background import BackgroundScheduler
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
 
 # Our packages
 from app.api.modules.greenbone.utils.es_ingest import ingest_parsed_reports
-from app.api.modules.greenbone.utils.gvm_parser import (
-    parse_xml_to_json
+from app.api.modules.greenbone.utils.xml_parser import parse_large_xml
+from app.api.modules.greenbone.utils.parsed_files import open_parsed, parsed_extension, write_records
+from app.api.modules.greenbone.utils.report_archive import archive_file, archive_lock, report_archive
+from app.api.modules.greenbone.utils.job_scheduler import AdaptiveScheduler
+from app.api.modules.greenbone.utils.metrics import observe_report_fetch, observe_parse, PARSE_FAILURES
+from app.api.modules.greenbone.utils.pipeline import (
+    StageConsumer,
+    fetch_queue,
+    parse_queue,
+    ingest_queue
 )
 
-from app.api.modules.greenbone.services.scan_service import (
-    get_all_reports,
-    run_gvm_command
+from app.api.modules.greenbone.services.report_pages import fetch_report_paginated
+from app.api.modules.greenbone.services.report_inventory import inventory
+from app.api.modules.greenbone.services.report_sync import report_sync
+from app.api.modules.greenbone.services.report_fetcher import report_fetcher
+from app.api.modules.greenbone.utils.state_store import (
+    state_store,
+    file_checksum,
+    report_id_from_filename
 )
 
 from app.api.core.config import (
-    GVM_SOCKET_PATH, 
-    REPORTS_DIR,
     ARCHIVE_DIR,
     PARSED_DIR,
     DETAILED_REPORTS_DIR,
-    USER, 
-    PASSWORD
+    PARSE_WORKERS,
+    PARSE_POOL_MIN_BYTES,
+    PIPELINE_SYNC_SECONDS,
+    INVENTORY_REFRESH_SECONDS,
+    PIPELINE_SWEEP_MINUTES
 )
 
 ##################################################################
@@ -42,156 +55,124 @@ from app.api.core.config import (
 
 logger = logging.getLogger(__name__)
 
+_scheduler = None
+_consumers = []
+_parse_pool = None
+_parse_pool_lock = threading.Lock()
+
 def run_report_worker():
     """
-    Starts a background scheduler to run fetch_and_save_report_ids() every 10 minutes.
+    Starts the pipeline: one consumer thread per stage (fetch, parse, ingest)
+    handing work to the next stage through persistent queues, and an adaptive
+    scheduler for the delta sync that feeds the pipeline, the safety sweep and
+    the periodic housekeeping jobs. Scheduled jobs never overlap with
+    themselves and adapt their interval to runtime, backlog and errors.
     """
-    scheduler = BackgroundScheduler()
-
-    # Schedule the job to fetch and save report IDs
-    scheduler.add_job(fetch_and_save_report_ids, 'interval', minutes=60)
-    
-    # Schedule the job to fetch and save the report-task mapping
-    scheduler.add_job(fetch_and_save_report_task_mapping, 'interval', minutes=60)
-
-    # Load the mapping and fetch detailed reports
-    scheduler.add_job(process_all_detailed_reports, 'interval', minutes=1)
-
-    # Parse the XML files and save them
-    scheduler.add_job(process_xml_reports, 'interval', minutes=5)
+    global _scheduler, _consumers
+    # Import the legacy tracking files into the state store (only happens once)
+    state_store.migrate_legacy_files()
+
+    # Items claimed when the previous process stopped are picked up again
+    released = state_store.release_claims()
+    if released:
+        logger.info(f"Re-queued {released} work items claimed before the last shutdown.")
+
+    _consumers = [
+        StageConsumer(fetch_queue, process_all_detailed_reports),
+        StageConsumer(parse_queue, process_xml_reports),
+        StageConsumer(ingest_queue, ingest_parsed_reports)
+    ]
+    for consumer in _consumers:
+        consumer.start()
+
+    scheduler = AdaptiveScheduler()
+
+    # Keep the report listing warm so API requests are served from the cache
+    if INVENTORY_REFRESH_SECONDS > 0:
+        scheduler.add("inventory", inventory.refresh, seconds=INVENTORY_REFRESH_SECONDS, run_now=True)
+
+    # Hourly full reconciliation of the report listing, next to the incremental sync
+    scheduler.add("report_ids", fetch_and_save_report_ids, seconds=60 * 60)
+
+    # Ask gvmd for new or changed reports and queue them for fetching;
+    # polls faster while reports keep changing
+    scheduler.add("sync", sync_and_queue_reports, seconds=PIPELINE_SYNC_SECONDS)
+
+    # Safety sweep: queue anything the hand-off between the stages missed, starting right away
+    scheduler.add(
+        "sweep", lambda: sum(sweep_pipeline().values()), seconds=PIPELINE_SWEEP_MINUTES * 60, run_now=True
+    )
 
-    # Ingest parsed files into elastic
-    scheduler.add_job(ingest_parsed_reports, 'interval', minutes=10)
+    # Compress leftover archive files and apply the archive retention rules
+    scheduler.add("archive", maintain_archive, seconds=60 * 60)
 
     scheduler.start()
+    _scheduler = scheduler
     logger.info("Report processing scheduler started.")
     return scheduler
 
+# Stops the scheduler and the stage consumers
+def stop_report_worker():
+    global _scheduler
+    if _scheduler is not None:
+        _scheduler.shutdown()
+        _scheduler = None
+    for consumer in _consumers:
+        consumer.stop()
+    shutdown_parse_pool()
+
+# Scheduled jobs, stage queues and fetch progress for the status endpoint
+def worker_status() -> dict:
+    return {
+        "jobs": _scheduler.status() if _scheduler is not None else [],
+        "queues": state_store.queue_depths(),
+        "consumers": {consumer.queue.stage: consumer.is_alive() for consumer in _consumers},
+        "fetch": report_fetcher.stats()
+    }
+
 ###################################################################
 # Workflow                                                        #
-# 1) Fetch overview of report ids via get_all_reports             #
-# 2) Save the report ids in a file                                #
-# 3) For each entry in this file fetch the task_id of each report #
-# 4) Create another file to save the mapping between both ids     #
+# 1) Fetch overview of report ids via the report inventory        #
+# 2) Record the report ids in the state store                     #
+# 3) Sync reports modified since the watermark with their task_id #
+# 4) The state store keeps the mapping between both ids           #
 # 5) Fetch detailed report via gvm and save the output            #
 # 6) Parse the report and save the JSON file                      # 
 # 7) Ingest the JSON file into elastic                            #
+# Steps 5-7 hand their output to the next step through the        #
+# persistent work queues in utils/pipeline.py                     #
 ###################################################################
 
 ##################################################################
 # Defining our methods the report worker will be using           #
 ##################################################################
 
-# Hands the report IDs over to the function save_report_ids()
-def fetch_and_save_report_ids() -> str:
+# Records the full report listing in the state store
+def fetch_and_save_report_ids() -> list:
     """
-    Fetches all available reports via get_all_reports(), extracts the report IDs,
-    and saves them to a file.
-    Returns the path to the saved file or None if no report IDs are found.
+    Reads the report listing from the shared inventory, extracts the report IDs,
+    and records them in the state store. This full listing complements the
+    incremental sync as a periodic reconciliation.
+    Returns the list of report IDs.
     """
-    raw_response = get_all_reports()
+    raw_response = inventory.get().response
     if not raw_response:
-        logger.error("No response from get_all_reports()")
-        return None
-    report_ids = extract_report_ids(raw_response)
-    if not report_ids:
-        logger.info("No report IDs found in response.")
-        return None
-    logger.info("Successfully saved report IDs.")
-    return save_report_ids(report_ids)
-
-# Extracts the Report IDs
-def extract_report_ids(raw_response: dict) -> list:
-    """
-    Given the raw response dictionary from get_all_reports(),
-    extract the report IDs as a list.
-    """
-    # Get the report section from the parsed XML response.
+        logger.error("No response from the report inventory")
+        return []
     reports = raw_response.get("get_reports_response", {}).get("report", [])
     if not isinstance(reports, list):
         reports = [reports]
-    # Extract the report IDs (stored in the "@id" attribute)
-    report_ids = [report.get("@id") for report in reports if report.get("@id")]
-    return report_ids
-
-# Saves reports in our directory
-def save_report_ids(report_ids: list) -> str:
-    """
-    Saves the list of report IDs to a file in REPORTS_DIR.
-    The filename includes a timestamp for uniqueness.
-    Returns the full path to the saved file.
-    """
-    os.makedirs(REPORTS_DIR, exist_ok=True)
-    timestamp = datetime.datetime.utcnow().strftime("%Y%m%dT%H%M%SZ")
-    filename = f"report_ids_{timestamp}.txt"
-    filepath = os.path.join(REPORTS_DIR, filename)
-    with open(filepath, "w", encoding="utf-8") as f:
-        for report_id in report_ids:
-            f.write(report_id + "\n")
-    logger.info(f"Saved report IDs to {filepath}")
-    return filepath
-
-##################################################################
-# Defining our methods the report worker will be using           #
-#                                                                #
-# This section contains methods for mapping the report_id with   #
-# the task_id                                                    #
-##################################################################
-
-# Main function to fetch, save and do a mapping or report_id and task_id
-def fetch_and_save_report_task_mapping() -> dict:
-    """
-    Fetches all available reports via get_all_reports(),
-    extracts a mapping of report IDs to task IDs,
-    and saves this mapping to a file.
-    Returns the mapping dictionary.
-    """
-    raw_response = get_all_reports()
-    if not raw_response:
-        logger.error("No response from get_all_reports()")
-        return {}
-    mapping = extract_report_task_mapping(raw_response)
-    if not mapping:
-        logger.info("No report-task mapping found in response.")
-        return {}
-    save_report_task_mapping(mapping)
-    return mapping
-
-# Saving the report task mapping as a file
-def save_report_task_mapping(mapping: dict) -> str:
-    """
-    Saves the report-task mapping to a file in REPORTS_DIR.
-    The filename includes a timestamp for uniqueness.
-    Returns the full path to the saved file.
-    """
-    os.makedirs(REPORTS_DIR, exist_ok=True)
-    timestamp = datetime.datetime.utcnow().strftime("%Y%m%dT%H%M%SZ")
-    filename = f"report_task_mapping_{timestamp}.json"
-    filepath = os.path.join(REPORTS_DIR, filename)
-    with open(filepath, "w", encoding="utf-8") as f:
-        json.dump(mapping, f, indent=2)
-    logger.info(f"Saved report-task mapping to {filepath}")
-    return filepath
-
-# Extracting the data and returning the mapping
-def extract_report_task_mapping(raw_response: dict) -> dict:
-    """
-    Given the raw response dictionary from get_all_reports(),
-    extract a dictionary mapping report IDs to their corresponding task IDs.
-    """
-    reports = raw_response.get("get_reports_response", {}).get("report", [])
-    if not isinstance(reports, list):
-        reports = [reports]
-    
-    mapping = {}
-    for report in reports:
-        report_id = report.get("@id")
-        # The task information may be nested; adjust as needed.
-        task = report.get("task", {})
-        task_id = task.get("@id")
-        if report_id and task_id:
-            mapping[report_id] = task_id
-    return mapping
+    listed = [
+        (report.get("@id"), (report.get("task") or {}).get("@id"), report.get("modification_time") or "")
+        for report in reports
+        if report.get("@id") and (report.get("task") or {}).get("@id")
+    ]
+    if not listed:
+        logger.info("No report IDs found in response.")
+        return []
+    state_store.record_listed(listed)
+    logger.info(f"Recorded {len(listed)} report IDs in the state store.")
+    return [report_id for report_id, _, _ in listed]
 
 ###################################################################
 # Functions for Loading the Mapping and Fetching Detailed Reports #           
@@ -201,114 +182,277 @@ def extract_report_task_mapping(raw_response: dict) -> dict:
 ###################################################################
 
 # Function that fetches the report with the help of the task_id
-def fetch_and_save_detailed_report(report_id: str) -> None:
+def fetch_and_save_detailed_report(report_id: str, force: bool = False, deadline: float = None) -> bool:
     """
-    Fetches the detailed report for the given report_id using the <get_reports> command.
-    If a file for this report_id already exists in either DETAILED_REPORTS_DIR or ARCHIVE_DIR,
-    it will skip fetching and saving a new report.
+    Fetches the detailed report for the given report_id using paginated <get_reports> commands.
+    If the state store already knows a file for this report_id (fetched or archived),
+    it will skip fetching and saving a new report, unless force is set because the report
+    changed since it was fetched; unprocessed files of the old version are then replaced.
+    deadline (time.monotonic()) bounds how long the page requests may go on.
+    Returns True if the report is on disk afterwards.
     """
-    # Build patterns for both directories
-    pattern_detailed = os.path.join(DETAILED_REPORTS_DIR, f"detailed_report_{report_id}_*.xml")
-    pattern_archive = os.path.join(ARCHIVE_DIR, f"detailed_report_{report_id}_*.xml")
-    
-    # Check both directories for existing files
-    existing_files = glob.glob(pattern_detailed) + glob.glob(pattern_archive)
-    if existing_files:
+    known = state_store.get_report(report_id)
+    known_paths = known["xml_paths"] if known else []
+
+    if force:
+        for stale_file in known_paths:
+            if os.path.dirname(stale_file) == DETAILED_REPORTS_DIR and os.path.exists(stale_file):
+                os.remove(stale_file)
+                logger.info(f"Removed outdated detailed report {stale_file}")
+    elif known_paths:
         logger.info(f"Detailed report for report_id {report_id} already exists. Skipping.")
-        return
+        return True
 
-    xml_command = (
-        f'<get_reports report_id="{report_id}" '
-        f'filter="apply_overrides=0 levels=hml min_qod=50 first=1 rows=1000 sort=name ignore_pagination=1" '
-        f'details="1" format_id="a994b278-1f62-11e1-96ac-406186ea4fc5"/>'
-    )
-    detailed_xml = run_gvm_command(xml_command)
-    if detailed_xml:
-        # If detailed_xml is a dict, convert it back to an XML string.
-        if isinstance(detailed_xml, dict):
-            detailed_xml = xmltodict.unparse(detailed_xml, pretty=True)
-        timestamp = datetime.datetime.utcnow().strftime("%Y%m%dT%H%M%SZ")
-        filename = f"detailed_report_{report_id}_{timestamp}.xml"
-        filepath = os.path.join(DETAILED_REPORTS_DIR, filename)
-        with open(filepath, "w", encoding="utf-8") as f:
-            f.write(detailed_xml)
-        logger.info(f"Saved detailed report for report_id {report_id} to {filepath}")
+    os.makedirs(DETAILED_REPORTS_DIR, exist_ok=True)
+    timestamp = datetime.datetime.utcnow().strftime("%Y%m%dT%H%M%SZ")
+    filename = f"detailed_report_{report_id}_{timestamp}.xml"
+    filepath = os.path.join(DETAILED_REPORTS_DIR, filename)
+    started = time.perf_counter()
+    try:
+        # The raw GMP responses go straight to disk page by page, no dict in between
+        paths = fetch_report_paginated(report_id, filepath, deadline=deadline)
+        state_store.record_fetched(report_id, paths, file_checksum(paths[0]) if len(paths) == 1 else None)
+        observe_report_fetch(time.perf_counter() - started, sum(os.path.getsize(path) for path in paths), True)
+        logger.info(f"Saved detailed report for report_id {report_id} to {', '.join(paths)}")
+        return True
+    except Exception as e:
+        observe_report_fetch(time.perf_counter() - started, 0, False)
+        logger.warning(f"Failed to fetch detailed report for report_id {report_id}: {e}")
+        return False
+
+# Helper function that fetches every new or changed report
+def process_all_detailed_reports(report_ids: list = None) -> dict:
+    """
+    Fetches the reports whose current version is not on disk yet, including
+    reports that changed after we fetched them, and queues the new XML files
+    for parsing. Without report_ids an incremental sync runs first and every
+    pending report is fetched; the fetch stage consumer passes the ids it claimed.
+    The reports are fetched by the concurrent fetch stage (GMP_FETCH_WORKERS at once).
+    Returns {report_id: True/False}.
+    """
+    if report_ids is None:
+        report_sync.sync()
+        pending = report_sync.pending()
     else:
-        logger.warning(f"Failed to fetch detailed report for report_id {report_id}")
+        wanted = set(report_ids)
+        pending = {report_id: version for report_id, version in report_sync.pending().items() if report_id in wanted}
+    if not pending:
+        logger.info("No new or changed reports to fetch.")
+    results = report_fetcher.run(
+        pending,
+        lambda report_id, version, deadline: fetch_and_save_detailed_report(
+            report_id, force=version["refetch"], deadline=deadline
+        ),
+        _fetched
+    ) if pending else {}
+    # Reports that are no longer pending have nothing left to do
+    for report_id in report_ids or []:
+        results.setdefault(report_id, True)
+    return results
+
+# Records a fetched report and hands its XML files to the parse stage
+def _fetched(report_id: str, version: dict) -> None:
+    report_sync.mark_fetched(report_id, version["modified"])
+    report = state_store.get_report(report_id) or {}
+    parse_queue.put(
+        os.path.basename(path) for path in report.get("xml_paths", [])
+        if os.path.dirname(path) == DETAILED_REPORTS_DIR and os.path.exists(path)
+    )
+
+# Runs the delta sync and queues new or changed reports for fetching
+def sync_and_queue_reports() -> int:
+    report_sync.sync()
+    return fetch_queue.put(report_sync.pending().keys())
 
-# Reads the file containing the report-task mapping
-def load_report_task_mapping(mapping_dir: str) -> dict:
+# Queues work that is pending in the state store or on disk but not in a queue
+def sweep_pipeline() -> dict:
     """
-    Loads the latest report-task mapping from the specified directory.
+    Safety net for the queue hand-off: queues the reports still waiting to be
+    fetched, the XML files in DETAILED_REPORTS_DIR and the parsed files not yet
+    ingested. Items already queued are not added twice.
     """
-    mapping_file = get_latest_mapping_file(mapping_dir)
-    if not mapping_file:
-        logger.warning("No mapping file found in the directory.")
-        return {}
-    with open(mapping_file, "r", encoding="utf-8") as f:
-        mapping = json.load(f)
-    return mapping
-
-# Loads the latest mapping file 
-def get_latest_mapping_file(mapping_dir: str) -> str:
+    swept = {
+        "fetch": fetch_queue.put(report_sync.pending().keys()),
+        "parse": parse_queue.put(
+            f for f in os.listdir(DETAILED_REPORTS_DIR) if f.endswith(".xml")
+        ) if os.path.isdir(DETAILED_REPORTS_DIR) else 0,
+        "ingest": ingest_queue.put(state_store.pending_ingest())
+    }
+    if any(swept.values()):
+        logger.info(f"Pipeline sweep queued {swept['fetch']} fetches, {swept['parse']} parses and {swept['ingest']} ingests.")
+    return swept
+
+# Parses one XML report into PARSED_DIR and archives it; runs in a worker process
+def parse_xml_report(file_name: str) -> dict:
     """
-    Returns the latest JSON mapping file (by filename order) from the given directory.
-    Assumes filenames contain a timestamp in ISO format.
+    Streams DETAILED_REPORTS_DIR/file_name through parse_large_xml() and writes the
+    records in PARSED_FORMAT (NDJSON by default, compressed per PARSED_COMPRESSION)
+    to a temporary file that is renamed into PARSED_DIR, then compresses the XML file
+    into the content-addressed archive. Only touches files, so it can run in a separate
+    process; the caller records the result in the state store.
+    Returns the archive object, the parsed path, the parsed file's checksum, the record count
+    and the parse duration in seconds.
     """
-    files = [f for f in os.listdir(mapping_dir) if f.startswith("report_task_mapping_") and f.endswith(".json")]
-    if not files:
-        return None
-    files.sort()  # Lexicographical sort works if timestamp is ISO formatted.
-    return os.path.join(mapping_dir, files[-1])
-
-# Helper function that processes all entries in the mapping
-def process_all_detailed_reports():
-    mapping = load_report_task_mapping(REPORTS_DIR)
-    if not mapping:
-        logger.info("No report-task mapping found.")
-        return
-    for report_id in mapping.keys():
-        fetch_and_save_detailed_report(report_id)
-
-# Read the XML reports and parse them to JSON 
-def process_xml_reports():
+    file_path = os.path.join(DETAILED_REPORTS_DIR, file_name)
+    started = time.perf_counter()
+    extension = parsed_extension()
+    # The temporary name keeps the extension so open_parsed() picks the compression
+    tmp_path = os.path.join(PARSED_DIR, f".{file_name}.tmp{extension}")
+    try:
+        # Records are written to a temporary file that is renamed once complete,
+        # so the ingest stage never sees a partial file.
+        with open_parsed(tmp_path, "w") as outfile:
+            _, vuln_count = write_records(parse_large_xml(file_path), outfile)
+        parse_seconds = time.perf_counter() - started
+        logger.info(f"Extracted {file_name} with {vuln_count} vulnerabilities")
+
+        # Named after the XML file, which is unique per report version and page:
+        # detailed_report_<id>_<fetched>[_pNNNN].xml -> parsed_report_<id>_<fetched>[_pNNNN]
+        stem = os.path.splitext(file_name)[0]
+        parsed_filename = f"parsed_{stem.removeprefix('detailed_')}{extension}"
+        parsed_filepath = os.path.join(PARSED_DIR, parsed_filename)
+        os.replace(tmp_path, parsed_filepath)
+        logger.info(f"Saved parsed report to {parsed_filepath}")
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+    # Compress the processed XML file into the archive
+    archived = archive_file(file_path)
+    logger.info(f"Archived file: {file_name} as {os.path.basename(archived['path'])}")
+    return {
+        "archive": archived,
+        "parsed_path": parsed_filepath,
+        "checksum": file_checksum(parsed_filepath),
+        "count": vuln_count,
+        "seconds": parse_seconds
+    }
+
+# Read the XML reports and parse them to JSON
+def process_xml_reports(file_names: list = None) -> dict:
     """
-    For each XML file in DETAILED_REPORTS_DIR:
-      - Parse the file with parse_xml_to_json()
-      - Save the resulting JSON to a file in PARSED_DIR
-      - Archive the processed XML file into ARCHIVE_DIR
+    For each XML file in DETAILED_REPORTS_DIR (or only the given file_names):
+      - Stream the file through parse_large_xml()
+      - Save the records to a file in PARSED_DIR (NDJSON unless PARSED_FORMAT=json)
+      - Compress the processed XML file into the archive (ARCHIVE_DIR/objects)
+      - Queue the parsed file for ingestion
+    With PARSE_WORKERS > 1 the files are spread over a process pool, one file
+    per task, so large reports are parsed on several cores at once. The pool
+    lives as long as the worker; batches below PARSE_POOL_MIN_BYTES are parsed
+    in the calling thread instead. Reports
+    fetched with GMP_REPORT_PAGE_OUTPUT=pages are split into one file per page
+    and thus spread over the pool as well.
+    Returns {file_name: True/False}.
     """
     os.makedirs(ARCHIVE_DIR, exist_ok=True)
     os.makedirs(PARSED_DIR, exist_ok=True)
 
-    xml_files = [f for f in os.listdir(DETAILED_REPORTS_DIR) if f.endswith(".xml")]
+    if file_names is None:
+        xml_files = [f for f in os.listdir(DETAILED_REPORTS_DIR) if f.endswith(".xml")]
+        results = {}
+    else:
+        # Files that are gone were parsed already
+        xml_files = [f for f in file_names if os.path.exists(os.path.join(DETAILED_REPORTS_DIR, f))]
+        results = {f: True for f in file_names if f not in xml_files}
     if not xml_files:
         logger.info("No XML files found for processing.")
-        return
-
+        return results
+
+    # Larger files first, so the longest parses start early
+    xml_files.sort(key=lambda f: os.path.getsize(os.path.join(DETAILED_REPORTS_DIR, f)), reverse=True)
+
+    def record(file_name: str, result: dict) -> None:
+        observe_parse(result["seconds"], result["count"])
+        report_archive.record(file_name, result["archive"])
+        state_store.record_parsed(
+            report_id_from_filename(file_name), result["archive"]["path"], result["parsed_path"],
+            result["checksum"], xml_name=file_name
+        )
+        ingest_queue.put([result["parsed_path"]])
+
+    # Keeps archive retention from removing objects before they are recorded
+    with archive_lock:
+        results.update(_parse_files(xml_files, record))
+    return results
+
+# The parse process pool, started on first use and kept for the worker's lifetime
+def _get_parse_pool() -> ProcessPoolExecutor:
+    global _parse_pool
+    with _parse_pool_lock:
+        if _parse_pool is None:
+            # Spawned workers start from a clean interpreter instead of forking the
+            # threads of the web server and the scheduler; as that means importing
+            # the app in every process, they are reused across parse batches
+            _parse_pool = ProcessPoolExecutor(max_workers=PARSE_WORKERS, mp_context=multiprocessing.get_context("spawn"))
+        return _parse_pool
+
+# Stops the parse processes, e.g. when the worker stops
+def shutdown_parse_pool() -> None:
+    global _parse_pool
+    with _parse_pool_lock:
+        pool, _parse_pool = _parse_pool, None
+    if pool is not None:
+        pool.shutdown(wait=True, cancel_futures=True)
+
+# Total size of the XML files of a batch
+def _batch_bytes(xml_files: list) -> int:
+    total = 0
     for file_name in xml_files:
-        file_path = os.path.join(DETAILED_REPORTS_DIR, file_name)
         try:
-            json_data = parse_xml_to_json(file_path)
-            
-            # Use the first vulnerability's id as the report id if available.
-            vulnerabilities = json_data.get("vulnerabilities", [])
-            report_id = vulnerabilities[0].get("id") if vulnerabilities else "unknown"
-            vuln_count = len(vulnerabilities)
-            logger.info(f"Extracted report {report_id} with {vuln_count} vulnerabilities")
-            
-            # Save parsed JSON file with a timestamp
-            timestamp = datetime.datetime.utcnow().strftime("%Y%m%dT%H%M%SZ")
-            parsed_filename = f"parsed_report_{report_id}_{timestamp}.json"
-            parsed_filepath = os.path.join(PARSED_DIR, parsed_filename)
-            with open(parsed_filepath, "w", encoding="utf-8") as outfile:
-                json.dump(json_data, outfile, indent=2)
-            logger.info(f"Saved parsed report to {parsed_filepath}")
-
-            # Move the processed XML file to the archive directory
-            shutil.move(file_path, os.path.join(ARCHIVE_DIR, file_name))
-            logger.info(f"Archived file: {file_name}")
+            total += os.path.getsize(os.path.join(DETAILED_REPORTS_DIR, file_name))
+        except OSError:
+            pass
+    return total
+
+# Parses the files in this thread or, with PARSE_WORKERS > 1 and enough data, in the process pool
+def _parse_files(xml_files: list, record) -> dict:
+    results = {}
+    workers = min(PARSE_WORKERS, len(xml_files))
+    if workers <= 1 or _batch_bytes(xml_files) < PARSE_POOL_MIN_BYTES:
+        for file_name in xml_files:
+            try:
+                record(file_name, parse_xml_report(file_name))
+                results[file_name] = True
+            except Exception as e:
+                PARSE_FAILURES.inc()
+                logger.error(f"Error processing file {file_name}: {e}")
+                results[file_name] = False
+        return results
+
+    started = datetime.datetime.utcnow()
+    executor = _get_parse_pool()
+    futures = {executor.submit(parse_xml_report, file_name): file_name for file_name in xml_files}
+    broken = False
+    for future in as_completed(futures):
+        file_name = futures[future]
+        try:
+            result = future.result()
+            record(file_name, result)
+            results[file_name] = True
+            logger.info(f"Parsed {file_name} into {result['parsed_path']} ({result['count']} vulnerabilities)")
         except Exception as e:
+            broken = broken or isinstance(e, BrokenProcessPool)
+            PARSE_FAILURES.inc()
             logger.error(f"Error processing file {file_name}: {e}")
-
-
+            results[file_name] = False
+    # A worker process died (e.g. killed for memory); the next batch gets a new pool
+    if broken:
+        shutdown_parse_pool()
+    elapsed = (datetime.datetime.utcnow() - started).total_seconds()
+    logger.info(f"Parsed {len(xml_files)} XML reports with {workers} processes in {elapsed:.1f}s.")
+    return results
+
+# Keeps the XML archive compressed and within its retention limits
+def maintain_archive():
+    """
+    Compresses XML files still lying uncompressed in ARCHIVE_DIR, then applies the
+    retention rules (ARCHIVE_RETENTION_DAYS, ARCHIVE_KEEP_PER_TASK, ARCHIVE_MAX_BYTES).
+    """
+    report_archive.import_loose_files()
+    report_archive.enforce_retention()
+    stats = report_archive.stats()
+    logger.info(
+        f"Archive holds {stats['entries']} files in {stats['objects']} objects, "
+        f"{stats['stored_bytes']} bytes compressed from {stats['raw_bytes']}."
+    )
@@ -0,0 +1,662 @@
+# app/api/modules/greenbone/utils/state_store.py
+
+##################################################################
+# Importing packages                                             #
+##################################################################
+
+import os
+import re
+import json
+import time
+import sqlite3
+import hashlib
+import logging
+import threading
+
+from app.api.core.config import (
+    STATE_DB_PATH,
+    SYNC_STATE_FILE,
+    REPORTS_DIR,
+    DETAILED_REPORTS_DIR,
+    ARCHIVE_DIR,
+    PARSED_DIR
+)
+
+##################################################################
+# Defining our logger                                            #
+##################################################################
+
+logger = logging.getLogger(__name__)
+
+# Report stages, in pipeline order
+STAGE_LISTED = "listed"
+STAGE_FETCHED = "fetched"
+STAGE_PARSED = "parsed"
+STAGE_INGESTED = "ingested"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+CREATE TABLE IF NOT EXISTS reports (
+    report_id TEXT PRIMARY KEY,
+    task_id TEXT,
+    stage TEXT NOT NULL,
+    modified TEXT,
+    fetched_modified TEXT,
+    xml_paths TEXT,
+    xml_checksum TEXT,
+    listed_at REAL,
+    fetched_at REAL,
+    parsed_at REAL,
+    ingested_at REAL
+);
+CREATE INDEX IF NOT EXISTS reports_stage ON reports(stage);
+CREATE INDEX IF NOT EXISTS reports_task ON reports(task_id);
+CREATE INDEX IF NOT EXISTS reports_pending ON reports(report_id) WHERE fetched_modified IS NOT modified;
+CREATE TABLE IF NOT EXISTS parsed_files (
+    filename TEXT PRIMARY KEY,
+    report_id TEXT,
+    path TEXT,
+    checksum TEXT,
+    created_at REAL,
+    ingested_at REAL
+);
+CREATE INDEX IF NOT EXISTS parsed_files_report ON parsed_files(report_id);
+CREATE INDEX IF NOT EXISTS parsed_files_pending ON parsed_files(filename) WHERE ingested_at IS NULL;
+CREATE TABLE IF NOT EXISTS vuln_hashes (
+    vuln_id TEXT PRIMARY KEY,
+    content_hash TEXT NOT NULL,
+    last_seen TEXT,
+    indexed_at REAL
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS archive_objects (
+    digest TEXT PRIMARY KEY,
+    path TEXT NOT NULL,
+    compression TEXT NOT NULL,
+    raw_size INTEGER,
+    stored_size INTEGER,
+    created_at REAL
+);
+CREATE TABLE IF NOT EXISTS archive_entries (
+    file_name TEXT PRIMARY KEY,
+    report_id TEXT,
+    digest TEXT NOT NULL,
+    archived_at REAL
+);
+CREATE INDEX IF NOT EXISTS archive_entries_digest ON archive_entries(digest);
+CREATE INDEX IF NOT EXISTS archive_entries_report ON archive_entries(report_id);
+CREATE INDEX IF NOT EXISTS archive_entries_time ON archive_entries(archived_at);
+CREATE TABLE IF NOT EXISTS work_queue (
+    stage TEXT NOT NULL,
+    item TEXT NOT NULL,
+    enqueued_at REAL,
+    available_at REAL,
+    claimed_at REAL,
+    attempts INTEGER DEFAULT 0,
+    last_error TEXT,
+    PRIMARY KEY (stage, item)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS work_queue_ready ON work_queue(stage, available_at) WHERE claimed_at IS NULL;
+"""
+
+# Upper bound for host parameters in one SQLite statement
+SQL_BATCH_SIZE = 500
+
+# detailed_report_<report_id>_<timestamp>[_pNNNN].xml
+DETAILED_FILE_PATTERN = re.compile(r"^detailed_report_(?P<report_id>.+?)_\d{8}T\d{6}Z(_p\d+)?\.xml$")
+
+# Extracts the report id from a detailed report file name
+def report_id_from_filename(file_name: str) -> str:
+    match = DETAILED_FILE_PATTERN.match(os.path.basename(file_name))
+    return match.group("report_id") if match else None
+
+# SHA-256 of a file, read in chunks
+def file_checksum(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+##################################################################
+# The state store                                                #
+##################################################################
+
+class PipelineStateStore:
+    """
+    Embedded SQLite store (WAL mode) tracking each report through the
+    pipeline: its stage, file paths, checksums and timestamps. All lookups
+    go through the primary key or an index.
+    Each thread gets its own connection.
+    """
+    def __init__(self, db_path: str = STATE_DB_PATH):
+        self._db_path = db_path
+        self._local = threading.local()
+        self._init_lock = threading.Lock()
+        self._initialized = False
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            os.makedirs(os.path.dirname(self._db_path) or ".", exist_ok=True)
+            conn = sqlite3.connect(self._db_path, timeout=30, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            with self._init_lock:
+                if not self._initialized:
+                    conn.executescript(SCHEMA)
+                    self._initialized = True
+            self._local.conn = conn
+        return conn
+
+    def _execute(self, sql: str, params: tuple = ()) -> sqlite3.Cursor:
+        return self._connection().execute(sql, params)
+
+    def transaction(self):
+        """
+        Returns the thread's connection as a context manager wrapping one transaction.
+        """
+        return _Transaction(self._connection())
+
+    ##############################################################
+    # Meta values                                                #
+    ##############################################################
+
+    def get_meta(self, key: str) -> str:
+        row = self._execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row["value"] if row else None
+
+    def set_meta(self, key: str, value: str) -> None:
+        self._execute(
+            "INSERT INTO meta (key, value) VALUES (?, ?) ON CONFLICT(key) DO UPDATE SET value = excluded.value",
+            (key, value)
+        )
+
+    ##############################################################
+    # Listing                                                    #
+    ##############################################################
+
+    def record_listed(self, reports: list) -> list:
+        """
+        Upserts (report_id, task_id, modified) tuples from a report listing.
+        Returns the ids of reports that are new or whose modification time changed.
+        """
+        now = time.time()
+        changed = []
+        with self.transaction() as conn:
+            for report_id, task_id, modified in reports:
+                row = conn.execute("SELECT modified FROM reports WHERE report_id = ?", (report_id,)).fetchone()
+                if row is None:
+                    conn.execute(
+                        "INSERT INTO reports (report_id, task_id, stage, modified, listed_at) VALUES (?, ?, ?, ?, ?)",
+                        (report_id, task_id, STAGE_LISTED, modified, now)
+                    )
+                    changed.append(report_id)
+                elif row["modified"] != modified:
+                    conn.execute(
+                        "UPDATE reports SET task_id = ?, modified = ?, listed_at = ? WHERE report_id = ?",
+                        (task_id, modified, now, report_id)
+                    )
+                    changed.append(report_id)
+        return changed
+
+    def report_task_mapping(self) -> dict:
+        rows = self._execute("SELECT report_id, task_id FROM reports WHERE task_id IS NOT NULL")
+        return {row["report_id"]: row["task_id"] for row in rows}
+
+    def get_report(self, report_id: str) -> dict:
+        row = self._execute("SELECT * FROM reports WHERE report_id = ?", (report_id,)).fetchone()
+        if row is None:
+            return None
+        report = dict(row)
+        report["xml_paths"] = json.loads(report["xml_paths"]) if report["xml_paths"] else []
+        return report
+
+    def reports_in_stage(self, stage: str) -> list:
+        return [row["report_id"] for row in self._execute("SELECT report_id FROM reports WHERE stage = ?", (stage,))]
+
+    ##############################################################
+    # Fetching                                                   #
+    ##############################################################
+
+    def pending_fetch(self) -> dict:
+        """
+        Reports whose listed version is not on disk yet, as
+        {report_id: {"modified": ..., "refetch": ...}}.
+        """
+        rows = self._execute(
+            "SELECT report_id, modified, fetched_modified FROM reports "
+            "WHERE fetched_modified IS NOT modified"
+        )
+        return {
+            row["report_id"]: {"modified": row["modified"], "refetch": row["fetched_modified"] is not None}
+            for row in rows
+        }
+
+    def record_fetched(self, report_id: str, xml_paths: list, checksum: str = None) -> None:
+        self._execute(
+            "INSERT INTO reports (report_id, stage, xml_paths, xml_checksum, fetched_at) VALUES (?, ?, ?, ?, ?) "
+            "ON CONFLICT(report_id) DO UPDATE SET stage = excluded.stage, xml_paths = excluded.xml_paths, "
+            "xml_checksum = excluded.xml_checksum, fetched_at = excluded.fetched_at",
+            (report_id, STAGE_FETCHED, json.dumps(xml_paths), checksum, time.time())
+        )
+
+    def set_fetched_version(self, report_id: str, modified: str) -> None:
+        self._execute("UPDATE reports SET fetched_modified = ? WHERE report_id = ?", (modified, report_id))
+
+    ##############################################################
+    # Parsing and ingestion                                      #
+    ##############################################################
+
+    def record_parsed(
+        self, report_id: str, archived_path: str, parsed_path: str, checksum: str = None, xml_name: str = None
+    ) -> None:
+        """
+        Records a parsed file and moves the report's XML path to the archive.
+        xml_name is the name of the parsed XML file if the archived path does not end in it.
+        """
+        now = time.time()
+        with self.transaction() as conn:
+            row = conn.execute("SELECT xml_paths FROM reports WHERE report_id = ?", (report_id,)).fetchone()
+            if row is not None:
+                paths = json.loads(row["xml_paths"]) if row["xml_paths"] else []
+                name = xml_name or os.path.basename(archived_path)
+                paths = [archived_path if os.path.basename(p) == name else p for p in paths] or [archived_path]
+                conn.execute(
+                    "UPDATE reports SET stage = ?, xml_paths = ?, parsed_at = ? WHERE report_id = ?",
+                    (STAGE_PARSED, json.dumps(paths), now, report_id)
+                )
+            conn.execute(
+                "INSERT INTO parsed_files (filename, report_id, path, checksum, created_at) VALUES (?, ?, ?, ?, ?) "
+                "ON CONFLICT(filename) DO UPDATE SET report_id = excluded.report_id, path = excluded.path, "
+                "checksum = excluded.checksum, created_at = excluded.created_at, ingested_at = NULL",
+                (os.path.basename(parsed_path), report_id, parsed_path, checksum, now)
+            )
+
+    def pending_ingest(self) -> list:
+        """
+        Paths of parsed files that have not been ingested yet, oldest first.
+        """
+        rows = self._execute(
+            "SELECT path FROM parsed_files WHERE ingested_at IS NULL AND path IS NOT NULL ORDER BY created_at"
+        )
+        return [row["path"] for row in rows]
+
+    def is_ingested(self, filename: str) -> bool:
+        row = self._execute("SELECT ingested_at FROM parsed_files WHERE filename = ?", (filename,)).fetchone()
+        return row is not None and row["ingested_at"] is not None
+
+    def mark_ingested(self, filename: str) -> None:
+        """
+        Marks a parsed file as ingested; the report follows once all its parsed files are.
+        """
+        now = time.time()
+        with self.transaction() as conn:
+            conn.execute(
+                "INSERT INTO parsed_files (filename, created_at, ingested_at) VALUES (?, ?, ?) "
+                "ON CONFLICT(filename) DO UPDATE SET ingested_at = excluded.ingested_at",
+                (filename, now, now)
+            )
+            row = conn.execute("SELECT report_id FROM parsed_files WHERE filename = ?", (filename,)).fetchone()
+            report_id = row["report_id"] if row else None
+            if report_id:
+                open_files = conn.execute(
+                    "SELECT COUNT(*) FROM parsed_files WHERE report_id = ? AND ingested_at IS NULL", (report_id,)
+                ).fetchone()[0]
+                if open_files == 0:
+                    conn.execute(
+                        "UPDATE reports SET stage = ?, ingested_at = ? WHERE report_id = ?",
+                        (STAGE_INGESTED, now, report_id)
+                    )
+
+    ##############################################################
+    # Content hashes of indexed vulnerabilities                  #
+    ##############################################################
+
+    def known_hashes(self, vuln_ids: list) -> dict:
+        """
+        Returns {vuln_id: content_hash} for the given ids that have been indexed before.
+        """
+        hashes = {}
+        for start in range(0, len(vuln_ids), SQL_BATCH_SIZE):
+            batch = vuln_ids[start:start + SQL_BATCH_SIZE]
+            placeholders = ",".join("?" * len(batch))
+            rows = self._execute(
+                f"SELECT vuln_id, content_hash FROM vuln_hashes WHERE vuln_id IN ({placeholders})", tuple(batch)
+            )
+            hashes.update((row["vuln_id"], row["content_hash"]) for row in rows)
+        return hashes
+
+    def record_indexed(self, entries: list) -> None:
+        """
+        Stores (vuln_id, content_hash, last_seen) tuples of documents Elasticsearch accepted.
+        """
+        now = time.time()
+        with self.transaction() as conn:
+            conn.executemany(
+                "INSERT INTO vuln_hashes (vuln_id, content_hash, last_seen, indexed_at) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT(vuln_id) DO UPDATE SET content_hash = excluded.content_hash, "
+                "last_seen = excluded.last_seen, indexed_at = excluded.indexed_at",
+                [(vuln_id, digest, last_seen, now) for vuln_id, digest, last_seen in entries]
+            )
+
+    def record_seen(self, entries: list) -> None:
+        """
+        Updates last_seen from (vuln_id, last_seen) tuples of unchanged documents.
+        """
+        with self.transaction() as conn:
+            conn.executemany(
+                "UPDATE vuln_hashes SET last_seen = ? WHERE vuln_id = ?",
+                [(last_seen, vuln_id) for vuln_id, last_seen in entries]
+            )
+
+    def forget_hashes(self, vuln_ids: list) -> None:
+        """
+        Drops hashes whose documents are no longer in Elasticsearch.
+        """
+        with self.transaction() as conn:
+            conn.executemany("DELETE FROM vuln_hashes WHERE vuln_id = ?", [(vuln_id,) for vuln_id in vuln_ids])
+
+    ##############################################################
+    # Archive                                                    #
+    ##############################################################
+
+    def record_archived(self, file_name: str, report_id: str, obj: dict) -> None:
+        """
+        Links an archived XML file to its content-addressed object
+        (digest, path, compression, raw_size, stored_size).
+        """
+        now = time.time()
+        with self.transaction() as conn:
+            conn.execute(
+                "INSERT OR IGNORE INTO archive_objects (digest, path, compression, raw_size, stored_size, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (obj["digest"], obj["path"], obj["compression"], obj["raw_size"], obj["stored_size"], now)
+            )
+            conn.execute(
+                "INSERT INTO archive_entries (file_name, report_id, digest, archived_at) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT(file_name) DO UPDATE SET report_id = excluded.report_id, digest = excluded.digest, "
+                "archived_at = excluded.archived_at",
+                (file_name, report_id, obj["digest"], now)
+            )
+
+    def replace_xml_path(self, report_id: str, xml_name: str, new_path: str) -> None:
+        """
+        Points the report's XML path named xml_name at new_path.
+        """
+        with self.transaction() as conn:
+            row = conn.execute("SELECT xml_paths FROM reports WHERE report_id = ?", (report_id,)).fetchone()
+            if row is None or not row["xml_paths"]:
+                return
+            paths = [new_path if os.path.basename(p) == xml_name else p for p in json.loads(row["xml_paths"])]
+            conn.execute("UPDATE reports SET xml_paths = ? WHERE report_id = ?", (json.dumps(paths), report_id))
+
+    def archive_entry(self, file_name: str) -> dict:
+        row = self._execute(
+            "SELECT e.file_name, e.report_id, e.archived_at, o.* FROM archive_entries e "
+            "JOIN archive_objects o ON o.digest = e.digest WHERE e.file_name = ?",
+            (file_name,)
+        ).fetchone()
+        return dict(row) if row else None
+
+    def archive_entries_for_report(self, report_id: str) -> list:
+        rows = self._execute(
+            "SELECT file_name FROM archive_entries WHERE report_id = ? ORDER BY file_name", (report_id,)
+        )
+        return [row["file_name"] for row in rows]
+
+    def expire_archive(self, max_age: float = 0, keep_per_task: int = 0, max_bytes: int = 0) -> int:
+        """
+        Removes archive entries older than max_age seconds, beyond the newest
+        keep_per_task reports of each task and, oldest first, until the objects
+        still referenced take at most max_bytes. Zero disables a rule.
+        Returns the number of removed entries; the objects are left to
+        unreferenced_archive_objects().
+        """
+        removed = 0
+        with self.transaction() as conn:
+            if max_age > 0:
+                removed += conn.execute(
+                    "DELETE FROM archive_entries WHERE archived_at < ?", (time.time() - max_age,)
+                ).rowcount
+            if keep_per_task > 0:
+                removed += conn.execute(
+                    "WITH report_times AS ("
+                    "  SELECT COALESCE(e.report_id, e.file_name) AS rid, "
+                    "         COALESCE(r.task_id, e.report_id, e.file_name) AS task, MAX(e.archived_at) AS t "
+                    "  FROM archive_entries e LEFT JOIN reports r ON r.report_id = e.report_id GROUP BY rid"
+                    "), ranked AS ("
+                    "  SELECT rid, ROW_NUMBER() OVER (PARTITION BY task ORDER BY t DESC) AS rn FROM report_times"
+                    ") DELETE FROM archive_entries "
+                    "WHERE COALESCE(report_id, file_name) IN (SELECT rid FROM ranked WHERE rn > ?)",
+                    (keep_per_task,)
+                ).rowcount
+            if max_bytes > 0:
+                total = conn.execute(
+                    "SELECT COALESCE(SUM(stored_size), 0) FROM archive_objects "
+                    "WHERE digest IN (SELECT digest FROM archive_entries)"
+                ).fetchone()[0]
+                oldest = conn.execute(
+                    "SELECT e.file_name, e.digest, o.stored_size FROM archive_entries e "
+                    "JOIN archive_objects o ON o.digest = e.digest ORDER BY e.archived_at"
+                ).fetchall()
+                for row in oldest:
+                    if total <= max_bytes:
+                        break
+                    conn.execute("DELETE FROM archive_entries WHERE file_name = ?", (row["file_name"],))
+                    removed += 1
+                    still_used = conn.execute(
+                        "SELECT 1 FROM archive_entries WHERE digest = ? LIMIT 1", (row["digest"],)
+                    ).fetchone()
+                    if still_used is None:
+                        total -= row["stored_size"] or 0
+        return removed
+
+    def unreferenced_archive_objects(self) -> list:
+        rows = self._execute(
+            "SELECT digest, path FROM archive_objects o "
+            "WHERE NOT EXISTS (SELECT 1 FROM archive_entries e WHERE e.digest = o.digest)"
+        )
+        return [dict(row) for row in rows]
+
+    def delete_archive_object(self, digest: str) -> None:
+        """
+        Drops an object row unless an entry started referencing it again.
+        """
+        self._execute(
+            "DELETE FROM archive_objects WHERE digest = ? "
+            "AND NOT EXISTS (SELECT 1 FROM archive_entries WHERE digest = ?)",
+            (digest, digest)
+        )
+
+    def archive_stats(self) -> dict:
+        entries = self._execute("SELECT COUNT(*) FROM archive_entries").fetchone()[0]
+        row = self._execute(
+            "SELECT COUNT(*) AS objects, COALESCE(SUM(raw_size), 0) AS raw_bytes, "
+            "COALESCE(SUM(stored_size), 0) AS stored_bytes FROM archive_objects"
+        ).fetchone()
+        return {"entries": entries, **dict(row)}
+
+    ##############################################################
+    # Work queues between the pipeline stages                    #
+    ##############################################################
+
+    def enqueue(self, stage: str, items: list) -> int:
+        """
+        Adds items to a stage's queue; items already queued are left alone.
+        Returns the number of newly queued items.
+        """
+        now = time.time()
+        with self.transaction() as conn:
+            before = conn.total_changes
+            conn.executemany(
+                "INSERT OR IGNORE INTO work_queue (stage, item, enqueued_at, available_at) VALUES (?, ?, ?, ?)",
+                [(stage, item, now, now) for item in items]
+            )
+            return conn.total_changes - before
+
+    def claim(self, stage: str, limit: int) -> list:
+        """
+        Claims up to `limit` ready items of a stage, oldest first.
+        """
+        now = time.time()
+        with self.transaction() as conn:
+            rows = conn.execute(
+                "SELECT item FROM work_queue WHERE stage = ? AND claimed_at IS NULL AND available_at <= ? "
+                "ORDER BY available_at LIMIT ?",
+                (stage, now, limit)
+            ).fetchall()
+            items = [row["item"] for row in rows]
+            conn.executemany(
+                "UPDATE work_queue SET claimed_at = ? WHERE stage = ? AND item = ?",
+                [(now, stage, item) for item in items]
+            )
+        return items
+
+    def complete(self, stage: str, items: list) -> None:
+        with self.transaction() as conn:
+            conn.executemany("DELETE FROM work_queue WHERE stage = ? AND item = ?", [(stage, item) for item in items])
+
+    def retry_later(self, stage: str, item: str, delay: float, error: str = None) -> None:
+        """
+        Releases a claimed item that failed; it becomes ready again after `delay` seconds.
+        """
+        self._execute(
+            "UPDATE work_queue SET claimed_at = NULL, available_at = ?, attempts = attempts + 1, last_error = ? "
+            "WHERE stage = ? AND item = ?",
+            (time.time() + delay, error, stage, item)
+        )
+
+    def attempts(self, stage: str, item: str) -> int:
+        row = self._execute("SELECT attempts FROM work_queue WHERE stage = ? AND item = ?", (stage, item)).fetchone()
+        return row["attempts"] if row else 0
+
+    def release_claims(self) -> int:
+        """
+        Makes items claimed by a previous process ready again (called on startup).
+        """
+        return self._execute("UPDATE work_queue SET claimed_at = NULL WHERE claimed_at IS NOT NULL").rowcount
+
+    def queue_depths(self) -> dict:
+        rows = self._execute(
+            "SELECT stage, COUNT(*) AS queued, SUM(claimed_at IS NOT NULL) AS claimed FROM work_queue GROUP BY stage"
+        )
+        return {row["stage"]: {"queued": row["queued"], "claimed": row["claimed"] or 0} for row in rows}
+
+    ##############################################################
+    # One-time migration from the legacy tracking files          #
+    ##############################################################
+
+    def migrate_legacy_files(self) -> None:
+        """
+        Imports the state that used to live in flat files: the JSON sync state,
+        the newest report_task_mapping_*.json, the detailed and archived XML files
+        and ingested_reports.txt. Runs only once per database.
+        """
+        if self.get_meta("legacy_migrated"):
+            return
+        with self.transaction() as conn:
+            self._migrate_sync_state(conn)
+            self._migrate_mapping(conn)
+            self._migrate_xml_files(conn, DETAILED_REPORTS_DIR, STAGE_FETCHED)
+            self._migrate_xml_files(conn, ARCHIVE_DIR, STAGE_PARSED)
+            self._migrate_parsed_files(conn)
+            conn.execute(
+                "INSERT OR REPLACE INTO meta (key, value) VALUES ('legacy_migrated', ?)", (str(time.time()),)
+            )
+        logger.info("Migrated legacy pipeline tracking files into the state store.")
+
+    def _migrate_sync_state(self, conn) -> None:
+        if not os.path.exists(SYNC_STATE_FILE):
+            return
+        try:
+            with open(SYNC_STATE_FILE, "r", encoding="utf-8") as f:
+                state = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.error(f"Could not read legacy sync state {SYNC_STATE_FILE}: {e}")
+            return
+        if state.get("watermark"):
+            conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('watermark', ?)", (state["watermark"],))
+        for report_id, entry in state.get("reports", {}).items():
+            conn.execute(
+                "INSERT OR IGNORE INTO reports (report_id, task_id, stage, modified, fetched_modified, listed_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (report_id, entry.get("task_id"), STAGE_LISTED, entry.get("modified"), entry.get("fetched"), time.time())
+            )
+
+    def _migrate_mapping(self, conn) -> None:
+        if not os.path.isdir(REPORTS_DIR):
+            return
+        files = sorted(
+            f for f in os.listdir(REPORTS_DIR) if f.startswith("report_task_mapping_") and f.endswith(".json")
+        )
+        if not files:
+            return
+        try:
+            with open(os.path.join(REPORTS_DIR, files[-1]), "r", encoding="utf-8") as f:
+                mapping = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.error(f"Could not read legacy mapping {files[-1]}: {e}")
+            return
+        for report_id, task_id in mapping.items():
+            conn.execute(
+                "INSERT OR IGNORE INTO reports (report_id, task_id, stage, listed_at) VALUES (?, ?, ?, ?)",
+                (report_id, task_id, STAGE_LISTED, time.time())
+            )
+
+    def _migrate_xml_files(self, conn, directory: str, stage: str) -> None:
+        if not os.path.isdir(directory):
+            return
+        files = {}
+        for file_name in sorted(os.listdir(directory)):
+            report_id = report_id_from_filename(file_name)
+            if report_id:
+                files.setdefault(report_id, []).append(os.path.join(directory, file_name))
+        for report_id, paths in files.items():
+            conn.execute(
+                "INSERT INTO reports (report_id, stage, xml_paths, fetched_at) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT(report_id) DO UPDATE SET stage = excluded.stage, xml_paths = excluded.xml_paths, "
+                "fetched_at = excluded.fetched_at",
+                (report_id, stage, json.dumps(paths), os.path.getmtime(paths[0]))
+            )
+
+    def _migrate_parsed_files(self, conn) -> None:
+        if not os.path.isdir(PARSED_DIR):
+            return
+        ingested = set()
+        ingested_file_path = os.path.join(PARSED_DIR, "ingested_reports.txt")
+        if os.path.exists(ingested_file_path):
+            with open(ingested_file_path, "r", encoding="utf-8") as f:
+                ingested = set(line.strip() for line in f if line.strip())
+        now = time.time()
+        for file_name in os.listdir(PARSED_DIR):
+            if not file_name.endswith(".json"):
+                continue
+            conn.execute(
+                "INSERT OR IGNORE INTO parsed_files (filename, path, created_at, ingested_at) VALUES (?, ?, ?, ?)",
+                (file_name, os.path.join(PARSED_DIR, file_name), now, now if file_name in ingested else None)
+            )
+
+# Wraps a connection in BEGIN/COMMIT, rolling back on errors
+class _Transaction:
+    def __init__(self, conn: sqlite3.Connection):
+        self._conn = conn
+
+    def __enter__(self) -> sqlite3.Connection:
+        self._conn.execute("BEGIN IMMEDIATE")
+        return self._conn
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc_type is None:
+            self._conn.execute("COMMIT")
+        else:
+            self._conn.execute("ROLLBACK")
+
+##################################################################
+# Shared store instance                                          #
+##################################################################
+
+state_store = PipelineStateStore()
@@ -0,0 +1,110 @@
+# app/api/modules/greenbone/utils/xml_parser.py
+
+##################################################################
+# Importing packages                                             #
+##################################################################
+
+import json
+import hashlib
+from typing import Iterator, Dict
+
+from lxml import etree
+
+# Fields that change on every scan even when the finding itself is unchanged
+VOLATILE_FIELDS = ("creation_time", "modification_time", "content_hash", "last_seen")
+
+##################################################################
+# Change detection                                               #
+##################################################################
+
+# Stable hash of a vulnerability record, ignoring the volatile fields
+def content_hash(vuln: Dict) -> str:
+    """
+    Returns the SHA-1 of the record serialized with sorted keys. The record
+    includes the gvmd result id, so only the same result read again (a report
+    fetched or parsed twice) gets the same hash, not a later scan's finding.
+    """
+    stable = {key: value for key, value in vuln.items() if key not in VOLATILE_FIELDS}
+    serialized = json.dumps(stable, sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha1(serialized.encode("utf-8")).hexdigest()
+
+##################################################################
+# Streaming parser for detailed reports                          #
+##################################################################
+
+# Extracts the fields of a single <result> element
+def extract_vulnerability(result) -> Dict:
+    """
+    Builds a vulnerability record from a <result> element.
+    The fields are the ones ingested into Elasticsearch.
+    """
+    vuln = {}
+    # Basic fields
+    vuln["id"] = result.get("id")
+    vuln["title"] = result.findtext("name")
+    vuln["creation_time"] = result.findtext("creation_time")
+    vuln["modification_time"] = result.findtext("modification_time")
+
+    # Process host info
+    host_elem = result.find("host")
+    host_info = {}
+    if host_elem is not None:
+        host_info["hostname"] = host_elem.findtext("hostname")
+        # Sometimes the IP appears as tail text after the hostname element
+        hostname_elem = host_elem.find("hostname")
+        if hostname_elem is not None and hostname_elem.tail:
+            host_info["ip"] = hostname_elem.tail.strip()
+    vuln["host"] = host_info
+
+    # Port info
+    vuln["port"] = result.findtext("port")
+
+    # Extract details from <nvt>
+    nvt_elem = result.find("nvt")
+    nvt_info = {}
+    if nvt_elem is not None:
+        nvt_info["type"] = nvt_elem.findtext("type")
+        nvt_info["name"] = nvt_elem.findtext("name")
+        nvt_info["family"] = nvt_elem.findtext("family")
+        nvt_info["cvss_base"] = nvt_elem.findtext("cvss_base")
+        nvt_info["tags"] = nvt_elem.findtext("tags")
+        nvt_info["solution"] = nvt_elem.findtext("solution")
+        # Grab one severity detail if available
+        severity_elem = nvt_elem.find(".//severity")
+        if severity_elem is not None:
+            nvt_info["severity_score"] = severity_elem.findtext("score")
+            nvt_info["severity_value"] = severity_elem.findtext("value")
+    vuln["nvt"] = nvt_info
+
+    vuln["threat"] = result.findtext("threat")
+    vuln["severity"] = result.findtext("severity")
+    vuln["qod"] = result.findtext("qod/value")
+    vuln["description"] = result.findtext("description")
+    vuln["content_hash"] = content_hash(vuln)
+    return vuln
+
+# Iterates over the vulnerabilities of a (possibly huge) report file
+def parse_large_xml(xml_file_path: str) -> Iterator[Dict]:
+    """
+    Streams the given XML report and yields one vulnerability record per
+    <report>/<results>/<result> element. Elements are cleared as soon as they
+    have been processed, so memory use does not grow with the report size.
+    """
+    context = etree.iterparse(xml_file_path, events=("end",), huge_tree=True)
+    for _, elem in context:
+        parent = elem.getparent()
+        if parent is None:
+            continue
+        if elem.tag == "result":
+            # Results nested in e.g. <detection> are handled with their outer result
+            grandparent = parent.getparent()
+            if parent.tag != "results" or grandparent is None or grandparent.tag != "report":
+                continue
+            yield extract_vulnerability(elem)
+        elif parent.tag != "report":
+            continue
+        # Free the finished element and the siblings processed before it
+        elem.clear(keep_tail=False)
+        while elem.getprevious() is not None:
+            del parent[0]
+    del context
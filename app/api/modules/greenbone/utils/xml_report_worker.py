@@ -28,21 +28,21 @@ SLEEP_INTERVAL = 60  # seconds
 def process_files():
     """
     Process each XML report file in REPORTS_DIR.
-    Uses parse_large_xml() to extract data according to our detailed parsing strategy,
+    Uses parse_large_xml() to stream one vulnerability record per result,
     ingests the data into Elasticsearch, and then moves the processed file to the archive.
     """
     for file_name in os.listdir(REPORTS_DIR):
         if file_name.endswith(".xml"):
             file_path = os.path.join(REPORTS_DIR, file_name)
             try:
-                for report_json in parse_large_xml(file_path):
-                    report_id = report_json.get("report_id", "unknown")
-                    vulnerability_count = len(report_json.get("results", []))
-                    logging.info(f"Extracted report {report_id} with {vulnerability_count} vulnerabilities")
-                    
-                    # Ingest the parsed report into Elasticsearch
-                    #ingest_report(report_json)
-                
+                vulnerability_count = 0
+                for vulnerability in parse_large_xml(file_path):
+                    vulnerability_count += 1
+
+                    # Ingest the parsed record into Elasticsearch
+                    #ingest_report(vulnerability)
+                logging.info(f"Extracted {vulnerability_count} vulnerabilities from {file_name}")
+
                 # Use shutil.move to handle cross-device moves
                 shutil.move(file_path, os.path.join(ARCHIVE_DIR, file_name))
                 logging.info(f"Processed and archived file: {file_name}")
@@ -50,6 +50,8 @@ def process_files():
                 logging.error(f"Error processing file {file_name}: {e}")
 
 def main():
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(name)s: %(message)s")
+
     # Ensure the archive directory exists
     if not os.path.exists(ARCHIVE_DIR):
         os.makedirs(ARCHIVE_DIR)
@@ -0,0 +1,27 @@
+# app/api/routers/metrics_router.py
+
+##################################################################
+# Importing packages                                             #
+##################################################################
+
+from fastapi import APIRouter, HTTPException, Response
+
+from app.api.modules.greenbone.utils.metrics import render_metrics
+
+##################################################################
+# Defining our routers                                           #
+##################################################################
+
+router = APIRouter()
+
+# Prometheus scrape endpoint
+@router.get("/metrics")
+async def get_metrics():
+    """
+    Exposes GMP command, fetch, parse, ingest and scheduler metrics in the Prometheus text format.
+    """
+    try:
+        body, content_type = render_metrics()
+        return Response(content=body, media_type=content_type)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
@@ -4,13 +4,22 @@
 # Importing packages                                             #
 ##################################################################
 
-from fastapi import APIRouter, HTTPException
+from typing import Optional
+from fastapi import APIRouter, HTTPException, Header, Query, Response
+from fastapi.responses import JSONResponse, StreamingResponse
 
-from app.api.modules.greenbone.services import scan_service
-from app.api.modules.greenbone.utils.gvm_parser import (
-    parse_all_reports, 
-    parse_report_summary
+from app.api.core.config import REPORT_LIST_MAX_LIMIT
+from app.api.modules.greenbone.services.report_inventory import inventory
+from app.api.modules.greenbone.services.gmp_pool import GmpCommandError
+from app.api.modules.greenbone.services.report_listing import UUID_PATTERN, listing_filter, listing_page, query_report_summaries
+from app.api.modules.greenbone.services.report_streaming import (
+    NDJSON_MEDIA_TYPE,
+    ndjson_chunks,
+    json_array_chunks,
+    open_listing_stream,
+    open_vulnerability_stream
 )
+from app.api.modules.greenbone.utils.gvm_parser import parse_report_summary
 
 ##################################################################
 # Defining our routers                                           #
@@ -19,16 +28,84 @@ from app.api.modules.greenbone.utils.gvm_parser import (
 router = APIRouter()
 
 @router.get("/reports/summaries")
-async def get_report_summaries():
+async def get_report_summaries(
+    offset: Optional[int] = Query(None, ge=0),
+    limit: Optional[int] = Query(None, ge=1, le=REPORT_LIST_MAX_LIMIT),
+    sort: Optional[str] = Query(None, description="date, modified, severity, task or hosts"),
+    order: Optional[str] = Query(None, description="asc or desc (default)"),
+    since: Optional[str] = Query(None, description="Reports created after this ISO 8601 date or time"),
+    until: Optional[str] = Query(None, description="Reports created before this ISO 8601 date or time"),
+    task_id: Optional[str] = None,
+    min_severity: Optional[float] = Query(None, ge=0, le=10),
+    output_format: str = Query("json", alias="format", pattern="^(json|ndjson)$"),
+    if_none_match: Optional[str] = Header(None),
+    if_modified_since: Optional[str] = Header(None)
+):
     """
     Retrieves all available reports, parses them, and returns a summary.
+    Without parameters the summaries come from the report inventory cache;
+    clients sending If-None-Match or If-Modified-Since get an empty 304 while
+    the listing is unchanged. With paging, sort or filter parameters gvmd
+    returns just the requested page, together with the total number of matches.
+    format=ndjson streams one summary per line instead.
     """
     try:
-        # Call the service function to retrieve all reports
-        reports_response = scan_service.get_all_reports()
-        # Use our parser function to extract a summary for each report
-        summaries = parse_all_reports(reports_response)
-        return {"reports": summaries}
+        report_filter = listing_filter(offset, limit, sort, order, since, until, task_id, min_severity)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    try:
+        if output_format == "ndjson":
+            records = await open_listing_stream(report_filter)
+            return StreamingResponse(ndjson_chunks(map(parse_report_summary, records)), media_type=NDJSON_MEDIA_TYPE)
+        if report_filter is not None:
+            page = await query_report_summaries(report_filter)
+            return listing_page(page, offset, limit, report_filter)
+        # The summaries come from the shared report inventory snapshot
+        snapshot = await inventory.get_async()
+        headers = {
+            "ETag": snapshot.etag,
+            "Last-Modified": snapshot.last_modified_http,
+            # Clients may keep the body but have to revalidate it on every use
+            "Cache-Control": "no-cache"
+        }
+        if snapshot.not_modified(if_none_match, if_modified_since):
+            inventory.record_not_modified()
+            return Response(status_code=304, headers=headers)
+        return JSONResponse({"reports": snapshot.summaries}, headers=headers)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+# Hit/miss counters and staleness of the report inventory cache
+@router.get("/reports/summaries/stats")
+async def get_report_summaries_stats():
+    try:
+        return inventory.stats()
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+# Vulnerabilities of one report, streamed while the XML is parsed
+@router.get("/reports/{report_id}/vulnerabilities")
+async def get_report_vulnerabilities(
+    report_id: str,
+    output_format: str = Query("ndjson", alias="format", pattern="^(json|ndjson)$")
+):
+    """
+    Streams the vulnerability records of a report, as NDJSON (default) or as a
+    {"report_id": ..., "vulnerabilities": [...]} document sent in chunks.
+    Records are produced by the streaming parser from the XML the pipeline
+    keeps, or from a fresh fetch, so the first ones arrive right away and
+    memory use does not depend on the report size.
+    """
+    if not UUID_PATTERN.match(report_id):
+        raise HTTPException(status_code=400, detail="report_id must be a UUID")
+    try:
+        records, source = await open_vulnerability_stream(report_id)
+    except GmpCommandError as e:
+        raise HTTPException(status_code=404 if e.status == "404" else 502, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    headers = {"X-Report-Source": source}
+    if output_format == "json":
+        chunks = json_array_chunks(records, "vulnerabilities", {"report_id": report_id})
+        return StreamingResponse(chunks, media_type="application/json", headers=headers)
+    return StreamingResponse(ndjson_chunks(records), media_type=NDJSON_MEDIA_TYPE, headers=headers)
@@ -4,11 +4,24 @@
 # Importing packages                                             #
 ##################################################################
 
-from fastapi import APIRouter, HTTPException
-from pydantic import BaseModel
-
-from app.api.modules.greenbone.services import scan_service
+from typing import List, Optional
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, Field
 
+from app.api.core.config import (
+    REPORT_LIST_MAX_LIMIT,
+    SCAN_BATCH_MAX_ITEMS,
+    SCAN_BATCH_CONCURRENCY,
+    SCAN_BATCH_STAGGER_SECONDS
+)
+from app.api.modules.greenbone.services import async_gmp
+from app.api.modules.greenbone.services.gmp_pool import GmpCommandError
+from app.api.modules.greenbone.services.report_inventory import inventory
+from app.api.modules.greenbone.services.report_listing import UUID_PATTERN, listing_filter, listing_page, query_reports
+from app.api.modules.greenbone.services.report_streaming import NDJSON_MEDIA_TYPE, ndjson_chunks, open_listing_stream
+from app.api.modules.greenbone.services.scan_batch import submit_scan_batch, get_scan_batch
+from app.api.modules.greenbone.services.resource_resolver import resolver, prepare_scan_task
 
 ##################################################################
 # Defining our routers                                           #
@@ -19,28 +32,59 @@ router = APIRouter()
 class ScanRequest(BaseModel):
     target_name: str
     hosts: str
-    scan_config_id: str
+    # Scan config by ID, or by name in scan_config; DEFAULT_SCAN_CONFIG_ID if neither is given
+    scan_config_id: Optional[str] = None
+    scan_config: Optional[str] = None
+    # Port list of the target by ID or name; DEFAULT_PORT_LIST_ID if not given
+    port_list: Optional[str] = None
+
+class BatchScanRequest(BaseModel):
+    scans: List[ScanRequest] = Field(..., min_length=1, max_length=SCAN_BATCH_MAX_ITEMS)
+    # Start the tasks once created; False only creates targets and tasks
+    start: bool = True
+    # Seconds between two scan starts, so gvmd and the scanner are not flooded
+    stagger_seconds: float = Field(SCAN_BATCH_STAGGER_SECONDS, ge=0)
+    # Scans created at once
+    concurrency: int = Field(SCAN_BATCH_CONCURRENCY, ge=1)
 
 # Getting version infor from the GVM-Socket
 @router.get("/version")
 async def get_version():
     try:
-        version_info = scan_service.get_version()
+        version_info = await async_gmp.get_version()
         return version_info
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 # Display overview of all available reports
 @router.get("/reports")
-async def fetch_all_reports():
+async def fetch_all_reports(
+    offset: Optional[int] = Query(None, ge=0),
+    limit: Optional[int] = Query(None, ge=1, le=REPORT_LIST_MAX_LIMIT),
+    sort: Optional[str] = Query(None, description="date, modified, severity, task or hosts"),
+    order: Optional[str] = Query(None, description="asc or desc (default)"),
+    since: Optional[str] = Query(None, description="Reports created after this ISO 8601 date or time"),
+    until: Optional[str] = Query(None, description="Reports created before this ISO 8601 date or time"),
+    task_id: Optional[str] = None,
+    min_severity: Optional[float] = Query(None, ge=0, le=10),
+    output_format: str = Query("json", alias="format", pattern="^(json|ndjson)$")
+):
+    try:
+        report_filter = listing_filter(offset, limit, sort, order, since, until, task_id, min_severity)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     try:
-        reports = scan_service.get_all_reports()
-        # Process the XML response to extract a list of report IDs, e.g.:
-        report_list = reports.get("get_reports_response", {}).get("report", [])
-        # Ensure report_list is always a list
-        if not isinstance(report_list, list):
-            report_list = [report_list]
-        return {"reports": report_list}
+        # NDJSON sends one report per line as it is read instead of one large document
+        if output_format == "ndjson":
+            records = await open_listing_stream(report_filter)
+            return StreamingResponse(ndjson_chunks(records), media_type=NDJSON_MEDIA_TYPE)
+        # Paging, sorting and filtering are pushed down to gvmd
+        if report_filter is not None:
+            page = await query_reports(report_filter)
+            return listing_page(page, offset, limit, report_filter)
+        # Served from the shared metadata-only report listing
+        snapshot = await inventory.get_async()
+        return {"reports": snapshot.reports}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -48,12 +92,94 @@ async def fetch_all_reports():
 @router.post("/scan")
 async def trigger_scan(request: ScanRequest):
     try:
-        target_id = scan_service.create_target(request.target_name, request.hosts)
-        task_id = scan_service.create_task(f"{request.target_name} Scan", target_id, request.scan_config_id)
-        scan_service.start_task(task_id)
-        return {"message": "Scan started", "task_id": task_id}
+        # An existing target with the same hosts and port list is reused
+        scan = await prepare_scan_task(
+            request.target_name,
+            request.hosts,
+            request.scan_config_id or request.scan_config,
+            request.port_list
+        )
+        report_id = await async_gmp.start_task(scan["task_id"])
+        return {"message": "Scan started", **scan, "report_id": report_id}
+    except LookupError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+# Start many Vulnerability Scans at once
+@router.post("/scans/batch")
+async def trigger_scan_batch(request: BatchScanRequest):
+    """
+    Creates a target and a task for every entry and starts them, several
+    entries at a time over the pooled GMP sessions. Returns one result per
+    entry; a failing entry does not stop the others. With stagger_seconds the
+    starts are spread out in the background and the results say when each
+    one is due; GET /scans/batch/{batch_id} shows how they went.
+    """
+    try:
+        batch = await submit_scan_batch(
+            [scan.model_dump() for scan in request.scans],
+            start=request.start,
+            stagger=request.stagger_seconds,
+            concurrency=request.concurrency
+        )
+        return batch.as_dict()
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+# Outcome of a batch submitted earlier
+@router.get("/scans/batch/{batch_id}")
+async def get_scan_batch_status(batch_id: str):
+    batch = get_scan_batch(batch_id)
+    if batch is None:
+        raise HTTPException(status_code=404, detail=f"Unknown scan batch {batch_id}")
+    return batch.as_dict()
+
+# Scan configs known to gvmd, by name and ID
+@router.get("/scan-configs")
+async def list_scan_configs():
+    try:
+        return {"configs": await resolver.entries("config")}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+# Port lists known to gvmd, by name and ID
+@router.get("/port-lists")
+async def list_port_lists():
+    try:
+        return {"port_lists": await resolver.entries("port_list")}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+# Targets known to gvmd; "reusable" ones are picked up by scans with the same hosts and port list
+@router.get("/targets")
+async def list_targets():
+    try:
+        return {"targets": await resolver.entries("target")}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+# Delete a target that no task uses anymore
+@router.delete("/targets/{target_id}")
+async def delete_target(target_id: str):
+    if not UUID_PATTERN.match(target_id):
+        raise HTTPException(status_code=400, detail="target_id must be a UUID")
+    try:
+        await resolver.delete_target(target_id)
+        return {"message": "Target deleted", "target_id": target_id}
+    except GmpCommandError as e:
+        # gvmd answers 400 for targets still in use and 404 for unknown ones
+        raise HTTPException(status_code=int(e.status) if e.status in ("400", "404") else 502, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
 
+# Cache statistics of the target, port list and scan config lookups
+@router.get("/resources/stats")
+async def resource_stats():
+    return resolver.stats()
 
+# Reload the cached listings, e.g. after changing targets in the Greenbone web UI
+@router.post("/resources/refresh")
+async def refresh_resources():
+    resolver.invalidate()
+    return resolver.stats()
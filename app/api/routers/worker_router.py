@@ -0,0 +1,27 @@
+# app/api/routers/worker_router.py
+
+##################################################################
+# Importing packages                                             #
+##################################################################
+
+from fastapi import APIRouter, HTTPException
+
+from app.api.modules.greenbone.utils.report_worker import worker_status
+
+##################################################################
+# Defining our routers                                           #
+##################################################################
+
+router = APIRouter()
+
+# Report worker jobs, pipeline queues and fetch progress
+@router.get("/worker/status")
+async def get_worker_status():
+    """
+    Returns each scheduled job's interval, last duration, next run and backlog,
+    the depth of the pipeline queues and the progress of the fetch stage.
+    """
+    try:
+        return worker_status()
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
@@ -4,11 +4,15 @@
 # Importing packages                                             #
 ##################################################################
 
+import asyncio
 import logging
 from fastapi import FastAPI
 
-from app.api.modules.greenbone.utils.report_worker import run_report_worker
-from app.api.routers import scan_router, report_router
+from app.api.modules.greenbone.utils.report_worker import run_report_worker, stop_report_worker
+from app.api.modules.greenbone.services.gmp_pool import close_pool
+from app.api.modules.greenbone.services.async_gmp import close_async_pool
+from app.api.modules.greenbone.utils.es_client import bootstrap_index, close_es_client
+from app.api.routers import scan_router, report_router, worker_router, metrics_router
 
 ##################################################################
 # Defining our logger                                            #
@@ -35,6 +39,8 @@ async def read_root():
 
 app.include_router(scan_router.router, prefix="/api/greenbone")   # Starting a Scan 
 app.include_router(report_router.router, prefix="/api/greenbone") # Displaying Reports 
+app.include_router(worker_router.router, prefix="/api/greenbone") # Report worker status
+app.include_router(metrics_router.router)                          # Prometheus metrics
 
 ##################################################################
 # Startup Event: Launch Workers                                  #
@@ -42,8 +48,22 @@ app.include_router(report_router.router, prefix="/api/greenbone") # Displaying R
 
 @app.on_event("startup")
 async def startup_event():
-    # Start the report worker; you can add more workers as needed.
-    run_report_worker() 
+    # Bootstrap the Elasticsearch index template and alias once.
+    # If Elasticsearch is not reachable yet, the first ingest run does it.
+    try:
+        await asyncio.to_thread(bootstrap_index)
+    except Exception as e:
+        logging.getLogger(__name__).warning(f"Elasticsearch index bootstrap failed: {e}")
 
+    # Start the report worker; you can add more workers as needed.
+    run_report_worker()
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    # Stop the pipeline; queued work stays in the state store for the next start
+    stop_report_worker()
 
+    # Close the pooled GMP sessions
+    close_pool()
+    await close_async_pool()
+    close_es_client()
@@ -0,0 +1,139 @@
+# benchmarks/es_standin.py
+
+##################################################################
+# Importing packages                                             #
+##################################################################
+
+import json
+import time
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+##################################################################
+# Local Elasticsearch stand-in                                   #
+##################################################################
+
+# Answers just enough of the Elasticsearch API for bootstrap_index() and the
+# bulk helpers: index templates, aliases, index creation and _bulk with
+# index/create/update/delete. Documents are not stored, only their ids, so
+# the stand-in stays small and cheap next to the code being measured.
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def _send(self, status: int, body: dict = None) -> None:
+        data = json.dumps(body).encode("utf-8") if body is not None else b""
+        self.send_response(status)
+        # The client refuses servers that do not identify as Elasticsearch
+        self.send_header("X-Elastic-Product", "Elasticsearch")
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _body(self) -> bytes:
+        return self.rfile.read(int(self.headers.get("Content-Length", 0)))
+
+    def do_HEAD(self):
+        # No alias or index exists before bootstrap_index() creates it
+        self._send(200 if self.server.standin.known_path(self.path) else 404)
+
+    def do_GET(self):
+        self._send(200, {"version": {"number": "8.17.1"}, "tagline": "You Know, for Search"})
+
+    def do_PUT(self):
+        if "/_bulk" in self.path:
+            return self.do_POST()
+        body = json.loads(self._body() or b"{}")
+        name = self.path.split("?")[0].strip("/")
+        # Index creation may come with aliases, which HEAD /_alias/<name> has to find
+        self.server.standin.created.update([name] + list(body.get("aliases", {})))
+        self._send(200, {"acknowledged": True, "index": name})
+
+    def do_POST(self):
+        body = self._body()
+        if "/_bulk" not in self.path:
+            return self._send(200, {"acknowledged": True})
+        started = time.perf_counter()
+        items = self.server.standin.bulk(body)
+        self._send(200, {
+            "took": int((time.perf_counter() - started) * 1000),
+            "errors": any(next(iter(item.values()))["status"] >= 300 for item in items),
+            "items": items
+        })
+
+class EsStandIn:
+    """
+    Threaded HTTP server on 127.0.0.1 that stands in for Elasticsearch.
+    `latency` seconds are added to every bulk request to mimic a remote
+    cluster. Counters of requests and documents are kept for the report.
+    """
+    def __init__(self, latency: float = 0.0, port: int = 0):
+        self.latency = latency
+        self.created = set()
+        self._ids = set()
+        self._lock = threading.Lock()
+        self.bulk_requests = 0
+        self.documents = 0
+        self.bulk_bytes = 0
+        self._server = ThreadingHTTPServer(("127.0.0.1", port), _Handler)
+        self._server.daemon_threads = True
+        self._server.standin = self
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self._server.server_address[1]}"
+
+    def known_path(self, path: str) -> bool:
+        # HEAD /<index> and HEAD /_alias/<alias>
+        return path.split("?")[0].strip("/").split("/")[-1] in self.created
+
+    def bulk(self, body: bytes) -> list:
+        """
+        Applies an NDJSON bulk body and returns the per-item results.
+        """
+        if self.latency:
+            time.sleep(self.latency)
+        lines = [line for line in body.split(b"\n") if line.strip()]
+        items = []
+        index = 0
+        with self._lock:
+            self.bulk_requests += 1
+            self.bulk_bytes += len(body)
+            while index < len(lines):
+                action = json.loads(lines[index])
+                operation, meta = next(iter(action.items()))
+                index += 1 if operation == "delete" else 2
+                doc_id = meta.get("_id")
+                if operation == "update" and doc_id not in self._ids:
+                    items.append({operation: {"_id": doc_id, "status": 404, "error": {"type": "document_missing_exception"}}})
+                    continue
+                if operation == "delete":
+                    self._ids.discard(doc_id)
+                else:
+                    self._ids.add(doc_id)
+                self.documents += 1
+                items.append({operation: {"_id": doc_id, "status": 200 if operation == "update" else 201, "result": "ok"}})
+        return items
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "bulk_requests": self.bulk_requests,
+                "bulk_bytes": self.bulk_bytes,
+                "documents": self.documents,
+                "stored_ids": len(self._ids)
+            }
+
+    def start(self) -> "EsStandIn":
+        self._thread = threading.Thread(target=self._server.serve_forever, name="es-standin", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
@@ -0,0 +1,264 @@
+# benchmarks/gmp_load.py
+
+"""
+Load-tests the GMP layer against the local gvmd simulator.
+
+    python -m benchmarks.gmp_load --pool-sizes 1,4,8 --concurrency 1,8,32
+    python -m benchmarks.gmp_load --hosts 100 --results-per-host 200 --page-sizes 500,2000 --page-concurrency 1,4
+
+Scenarios:
+  commands  report listings sent from `concurrency` threads through a
+            GmpConnectionPool of each size: commands per second, p50/p95
+            latency. "fresh" opens and authenticates a session per command,
+            "cli" spawns gvm-cli per command (skipped where it cannot run).
+  fetch     fetch_report_paginated() of one report for each page size and
+            page concurrency: seconds and MB/s.
+
+The simulator is started as a subprocess on a temporary socket. Results are
+written to benchmarks/results/gmp-<label>.json.
+"""
+
+##################################################################
+# Importing packages                                             #
+##################################################################
+
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import tempfile
+import datetime
+import platform
+import subprocess
+import statistics
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.report_generator import SyntheticReport
+from benchmarks.run_benchmarks import RESULTS_DIR, _default_label
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+USERNAME = "benchmark"
+PASSWORD = "benchmark"
+
+##################################################################
+# Simulator process                                              #
+##################################################################
+
+# Starts the simulator and waits until its socket accepts connections
+def start_simulator(socket_path: str, args) -> subprocess.Popen:
+    command = [
+        sys.executable, "-m", "benchmarks.gvmd_simulator",
+        "--socket", socket_path,
+        "--username", USERNAME,
+        "--password", PASSWORD,
+        "--reports", str(args.reports),
+        "--hosts", str(args.hosts),
+        "--results-per-host", str(args.results_per_host),
+        "--seed", str(args.seed),
+        "--latency", str(args.latency),
+        "--latency-per-result", str(args.latency_per_result),
+        "--log-level", "WARNING"
+    ]
+    process = subprocess.Popen(command, cwd=ROOT_DIR)
+    deadline = time.monotonic() + 30
+    while not os.path.exists(socket_path):
+        if process.poll() is not None or time.monotonic() > deadline:
+            process.kill()
+            raise RuntimeError("The gvmd simulator did not start")
+        time.sleep(0.05)
+    return process
+
+##################################################################
+# Scenarios                                                      #
+##################################################################
+
+# Latency percentile (p in 0..100) of a sorted list
+def _percentile(values: list, p: float) -> float:
+    return values[min(len(values) - 1, int(len(values) * p / 100))]
+
+# Sends `commands` copies of xml_command from `concurrency` threads through send()
+def load_commands(send, xml_command: str, commands: int, concurrency: int) -> dict:
+    latencies = []
+    errors = []
+    def one(_) -> None:
+        started = time.perf_counter()
+        try:
+            send(xml_command)
+        except Exception as e:
+            errors.append(e)
+            return
+        latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        list(executor.map(one, range(commands)))
+    seconds = time.perf_counter() - started
+    latencies.sort()
+    return {
+        "commands": commands,
+        "errors": len(errors),
+        "seconds": round(seconds, 3),
+        "commands_per_second": round(len(latencies) / seconds, 1),
+        "p50_ms": round(_percentile(latencies, 50) * 1000, 2) if latencies else None,
+        "p95_ms": round(_percentile(latencies, 95) * 1000, 2) if latencies else None,
+        "mean_ms": round(statistics.fmean(latencies) * 1000, 2) if latencies else None
+    }
+
+def scenario_commands(args, socket_path: str) -> dict:
+    from app.api.modules.greenbone.services.gmp_pool import GmpConnectionPool, GmpSession
+    from app.api.modules.greenbone.services.report_inventory import INVENTORY_COMMAND
+    from app.api.modules.greenbone.services.scan_service import run_gvm_command_raw
+
+    results = {}
+    for concurrency in args.concurrency:
+        for size in args.pool_sizes:
+            pool = GmpConnectionPool(socket_path=socket_path, username=USERNAME, password=PASSWORD, size=size)
+            try:
+                result = load_commands(pool.run_command, INVENTORY_COMMAND, args.commands, concurrency)
+            finally:
+                pool.close()
+            results[f"pool{size}_c{concurrency}"] = dict(result, backend="socket", pool_size=size, concurrency=concurrency)
+
+        # Baseline: what every command cost before sessions were pooled
+        def fresh(xml_command: str) -> bytes:
+            session = GmpSession(socket_path, USERNAME, PASSWORD, 60)
+            try:
+                session.open()
+                return session.send_command(xml_command)
+            finally:
+                session.close()
+        result = load_commands(fresh, INVENTORY_COMMAND, args.commands, concurrency)
+        results[f"fresh_c{concurrency}"] = dict(result, backend="fresh", concurrency=concurrency)
+
+        if shutil.which("gvm-cli"):
+            cli = lambda xml_command: run_gvm_command_raw(xml_command, backend="cli")
+            result = load_commands(cli, INVENTORY_COMMAND, min(args.commands, 50), concurrency)
+            if result["errors"] == result["commands"]:
+                print("Skipping the cli backend: gvm-cli fails here (it refuses to run as root)", file=sys.stderr)
+            else:
+                results[f"cli_c{concurrency}"] = dict(result, backend="cli", concurrency=concurrency)
+    for name, result in results.items():
+        print(f"{name:<16} {result['commands_per_second']:>9.1f} cmd/s  p50 {result['p50_ms']} ms  "
+              f"p95 {result['p95_ms']} ms  errors {result['errors']}", file=sys.stderr)
+    return results
+
+def scenario_fetch(args, socket_path: str, workspace: str) -> dict:
+    from app.api.modules.greenbone.services import gmp_pool
+    from app.api.modules.greenbone.services.report_pages import fetch_report_paginated
+
+    # The simulator seeds its reports from --seed upwards, so the first report is known in advance
+    report_id = SyntheticReport(seed=args.seed + 1, hosts=1, results_per_host=1, nvt_count=1).report_id
+    results = {}
+    for concurrency in args.page_concurrency:
+        # Every page request needs its own session
+        gmp_pool._pool = gmp_pool.GmpConnectionPool(
+            socket_path=socket_path, username=USERNAME, password=PASSWORD, size=concurrency
+        )
+        for page_size in args.page_sizes:
+            path = os.path.join(workspace, f"report_{page_size}_{concurrency}.xml")
+            started = time.perf_counter()
+            files = fetch_report_paginated(report_id, path, page_size=page_size, concurrency=concurrency)
+            seconds = time.perf_counter() - started
+            size = sum(os.path.getsize(file) for file in files)
+            for file in files:
+                os.remove(file)
+            name = f"page{page_size}_c{concurrency}"
+            results[name] = {
+                "page_size": page_size,
+                "concurrency": concurrency,
+                "pages": -(-args.hosts * args.results_per_host // page_size),
+                "bytes": size,
+                "seconds": round(seconds, 3),
+                "mb_per_second": round(size / 1024 / 1024 / seconds, 2)
+            }
+            print(f"{name:<16} {seconds:>9.3f}s  {results[name]['mb_per_second']:>8.2f} MB/s", file=sys.stderr)
+        gmp_pool.close_pool()
+    return results
+
+##################################################################
+# The load test run                                              #
+##################################################################
+
+def run(args) -> dict:
+    workspace = tempfile.mkdtemp(prefix="goldoak-gmp-load-", dir=args.workdir)
+    socket_path = os.path.join(workspace, "gvmd.sock")
+    # The service reads its configuration on import, so it is set before the first app import
+    os.environ.update({
+        "GVM_SOCKET_PATH": socket_path,
+        "USER": USERNAME,
+        "PASSWORD": PASSWORD,
+        "GMP_FETCH_RATE": "0",
+        "ES_HOST": os.environ.get("ES_HOST", "http://127.0.0.1:9200"),
+        "ES_USERNAME": os.environ.get("ES_USERNAME", "benchmark"),
+        "ES_PASSWORD": os.environ.get("ES_PASSWORD", "benchmark")
+    })
+    simulator = start_simulator(socket_path, args)
+    try:
+        scenarios = {}
+        if "commands" in args.scenarios:
+            scenarios["commands"] = scenario_commands(args, socket_path)
+        if "fetch" in args.scenarios:
+            scenarios["fetch"] = scenario_fetch(args, socket_path, workspace)
+        return {
+            "label": f"gmp-{args.label or _default_label()}",
+            "created": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "parameters": {
+                "reports": args.reports,
+                "hosts": args.hosts,
+                "results_per_host": args.results_per_host,
+                "seed": args.seed,
+                "latency": args.latency,
+                "latency_per_result": args.latency_per_result,
+                "commands": args.commands
+            },
+            "scenarios": scenarios
+        }
+    finally:
+        simulator.terminate()
+        simulator.wait(timeout=10)
+        shutil.rmtree(workspace, ignore_errors=True)
+
+##################################################################
+# Command line                                                   #
+##################################################################
+
+# "1,4,8" -> [1, 4, 8]
+def _int_list(text: str) -> list:
+    return [int(value) for value in text.split(",") if value.strip()]
+
+def main(argv: list = None) -> int:
+    parser = argparse.ArgumentParser(description="Load-tests the GMP layer against the local gvmd simulator.")
+    parser.add_argument("--scenarios", default="commands,fetch")
+    parser.add_argument("--reports", type=int, default=20, help="Reports in the simulated listing")
+    parser.add_argument("--hosts", type=int, default=20)
+    parser.add_argument("--results-per-host", type=int, default=100)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--latency", type=float, default=0.0, help="Simulated gvmd seconds per command")
+    parser.add_argument("--latency-per-result", type=float, default=0.0, help="Simulated gvmd seconds per report result")
+    parser.add_argument("--commands", type=int, default=500, help="Commands per load run")
+    parser.add_argument("--pool-sizes", type=_int_list, default=[1, 4, 8])
+    parser.add_argument("--concurrency", type=_int_list, default=[1, 8, 32])
+    parser.add_argument("--page-sizes", type=_int_list, default=[250, 1000, 4000])
+    parser.add_argument("--page-concurrency", type=_int_list, default=[1, 2, 4])
+    parser.add_argument("--label", help="Name of the results file (default: git revision and time)")
+    parser.add_argument("--output-dir", default=RESULTS_DIR)
+    parser.add_argument("--workdir", help="Directory for the temporary workspace")
+    args = parser.parse_args(argv)
+    args.scenarios = args.scenarios.split(",")
+
+    results = run(args)
+    os.makedirs(args.output_dir, exist_ok=True)
+    output = os.path.join(args.output_dir, f"{results['label']}.json")
+    with open(output, "w") as f:
+        json.dump(results, f, indent=2)
+    print(f"Results written to {output}", file=sys.stderr)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,543 @@
+# benchmarks/gvmd_simulator.py
+
+"""
+A local stand-in for gvmd that listens on a Unix socket and speaks enough GMP
+to load-test the service without a Greenbone installation:
+
+  authenticate, get_version, get_reports (listing and detailed, with the
+  filter keywords first, rows, sort, sort-reverse, task_id= and
+  created, modified, severity or hosts with > and <),
+  get_tasks, get_targets, get_port_lists, get_configs, create_target,
+  delete_target, create_task and start_task
+
+Reports are SyntheticReport instances, generated while they are streamed, so
+report size is only limited by the time you are willing to wait. Latency can
+be added per command and per streamed result.
+
+    python -m benchmarks.gvmd_simulator --socket /tmp/gvmd-sim.sock --reports 20 --hosts 20 --results-per-host 100
+    GVM_SOCKET_PATH=/tmp/gvmd-sim.sock USER=admin PASSWORD=admin uvicorn app.main:app
+
+Like gvmd, every connection gets its own worker (a thread here). Commands are
+answered one at a time per connection, as GMP clients send them.
+"""
+
+##################################################################
+# Importing packages                                             #
+##################################################################
+
+import os
+import re
+import time
+import uuid
+import random
+import signal
+import logging
+import argparse
+import datetime
+import threading
+import socketserver
+from xml.sax.saxutils import escape, quoteattr
+
+from lxml import etree
+
+from benchmarks.report_generator import SyntheticReport, DEFAULT_TAG_LENGTH, DEFAULT_DESCRIPTION_LENGTH
+
+logger = logging.getLogger("gvmd_simulator")
+
+# Bytes read from a client at once
+READ_SIZE = 64 * 1024
+
+# Bytes buffered before a response chunk is sent
+WRITE_BUFFER = 256 * 1024
+
+DEFAULT_CONFIG_ID = "daba56c8-73ec-11df-a475-002264764cea"
+DEFAULT_PORT_LIST_ID = "33d0cd82-57c6-11e1-8ed1-406186ea4fc5"
+
+# Predefined port lists and scan configs of a stock gvmd
+PORT_LISTS = {
+    "33d0cd82-57c6-11e1-8ed1-406186ea4fc5": "All IANA assigned TCP",
+    "4a4717fe-57d2-11e1-9a26-406186ea4fc5": "All IANA assigned TCP and UDP",
+    "730ef368-57e2-11e1-a90f-406186ea4fc5": "All TCP and Nmap top 100 UDP"
+}
+SCAN_CONFIGS = {
+    "daba56c8-73ec-11df-a475-002264764cea": "Full and fast",
+    "d21f6c81-2b88-4ac1-b7b4-a2a9f2ad4663": "Base",
+    "8715c877-47a0-438d-98a3-27c7a6ab2196": "Discovery",
+    "2d3f051c-55ba-11e3-bf43-406186ea4fc5": "Host Discovery"
+}
+
+##################################################################
+# Simulated state                                                #
+##################################################################
+
+# Current UTC time as gvmd formats it
+def _now() -> str:
+    return datetime.datetime.now(datetime.timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+# Timestamp `seconds` from now, gvmd format
+def _at(seconds: float) -> str:
+    moment = datetime.datetime.now(datetime.timezone.utc) + datetime.timedelta(seconds=seconds)
+    return moment.strftime("%Y-%m-%dT%H:%M:%SZ")
+
+class SimulatedReport:
+    def __init__(self, report: SyntheticReport, created: str, modified: str, visible_at: float = 0.0):
+        self.report = report
+        self.created = created
+        self.modified = modified
+        # Reports of started tasks only show up once their simulated scan is done
+        self.visible_at = visible_at
+
+    @property
+    def report_id(self) -> str:
+        return self.report.report_id
+
+    @property
+    def task_id(self) -> str:
+        return self.report.task_id
+
+class SimulatorState:
+    """
+    Targets, tasks and reports of the simulated gvmd, shared by all connections.
+    """
+    def __init__(self, args):
+        self._args = args
+        self._lock = threading.Lock()
+        self._seed = args.seed
+        self.targets = {}
+        self.tasks = {}
+        self.reports = {}
+        self.stats = {"connections": 0, "commands": {}, "bytes_sent": 0, "errors": 0}
+        for number in range(args.tasks):
+            task_id = str(uuid.UUID(int=random.Random(f"sim-task:{args.seed}:{number}").getrandbits(128)))
+            self.tasks[task_id] = {"name": f"Simulated task {number}", "target_id": None, "config_id": DEFAULT_CONFIG_ID}
+        task_ids = list(self.tasks)
+        for number in range(args.reports):
+            # Reports spread over the tasks and over the days before now
+            self.add_report(task_ids[number % len(task_ids)], age=(args.reports - number) * 3600)
+
+    def _next_seed(self) -> int:
+        self._seed += 1
+        return self._seed
+
+    def add_report(self, task_id: str, age: float = 0.0, delay: float = 0.0) -> SimulatedReport:
+        with self._lock:
+            seed = self._next_seed()
+        rng = random.Random(f"sim-size:{seed}")
+        hosts = self._args.hosts
+        if self._args.vary:
+            hosts = max(1, int(hosts * rng.uniform(0.5, 1.5)))
+        report = SyntheticReport(
+            task_id=task_id,
+            hosts=hosts,
+            results_per_host=self._args.results_per_host,
+            seed=seed,
+            tag_length=self._args.tag_length,
+            description_length=self._args.description_length
+        )
+        stamp = _at(delay - age)
+        simulated = SimulatedReport(report, stamp, stamp, time.time() + delay)
+        with self._lock:
+            self.reports[report.report_id] = simulated
+        return simulated
+
+    def visible_reports(self) -> list:
+        now = time.time()
+        with self._lock:
+            return [report for report in self.reports.values() if report.visible_at <= now]
+
+    def count(self, command: str, sent: int) -> None:
+        with self._lock:
+            self.stats["commands"][command] = self.stats["commands"].get(command, 0) + 1
+            self.stats["bytes_sent"] += sent
+
+##################################################################
+# Filters                                                        #
+##################################################################
+
+FILTER_TERM = re.compile(r"([\w-]+)(=|>|<|~)(\"[^\"]*\"|\S+)")
+
+# Splits a GMP filter string into (keyword, operator, value) terms
+def parse_filter(text: str) -> list:
+    return [(key, op, value.strip('"')) for key, op, value in FILTER_TERM.findall(text or "")]
+
+# Report attributes the filter keywords compare and sort by
+REPORT_FIELDS = {
+    "modified": lambda r: r.modified,
+    "modification_time": lambda r: r.modified,
+    "created": lambda r: r.created,
+    "date": lambda r: r.created,
+    "severity": lambda r: r.report.severity,
+    "hosts": lambda r: r.report.hosts,
+    "task": lambda r: r.task_id
+}
+
+# Numeric fields are compared as numbers, timestamps as (sortable) strings
+NUMERIC_FIELDS = ("severity", "hosts")
+
+# Applies the filter terms the service uses to the report listing
+def filter_reports(reports: list, terms: list) -> tuple:
+    """
+    Returns the reports on the requested page and the number of reports
+    matching the filter before paging.
+    """
+    first, rows = 1, 10
+    sort_key, reverse = "date", False
+    for key, op, value in terms:
+        if key == "task_id" and op == "=":
+            reports = [r for r in reports if r.task_id == value]
+        elif key == "first":
+            first = max(1, int(value))
+        elif key == "rows":
+            rows = int(value)
+        elif key in ("sort", "sort-reverse"):
+            sort_key, reverse = value, key == "sort-reverse"
+        elif op in (">", "<") and key in REPORT_FIELDS:
+            field = REPORT_FIELDS[key]
+            bound = float(value) if key in NUMERIC_FIELDS else value
+            reports = [r for r in reports if (field(r) > bound if op == ">" else field(r) < bound)]
+    reports = sorted(reports, key=REPORT_FIELDS.get(sort_key, REPORT_FIELDS["date"]), reverse=reverse)
+    matching = len(reports)
+    return (reports[first - 1:] if rows < 0 else reports[first - 1:first - 1 + rows]), matching
+
+# first/rows of a detailed report's results
+def result_page(terms: list) -> tuple:
+    first, rows = 1, 100
+    for key, _, value in terms:
+        if key == "first":
+            first = max(1, int(value))
+        elif key == "rows":
+            rows = int(value)
+    return first, rows
+
+##################################################################
+# Responses                                                      #
+##################################################################
+
+class Response:
+    """
+    Buffers a response and sends it in chunks, so large reports are
+    streamed instead of being built in memory.
+    """
+    def __init__(self, sock, latency_per_result: float):
+        self._sock = sock
+        self._buffer = bytearray()
+        self._latency_per_result = latency_per_result
+        self.sent = 0
+
+    def write(self, data) -> None:
+        if isinstance(data, str):
+            data = data.encode("utf-8")
+        self._buffer += data
+        if self._latency_per_result and data.startswith(b"<result "):
+            time.sleep(self._latency_per_result)
+        if len(self._buffer) >= WRITE_BUFFER:
+            self.flush()
+
+    def flush(self) -> None:
+        if self._buffer:
+            self._sock.sendall(self._buffer)
+            self.sent += len(self._buffer)
+            self._buffer.clear()
+
+# A response without content
+def status_response(command: str, status: str, text: str, extra: str = "") -> str:
+    attributes = f'status="{status}" status_text={quoteattr(text)}{extra}'
+    return f"<{command}_response {attributes}/>"
+
+##################################################################
+# GMP command handlers                                           #
+##################################################################
+
+class GmpHandler(socketserver.BaseRequestHandler):
+    """
+    One client connection. Reads commands, authenticates the session and
+    dispatches to the cmd_* methods.
+    """
+    def setup(self) -> None:
+        self.state = self.server.state
+        self.args = self.server.args
+        self.authenticated_at = None
+        with self.state._lock:
+            self.state.stats["connections"] += 1
+
+    def handle(self) -> None:
+        parser = etree.XMLPullParser(events=("start", "end"), huge_tree=True)
+        depth = 0
+        while True:
+            try:
+                data = self.request.recv(READ_SIZE)
+            except OSError:
+                return
+            if not data:
+                return
+            try:
+                parser.feed(data)
+                for event, _ in parser.read_events():
+                    depth += 1 if event == "start" else -1
+                    if depth == 0:
+                        self.dispatch(parser.close())
+                        parser = etree.XMLPullParser(events=("start", "end"), huge_tree=True)
+            except etree.XMLSyntaxError as e:
+                self.request.sendall(status_response("gmp", "400", f"Invalid XML: {e}").encode("utf-8"))
+                return
+            except OSError:
+                return
+
+    def dispatch(self, command) -> None:
+        name = command.tag
+        if self.args.latency:
+            time.sleep(self.args.latency * random.uniform(1 - self.args.jitter, 1 + self.args.jitter))
+        response = Response(self.request, self.args.latency_per_result)
+        handler = getattr(self, f"cmd_{name}", None)
+        if handler is None:
+            response.write(status_response(name, "400", "Bogus command name"))
+        elif name not in ("authenticate", "get_version") and not self._session_valid():
+            response.write(status_response(name, "401", "Authenticate first"))
+        else:
+            try:
+                handler(command, response)
+            except LookupError as e:
+                response.write(status_response(name, "404", str(e)))
+            except ValueError as e:
+                response.write(status_response(name, "400", str(e)))
+        response.flush()
+        self.state.count(name, response.sent)
+
+    def _session_valid(self) -> bool:
+        if self.authenticated_at is None:
+            return False
+        if self.args.session_timeout and time.monotonic() - self.authenticated_at > self.args.session_timeout:
+            self.authenticated_at = None
+            return False
+        return True
+
+    def cmd_authenticate(self, command, response: Response) -> None:
+        username = command.findtext("credentials/username")
+        password = command.findtext("credentials/password")
+        if username != self.args.username or password != self.args.password:
+            with self.state._lock:
+                self.state.stats["errors"] += 1
+            response.write(status_response("authenticate", "400", "Authentication failed"))
+            return
+        self.authenticated_at = time.monotonic()
+        response.write(
+            '<authenticate_response status="200" status_text="OK">'
+            "<role>Admin</role><timezone>UTC</timezone><severity>nist</severity>"
+            "</authenticate_response>"
+        )
+
+    def cmd_get_version(self, command, response: Response) -> None:
+        response.write('<get_version_response status="200" status_text="OK"><version>22.4</version></get_version_response>')
+
+    def cmd_get_reports(self, command, response: Response) -> None:
+        terms = parse_filter(command.get("filter", ""))
+        report_id = command.get("report_id")
+        if report_id:
+            simulated = self.state.reports.get(report_id)
+            if simulated is None or simulated.visible_at > time.time():
+                raise LookupError(f"Failed to find report '{report_id}'")
+            first, rows = result_page(terms)
+            simulated.report.write(response, first=first, rows=rows)
+            return
+        # ignore_pagination="1" lists every match, whatever first and rows say
+        if command.get("ignore_pagination") == "1":
+            terms += [("first", "=", "1"), ("rows", "=", "-1")]
+        reports, matching = filter_reports(self.state.visible_reports(), terms)
+        response.write('<get_reports_response status="200" status_text="OK">')
+        for simulated in reports:
+            response.write(self._report_listing(simulated))
+        first = ([int(value) for key, _, value in terms if key == "first"] or [1])[-1]
+        response.write(
+            f'<filters id=""><term>{escape(command.get("filter", ""))}</term></filters>'
+            f'<reports start="{first}" max="{len(reports)}"/>'
+            f"<report_count>{len(self.state.reports)}<filtered>{matching}</filtered><page>{len(reports)}</page></report_count>"
+            f"</get_reports_response>"
+        )
+
+    def _report_listing(self, simulated: SimulatedReport) -> str:
+        report = simulated.report
+        task = self.state.tasks.get(simulated.task_id, {})
+        task_name = escape(task.get("name", "Simulated task"))
+        return (
+            f'<report id="{report.report_id}" format_id="" extension="" content_type="">'
+            f"<owner><name>admin</name></owner><name>{simulated.created}</name><comment></comment>"
+            f"<creation_time>{simulated.created}</creation_time><modification_time>{simulated.modified}</modification_time>"
+            f"<writable>0</writable><in_use>0</in_use>"
+            f'<task id="{report.task_id}"><name>{task_name}</name></task>'
+            f'<report id="{report.report_id}">'
+            f"<scan_run_status>Done</scan_run_status>"
+            f"<hosts><count>{report.hosts}</count></hosts>"
+            f"<vulns><count>{report.total}</count></vulns>"
+            f'<task id="{report.task_id}"><name>{task_name}</name></task>'
+            f"<timestamp>{simulated.created}</timestamp>"
+            f"<scan_start>{simulated.created}</scan_start><scan_end>{simulated.modified}</scan_end>"
+            f"<result_count>{report.total}<full>{report.total}</full><filtered>{report.total}</filtered></result_count>"
+            f"<severity><full>{report.severity:.1f}</full><filtered>{report.severity:.1f}</filtered></severity>"
+            f"</report></report>"
+        )
+
+    def cmd_get_tasks(self, command, response: Response) -> None:
+        task_id = command.get("task_id")
+        if task_id and task_id not in self.state.tasks:
+            raise LookupError(f"Failed to find task '{task_id}'")
+        reports = self.state.visible_reports()
+        response.write('<get_tasks_response status="200" status_text="OK">')
+        for current_id, task in list(self.state.tasks.items()):
+            if task_id and current_id != task_id:
+                continue
+            finished = sorted((r for r in reports if r.task_id == current_id), key=lambda r: r.created)
+            running = any(r.task_id == current_id and r.visible_at > time.time() for r in self.state.reports.values())
+            last_report = f'<last_report><report id="{finished[-1].report_id}"/></last_report>' if finished else ""
+            response.write(
+                f'<task id="{current_id}"><owner><name>admin</name></owner><name>{escape(task["name"])}</name>'
+                f'<config id="{task["config_id"]}"/><target id="{task["target_id"] or ""}"/>'
+                f'<status>{"Running" if running else "Done"}</status><progress>{0 if running else -1}</progress>'
+                f"<report_count>{len(finished)}<finished>{len(finished)}</finished></report_count>"
+                f"{last_report}</task>"
+            )
+        response.write(f"<task_count>{len(self.state.tasks)}</task_count></get_tasks_response>")
+
+    def cmd_get_targets(self, command, response: Response) -> None:
+        response.write('<get_targets_response status="200" status_text="OK">')
+        for target_id, target in list(self.state.targets.items()):
+            port_list_id = target["port_list_id"]
+            response.write(
+                f'<target id="{target_id}"><owner><name>admin</name></owner><name>{escape(target["name"])}</name>'
+                f'<hosts>{escape(target["hosts"])}</hosts><exclude_hosts></exclude_hosts>'
+                f'<port_list id="{port_list_id}"><name>{escape(PORT_LISTS.get(port_list_id, ""))}</name></port_list>'
+                f'<ssh_credential id=""><name></name></ssh_credential><smb_credential id=""><name></name></smb_credential>'
+                f"</target>"
+            )
+        response.write(f"<target_count>{len(self.state.targets)}</target_count></get_targets_response>")
+
+    def cmd_get_port_lists(self, command, response: Response) -> None:
+        response.write('<get_port_lists_response status="200" status_text="OK">')
+        for port_list_id, name in PORT_LISTS.items():
+            response.write(f'<port_list id="{port_list_id}"><name>{escape(name)}</name><comment></comment></port_list>')
+        response.write("</get_port_lists_response>")
+
+    def cmd_get_configs(self, command, response: Response) -> None:
+        response.write('<get_configs_response status="200" status_text="OK">')
+        for config_id, name in SCAN_CONFIGS.items():
+            response.write(f'<config id="{config_id}"><name>{escape(name)}</name><comment></comment></config>')
+        response.write("</get_configs_response>")
+
+    def cmd_create_target(self, command, response: Response) -> None:
+        name = command.findtext("name")
+        hosts = command.findtext("hosts")
+        if not name or not hosts:
+            raise ValueError("CREATE_TARGET requires a name and hosts")
+        port_list = command.find("port_list")
+        if port_list is not None and port_list.get("id") not in PORT_LISTS:
+            raise LookupError(f"Failed to find port_list '{port_list.get('id')}'")
+        target_id = str(uuid.uuid4())
+        with self.state._lock:
+            if any(target["name"] == name for target in self.state.targets.values()):
+                raise ValueError("Target exists already")
+            self.state.targets[target_id] = {
+                "name": name,
+                "hosts": hosts,
+                "port_list_id": port_list.get("id") if port_list is not None else DEFAULT_PORT_LIST_ID
+            }
+        response.write(status_response("create_target", "201", "OK, resource created", f' id="{target_id}"'))
+
+    def cmd_delete_target(self, command, response: Response) -> None:
+        target_id = command.get("target_id")
+        with self.state._lock:
+            if target_id not in self.state.targets:
+                raise LookupError(f"Failed to find target '{target_id}'")
+            if any(task["target_id"] == target_id for task in self.state.tasks.values()):
+                raise ValueError("Target is in use")
+            del self.state.targets[target_id]
+        response.write(status_response("delete_target", "200", "OK"))
+
+    def cmd_create_task(self, command, response: Response) -> None:
+        name = command.findtext("name")
+        target = command.find("target")
+        config = command.find("config")
+        if not name or target is None:
+            raise ValueError("CREATE_TASK requires a name and a target")
+        if target.get("id") not in self.state.targets:
+            raise LookupError(f"Failed to find target '{target.get('id')}'")
+        if config is not None and config.get("id") not in SCAN_CONFIGS:
+            raise LookupError(f"Failed to find config '{config.get('id')}'")
+        task_id = str(uuid.uuid4())
+        with self.state._lock:
+            self.state.tasks[task_id] = {
+                "name": name,
+                "target_id": target.get("id"),
+                "config_id": config.get("id") if config is not None else DEFAULT_CONFIG_ID
+            }
+        response.write(status_response("create_task", "201", "OK, resource created", f' id="{task_id}"'))
+
+    def cmd_start_task(self, command, response: Response) -> None:
+        task_id = command.get("task_id")
+        if task_id not in self.state.tasks:
+            raise LookupError(f"Failed to find task '{task_id}'")
+        simulated = self.state.add_report(task_id, delay=self.args.scan_duration)
+        response.write(
+            f'<start_task_response status="202" status_text="OK, request submitted">'
+            f"<report_id>{simulated.report_id}</report_id></start_task_response>"
+        )
+
+##################################################################
+# The server                                                     #
+##################################################################
+
+class GvmdSimulator(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+    def __init__(self, args):
+        if os.path.exists(args.socket):
+            os.remove(args.socket)
+        self.args = args
+        self.state = SimulatorState(args)
+        super().__init__(args.socket, GmpHandler)
+        os.chmod(args.socket, 0o666)
+
+    def server_close(self) -> None:
+        super().server_close()
+        if os.path.exists(self.args.socket):
+            os.remove(self.args.socket)
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Simulated gvmd on a Unix socket for load tests.")
+    parser.add_argument("--socket", default="/tmp/gvmd-simulator.sock")
+    parser.add_argument("--username", default="admin")
+    parser.add_argument("--password", default="admin")
+    parser.add_argument("--tasks", type=int, default=5)
+    parser.add_argument("--reports", type=int, default=20)
+    parser.add_argument("--hosts", type=int, default=10)
+    parser.add_argument("--results-per-host", type=int, default=100)
+    parser.add_argument("--vary", action="store_true", help="Vary the host count per report by +/- 50%%")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--tag-length", type=int, default=DEFAULT_TAG_LENGTH)
+    parser.add_argument("--description-length", type=int, default=DEFAULT_DESCRIPTION_LENGTH)
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds before every response")
+    parser.add_argument("--jitter", type=float, default=0.2, help="Relative spread of --latency")
+    parser.add_argument("--latency-per-result", type=float, default=0.0, help="Seconds per streamed report result")
+    parser.add_argument("--scan-duration", type=float, default=5.0, help="Seconds until a started task's report is listed")
+    parser.add_argument("--session-timeout", type=float, default=0.0, help="Seconds after which a session must re-authenticate")
+    parser.add_argument("--log-level", default="INFO")
+    return parser
+
+def main(argv: list = None) -> None:
+    args = build_parser().parse_args(argv)
+    logging.basicConfig(level=args.log_level, format="%(asctime)s [%(levelname)s] %(name)s: %(message)s")
+    server = GvmdSimulator(args)
+    # SIGTERM stops the server the same way as Ctrl+C
+    signal.signal(signal.SIGTERM, lambda *_: threading.Thread(target=server.shutdown).start())
+    logger.info(
+        f"Simulating gvmd on {args.socket}: {args.tasks} tasks, {args.reports} reports of "
+        f"{args.hosts} x {args.results_per_host} results"
+    )
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        logger.info(f"Simulator stats: {server.state.stats}")
+
+if __name__ == "__main__":
+    main()
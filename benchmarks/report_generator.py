@@ -0,0 +1,237 @@
+# benchmarks/report_generator.py
+
+##################################################################
+# Importing packages                                             #
+##################################################################
+
+import os
+import sys
+import uuid
+import random
+import argparse
+from xml.sax.saxutils import escape
+
+##################################################################
+# Synthetic Greenbone detailed reports                           #
+##################################################################
+
+# Words the NVT texts are made of
+WORDS = (
+    "remote host vulnerable version service affected attacker execute arbitrary code "
+    "denial of service information disclosure authentication bypass update vendor "
+    "installed package kernel ssl tls certificate cipher weak protocol http server "
+    "request response header injection cross site scripting sql overflow buffer "
+    "privilege escalation configuration default credentials openssh apache nginx "
+    "microsoft windows linux debian ubuntu security advisory patch release fixed"
+).split()
+
+FAMILIES = (
+    "Debian Local Security Checks", "Ubuntu Local Security Checks", "Web application abuses",
+    "General", "SSL and TLS", "Windows : Microsoft Bulletins", "Denial of Service",
+    "Product detection", "Service detection", "Default Accounts", "Web Servers"
+)
+
+THREATS = ((0.0, "Log"), (0.1, "Low"), (4.0, "Medium"), (7.0, "High"))
+
+PORTS = ("general/tcp", "22/tcp", "80/tcp", "443/tcp", "3306/tcp", "5432/tcp", "8080/tcp", "general/icmp")
+
+SOLUTION_TYPES = ("VendorFix", "Mitigation", "WillNotFix", "Workaround", "NoneAvailable")
+
+# Average text lengths of real NVTs (in characters), varied by +/- 50% per NVT
+DEFAULT_TAG_LENGTH = 900
+DEFAULT_DESCRIPTION_LENGTH = 600
+
+# Distinct NVTs a report draws its results from
+DEFAULT_NVT_COUNT = 400
+
+# Text of roughly `length` characters
+def _text(rng: random.Random, length: int) -> str:
+    words = []
+    size = 0
+    while size < length:
+        word = rng.choice(WORDS)
+        words.append(word)
+        size += len(word) + 1
+    return " ".join(words).capitalize() + "."
+
+# Fixed timestamp for result n, spread over the hours before the scan end
+def _timestamp(n: int) -> str:
+    return f"2025-01-{1 + n // 86400 % 28:02d}T{n // 3600 % 24:02d}:{n // 60 % 60:02d}:{n % 60:02d}Z"
+
+class SyntheticReport:
+    """
+    Deterministic GMP detailed report of `hosts` x `results_per_host` results.
+    Results draw from a pool of NVTs with tags, solutions and descriptions of
+    realistic length, so the same arguments always give the same bytes and any
+    slice of results (for pagination) can be generated on its own.
+    """
+    def __init__(
+        self,
+        report_id: str = None,
+        task_id: str = None,
+        hosts: int = 10,
+        results_per_host: int = 100,
+        seed: int = 0,
+        tag_length: int = DEFAULT_TAG_LENGTH,
+        description_length: int = DEFAULT_DESCRIPTION_LENGTH,
+        nvt_count: int = DEFAULT_NVT_COUNT
+    ):
+        self.seed = seed
+        self.report_id = report_id or str(uuid.UUID(int=random.Random(f"report:{seed}").getrandbits(128)))
+        self.task_id = task_id or str(uuid.UUID(int=random.Random(f"task:{seed}").getrandbits(128)))
+        self.hosts = hosts
+        self.results_per_host = results_per_host
+        self.total = hosts * results_per_host
+        self._tag_length = tag_length
+        self._description_length = description_length
+        self._nvts = [self._nvt(n) for n in range(max(1, nvt_count))]
+        # Highest severity any result can have, reported as the report severity
+        self.severity = max(score for _, score, _ in self._nvts)
+
+    # Name, severity and <nvt> element of NVT number n
+    def _nvt(self, n: int) -> tuple:
+        rng = random.Random(f"nvt:{self.seed}:{n}")
+        score = round(rng.choice((0.0, rng.uniform(0.1, 10.0))), 1)
+        vector = f"CVSS:3.1/AV:N/AC:{rng.choice('LH')}/PR:N/UI:N/S:U/C:{rng.choice('NLH')}/I:{rng.choice('NLH')}/A:{rng.choice('NLH')}"
+        tag_length = int(self._tag_length * rng.uniform(0.5, 1.5))
+        solution_type = rng.choice(SOLUTION_TYPES)
+        tags = "|".join((
+            f"cvss_base_vector={vector}",
+            f"summary={_text(rng, tag_length // 4)}",
+            f"insight={_text(rng, tag_length // 4)}",
+            f"affected={_text(rng, tag_length // 8)}",
+            f"impact={_text(rng, tag_length // 8)}",
+            f"vuldetect={_text(rng, tag_length // 8)}",
+            f"solution_type={solution_type}"
+        ))
+        cves = "".join(
+            f'<ref type="cve" id="CVE-20{rng.randint(10, 24)}-{rng.randint(1000, 49999)}"/>'
+            for _ in range(rng.randint(0, 4))
+        )
+        score_text = f"{score:.1f}"
+        name = escape(_text(rng, rng.randint(30, 90)))
+        return name, score, (
+            f'<nvt oid="1.3.6.1.4.1.25623.1.0.{100000 + n}">'
+            f"<type>nvt</type>"
+            f"<name>{name}</name>"
+            f"<family>{escape(rng.choice(FAMILIES))}</family>"
+            f"<cvss_base>{score_text}</cvss_base>"
+            f'<severities score="{score_text}"><severity type="cvss_base_v3">'
+            f"<origin/><date>2024-0{rng.randint(1, 9)}-1{rng.randint(0, 9)}T00:00:00Z</date>"
+            f"<score>{score_text}</score><value>{vector}</value></severity></severities>"
+            f"<tags>{escape(tags)}</tags>"
+            f'<solution type="{solution_type}">{escape(_text(rng, tag_length // 6))}</solution>'
+            f"<refs>{cves}</refs>"
+            f"</nvt>"
+        )
+
+    def result_xml(self, index: int) -> str:
+        """
+        The <result> element of result number `index` (0-based).
+        """
+        rng = random.Random(f"result:{self.seed}:{index}")
+        host = index // self.results_per_host
+        name, severity, nvt = self._nvts[rng.randrange(len(self._nvts))]
+        threat = [name for bound, name in THREATS if severity >= bound][-1]
+        ip = f"10.{host // 65536 % 256}.{host // 256 % 256}.{host % 256}"
+        description_length = int(self._description_length * rng.uniform(0.5, 1.5)) if rng.random() < 0.8 else 0
+        stamp = _timestamp(index)
+        result_id = uuid.UUID(int=rng.getrandbits(128))
+        return (
+            f'<result id="{result_id}">'
+            f"<name>{name}</name>"
+            f"<owner><name>admin</name></owner>"
+            f"<modification_time>{stamp}</modification_time>"
+            f"<comment></comment>"
+            f"<creation_time>{stamp}</creation_time>"
+            f'<host>{ip}<asset asset_id="{uuid.UUID(int=random.Random(f"asset:{self.seed}:{host}").getrandbits(128))}"/>'
+            f"<hostname>host-{host:05d}.example.internal</hostname>\n{ip}</host>"
+            f"<port>{rng.choice(PORTS)}</port>"
+            f"{nvt}"
+            f"<scan_nvt_version>2024-0{rng.randint(1, 9)}-01T00:00:00Z</scan_nvt_version>"
+            f"<threat>{threat}</threat>"
+            f"<severity>{severity:.1f}</severity>"
+            f"<qod><value>{rng.choice((30, 70, 75, 80, 97, 98))}</value><type>remote_banner</type></qod>"
+            f"<description>{escape(_text(rng, description_length)) if description_length else ''}</description>"
+            f"<original_threat>{threat}</original_threat>"
+            f"<original_severity>{severity:.1f}</original_severity>"
+            f"<compliance>undefined</compliance>"
+            f"</result>\n"
+        )
+
+    def write(self, fileobj, first: int = 1, rows: int = -1) -> int:
+        """
+        Writes the <get_reports_response> for results first..first+rows-1
+        (1-based, rows=-1 for all) to a binary file object, laid out like
+        gvmd's: <result_count> follows the <results>.
+        Returns the number of bytes written.
+        """
+        start = max(0, first - 1)
+        end = self.total if rows < 0 else min(self.total, start + rows)
+        written = 0
+        def out(text: str) -> None:
+            nonlocal written
+            data = text.encode("utf-8")
+            fileobj.write(data)
+            written += len(data)
+
+        out(
+            f'<get_reports_response status="200" status_text="OK">'
+            f'<report id="{self.report_id}" format_id="a994b278-1f62-11e1-96ac-406186ea4fc5" extension="xml" content_type="text/xml">'
+            f"<owner><name>admin</name></owner><name>{_timestamp(0)}</name>"
+            f"<creation_time>{_timestamp(0)}</creation_time><modification_time>{_timestamp(self.total)}</modification_time>"
+            f'<task id="{self.task_id}"><name>Benchmark task {self.seed}</name></task>'
+            f'<report id="{self.report_id}">'
+            f"<gmp><version>22.4</version></gmp>"
+            f'<filters id=""><term>first={first} rows={rows} apply_overrides=0 min_qod=70 sort-reverse=severity</term></filters>'
+            f"<scan_run_status>Done</scan_run_status>"
+            f"<hosts><count>{self.hosts}</count></hosts>"
+            f"<vulns><count>{len(self._nvts)}</count></vulns>"
+            f'<task id="{self.task_id}"><name>Benchmark task {self.seed}</name></task>'
+            f"<scan_start>{_timestamp(0)}</scan_start>"
+            f'<results start="{start + 1}" max="{rows}">\n'
+        )
+        for index in range(start, end):
+            out(self.result_xml(index))
+        out(
+            f"</results>"
+            f"<result_count>{self.total}<full>{self.total}</full><filtered>{self.total}</filtered></result_count>"
+            f"<scan_end>{_timestamp(self.total)}</scan_end>"
+            f"</report></report></get_reports_response>"
+        )
+        return written
+
+    def save(self, path: str) -> int:
+        with open(path, "wb") as f:
+            return self.write(f)
+
+##################################################################
+# Command line                                                   #
+##################################################################
+
+def main(argv: list = None) -> None:
+    parser = argparse.ArgumentParser(description="Writes a synthetic Greenbone detailed report XML file.")
+    parser.add_argument("output", help="File to write, '-' for stdout")
+    parser.add_argument("--hosts", type=int, default=10)
+    parser.add_argument("--results-per-host", type=int, default=100)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--tag-length", type=int, default=DEFAULT_TAG_LENGTH)
+    parser.add_argument("--description-length", type=int, default=DEFAULT_DESCRIPTION_LENGTH)
+    args = parser.parse_args(argv)
+
+    report = SyntheticReport(
+        hosts=args.hosts,
+        results_per_host=args.results_per_host,
+        seed=args.seed,
+        tag_length=args.tag_length,
+        description_length=args.description_length
+    )
+    if args.output == "-":
+        size = report.write(sys.stdout.buffer)
+    else:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        size = report.save(args.output)
+    print(f"Wrote report {report.report_id} with {report.total} results ({size} bytes)", file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,360 @@
+# benchmarks/run_benchmarks.py
+
+"""
+Benchmarks the report pipeline on synthetic Greenbone reports.
+
+    python -m benchmarks.run_benchmarks --hosts 50 --results-per-host 200 --reports 4
+    python -m benchmarks.run_benchmarks --compare benchmarks/results/<earlier run>.json
+
+Stages, each in a fresh process so its peak RSS is its own:
+  parse          parse_large_xml() over one report, records discarded
+  parse_to_json  parse_xml_to_json(), which keeps every record in a list
+  write_*        parse_large_xml() streamed into write_records() for each
+                 parsed file format/compression
+  process        process_xml_reports() over all reports (parse, write, archive)
+  ingest         ingest_parsed_reports() into a local Elasticsearch stand-in
+  ingest_rescan  the same records again as a rescan would deliver them, so
+                 only last_seen is touched
+
+Results are written to benchmarks/results/<label>.json; --compare prints the
+change against an earlier results file and flags regressions.
+"""
+
+##################################################################
+# Importing packages                                             #
+##################################################################
+
+import os
+import sys
+import json
+import time
+import shutil
+import logging
+import argparse
+import platform
+import resource
+import tempfile
+import datetime
+import subprocess
+import multiprocessing
+
+from benchmarks.report_generator import SyntheticReport, DEFAULT_TAG_LENGTH, DEFAULT_DESCRIPTION_LENGTH
+from benchmarks.es_standin import EsStandIn
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+
+# Parsed file variants timed by the write stages
+WRITE_VARIANTS = (("ndjson", "none"), ("ndjson", "gzip"), ("ndjson", "zstd"), ("json", "none"))
+
+# Metrics compared between runs and whether higher values are better
+COMPARED_METRICS = {
+    "seconds": False,
+    "records_per_second": True,
+    "mb_per_second": True,
+    "peak_rss_mb": False
+}
+
+##################################################################
+# Stages (run in a child process)                                #
+##################################################################
+
+# Peak resident set size of this process and of its finished children, in MB
+def _peak_rss() -> tuple:
+    # ru_maxrss is in kilobytes on Linux and in bytes on macOS
+    scale = 1024 * 1024 if sys.platform == "darwin" else 1024
+    own = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / scale
+    children = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / scale
+    return round(own, 1), round(children, 1)
+
+def stage_parse(xml_path: str) -> dict:
+    from app.api.modules.greenbone.utils.xml_parser import parse_large_xml
+    started = time.perf_counter()
+    records = sum(1 for _ in parse_large_xml(xml_path))
+    return {"seconds": time.perf_counter() - started, "records": records}
+
+def stage_parse_to_json(xml_path: str) -> dict:
+    from app.api.modules.greenbone.utils.gvm_parser import parse_xml_to_json
+    started = time.perf_counter()
+    records = len(parse_xml_to_json(xml_path)["vulnerabilities"])
+    return {"seconds": time.perf_counter() - started, "records": records}
+
+def stage_write(xml_path: str, out_dir: str, fmt: str, compression: str) -> dict:
+    from app.api.modules.greenbone.utils.xml_parser import parse_large_xml
+    from app.api.modules.greenbone.utils.parsed_files import open_parsed, parsed_extension, write_records
+    out_path = os.path.join(out_dir, f"bench_{fmt}_{compression}{parsed_extension(fmt, compression)}")
+    started = time.perf_counter()
+    with open_parsed(out_path, "w") as outfile:
+        _, records = write_records(parse_large_xml(xml_path), outfile, fmt)
+    seconds = time.perf_counter() - started
+    output_bytes = os.path.getsize(out_path)
+    os.remove(out_path)
+    return {"seconds": seconds, "records": records, "output_bytes": output_bytes}
+
+def stage_process() -> dict:
+    from app.api.modules.greenbone.utils.report_worker import process_xml_reports
+    started = time.perf_counter()
+    results = process_xml_reports()
+    return {"seconds": time.perf_counter() - started, "files": len(results), "failed": list(results.values()).count(False)}
+
+def stage_ingest(rescan: bool) -> dict:
+    from app.api.modules.greenbone.utils.es_ingest import ingest_parsed_reports
+    from app.api.modules.greenbone.utils.state_store import state_store
+    parsed_files = state_store.pending_ingest()
+    if rescan:
+        # A rescan delivers the same findings in new parsed files
+        parsed_files = []
+        for path in _parsed_paths():
+            copy = os.path.join(os.path.dirname(path), "rescan_" + os.path.basename(path))
+            shutil.copyfile(path, copy)
+            parsed_files.append(copy)
+    started = time.perf_counter()
+    results = ingest_parsed_reports(parsed_files)
+    return {"seconds": time.perf_counter() - started, "files": len(results), "failed": list(results.values()).count(False)}
+
+# Parsed files written by the process stage
+def _parsed_paths() -> list:
+    from app.api.core.config import PARSED_DIR
+    from app.api.modules.greenbone.utils.parsed_files import is_parsed_file
+    return sorted(
+        os.path.join(PARSED_DIR, name) for name in os.listdir(PARSED_DIR)
+        if is_parsed_file(name) and not name.startswith((".", "rescan_"))
+    )
+
+STAGES = {
+    "parse": stage_parse,
+    "parse_to_json": stage_parse_to_json,
+    "write": stage_write,
+    "process": stage_process,
+    "ingest": stage_ingest
+}
+
+# Entry point of the child process
+def _child(conn, stage: str, env: dict, log_level: str, args: tuple) -> None:
+    os.environ.update(env)
+    logging.basicConfig(level=log_level, format="%(asctime)s [%(levelname)s] %(name)s: %(message)s")
+    try:
+        result = STAGES[stage](*args)
+        result["peak_rss_mb"], result["children_peak_rss_mb"] = _peak_rss()
+        conn.send(("ok", result))
+    except BaseException as e:
+        conn.send(("error", f"{type(e).__name__}: {e}"))
+    finally:
+        conn.close()
+
+# Runs a stage in a fresh (spawned) process and returns its measurements
+def run_isolated(stage: str, env: dict, log_level: str, *args) -> dict:
+    context = multiprocessing.get_context("spawn")
+    parent_conn, child_conn = context.Pipe(duplex=False)
+    process = context.Process(target=_child, args=(child_conn, stage, env, log_level, args), name=f"bench-{stage}")
+    process.start()
+    child_conn.close()
+    try:
+        status, result = parent_conn.recv()
+    except EOFError:
+        status, result = "error", f"process exited with code {process.exitcode}"
+    process.join()
+    if status != "ok":
+        raise RuntimeError(f"Benchmark stage '{stage}' failed: {result}")
+    return result
+
+##################################################################
+# The benchmark run                                              #
+##################################################################
+
+# Adds throughput figures to a stage result
+def _throughput(result: dict, input_bytes: int) -> dict:
+    seconds = result["seconds"] or 1e-9
+    if "records" in result:
+        result["records_per_second"] = round(result["records"] / seconds, 1)
+    result["mb_per_second"] = round(input_bytes / 1024 / 1024 / seconds, 2)
+    result["seconds"] = round(result["seconds"], 3)
+    return result
+
+# Short label for the results file: git revision (if any) and time
+def _default_label() -> str:
+    try:
+        revision = subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], stderr=subprocess.DEVNULL, cwd=os.path.dirname(RESULTS_DIR)
+        ).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        revision = "local"
+    return f"{revision}-{datetime.datetime.utcnow().strftime('%Y%m%dT%H%M%SZ')}"
+
+def run(args) -> dict:
+    workspace = tempfile.mkdtemp(prefix="goldoak-bench-", dir=args.workdir)
+    standin = EsStandIn(latency=args.es_latency).start()
+    try:
+        reports_dir = os.path.join(workspace, "reports")
+        detailed_dir = os.path.join(workspace, "detailed_reports")
+        source_dir = os.path.join(workspace, "source")
+        for directory in (reports_dir, detailed_dir, source_dir):
+            os.makedirs(directory)
+        env = {
+            "ES_HOST": standin.url,
+            "ES_USERNAME": "benchmark",
+            "ES_PASSWORD": "benchmark",
+            "REPORTS_DIR": reports_dir,
+            "DETAILED_REPORTS_DIR": detailed_dir,
+            "ARCHIVE_DIR": os.path.join(detailed_dir, "archive"),
+            "STATE_DB_PATH": os.path.join(reports_dir, "pipeline_state.db"),
+            "PARSE_WORKERS": str(args.parse_workers),
+            "ES_BULK_THREADS": str(args.bulk_threads)
+        }
+        stages = {}
+
+        # Generate the reports once; the first one is used by the single-file stages
+        started = time.perf_counter()
+        sources = []
+        for number in range(args.reports):
+            report = SyntheticReport(
+                hosts=args.hosts,
+                results_per_host=args.results_per_host,
+                seed=args.seed + number,
+                tag_length=args.tag_length,
+                description_length=args.description_length
+            )
+            path = os.path.join(source_dir, f"detailed_report_{report.report_id}_20250101T000000Z.xml")
+            report.save(path)
+            sources.append(path)
+        total_bytes = sum(os.path.getsize(path) for path in sources)
+        first_bytes = os.path.getsize(sources[0])
+        stages["generate"] = _throughput(
+            {"seconds": time.perf_counter() - started, "records": report.total * args.reports, "input_bytes": total_bytes},
+            total_bytes
+        )
+        print(f"Generated {args.reports} reports of {report.total} results ({total_bytes / 1024 / 1024:.1f} MB)", file=sys.stderr)
+
+        def measure(name: str, stage: str, input_bytes: int, *stage_args, stage_env: dict = None, records: int = None, repeat: int = 1) -> None:
+            # Repeated stages keep their fastest run
+            before = standin.stats()
+            result = min(
+                (run_isolated(stage, dict(env, **(stage_env or {})), args.log_level, *stage_args) for _ in range(max(1, repeat))),
+                key=lambda run: run["seconds"]
+            )
+            after = standin.stats()
+            if after["bulk_requests"] > before["bulk_requests"]:
+                # Ingest stages count the documents (indexed or touched) that reached the stand-in
+                result["bulk_requests"] = after["bulk_requests"] - before["bulk_requests"]
+                result["records"] = after["documents"] - before["documents"]
+            if records is not None:
+                result["records"] = records
+            stages[name] = _throughput(result, input_bytes)
+            print(f"{name:<22} {stages[name]['seconds']:>9.3f}s  {stages[name].get('records_per_second', 0):>10.0f} rec/s  "
+                  f"{stages[name]['peak_rss_mb']:>7.1f} MB peak", file=sys.stderr)
+
+        measure("parse", "parse", first_bytes, sources[0], repeat=args.repeat)
+        measure("parse_to_json", "parse_to_json", first_bytes, sources[0], repeat=args.repeat)
+        for fmt, compression in WRITE_VARIANTS:
+            try:
+                measure(f"write_{fmt}_{compression}", "write", first_bytes, sources[0], workspace, fmt, compression, repeat=args.repeat)
+            except RuntimeError as e:
+                # e.g. zstandard is not installed
+                print(f"Skipping write_{fmt}_{compression}: {e}", file=sys.stderr)
+
+        # The full parse stage over every report, in the configured parsed file format
+        for path in sources:
+            shutil.copy(path, detailed_dir)
+        pipeline_env = {"PARSED_FORMAT": args.parsed_format, "PARSED_COMPRESSION": args.parsed_compression}
+        measure("process", "process", total_bytes, stage_env=pipeline_env, records=report.total * args.reports)
+        measure("ingest", "ingest", total_bytes, False, stage_env=pipeline_env)
+        measure("ingest_rescan", "ingest", total_bytes, True, stage_env=pipeline_env)
+
+        return {
+            "label": args.label or _default_label(),
+            "created": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "parameters": {
+                "hosts": args.hosts,
+                "results_per_host": args.results_per_host,
+                "reports": args.reports,
+                "seed": args.seed,
+                "repeat": args.repeat,
+                "tag_length": args.tag_length,
+                "description_length": args.description_length,
+                "parse_workers": args.parse_workers,
+                "bulk_threads": args.bulk_threads,
+                "parsed_format": args.parsed_format,
+                "parsed_compression": args.parsed_compression,
+                "es_latency": args.es_latency
+            },
+            "stages": stages
+        }
+    finally:
+        standin.stop()
+        if not args.keep:
+            shutil.rmtree(workspace, ignore_errors=True)
+
+##################################################################
+# Comparing runs                                                 #
+##################################################################
+
+def compare(baseline: dict, current: dict, threshold: float) -> list:
+    """
+    Prints every compared metric of the stages both runs have and returns the
+    (stage, metric, change) entries that got worse by more than `threshold` percent.
+    """
+    if baseline.get("parameters") != current.get("parameters"):
+        print("Warning: the runs used different parameters, the comparison is only indicative.", file=sys.stderr)
+    regressions = []
+    print(f"{'stage':<22} {'metric':<20} {baseline['label']:>24} {current['label']:>24} {'change':>9}")
+    for stage, result in current["stages"].items():
+        old = baseline["stages"].get(stage)
+        if old is None:
+            continue
+        for metric, higher_is_better in COMPARED_METRICS.items():
+            if metric not in result or not old.get(metric):
+                continue
+            change = (result[metric] - old[metric]) / old[metric] * 100
+            worse = -change if higher_is_better else change
+            flag = "  REGRESSION" if worse > threshold else ""
+            if flag:
+                regressions.append((stage, metric, round(change, 1)))
+            print(f"{stage:<22} {metric:<20} {old[metric]:>24} {result[metric]:>24} {change:>+8.1f}%{flag}")
+    return regressions
+
+##################################################################
+# Command line                                                   #
+##################################################################
+
+def main(argv: list = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmarks parsing, parsed file writing and ingest on synthetic reports.")
+    parser.add_argument("--hosts", type=int, default=20)
+    parser.add_argument("--results-per-host", type=int, default=250)
+    parser.add_argument("--reports", type=int, default=2, help="Distinct reports for the process and ingest stages")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=1, help="Runs of the single-file stages; the fastest counts")
+    parser.add_argument("--tag-length", type=int, default=DEFAULT_TAG_LENGTH)
+    parser.add_argument("--description-length", type=int, default=DEFAULT_DESCRIPTION_LENGTH)
+    parser.add_argument("--parse-workers", type=int, default=1)
+    parser.add_argument("--bulk-threads", type=int, default=1)
+    parser.add_argument("--parsed-format", default="ndjson")
+    parser.add_argument("--parsed-compression", default="none")
+    parser.add_argument("--es-latency", type=float, default=0.0, help="Seconds added to every bulk request")
+    parser.add_argument("--label", help="Name of the results file (default: git revision and time)")
+    parser.add_argument("--output-dir", default=RESULTS_DIR)
+    parser.add_argument("--workdir", help="Directory for the temporary workspace")
+    parser.add_argument("--keep", action="store_true", help="Keep the workspace")
+    parser.add_argument("--log-level", default="WARNING")
+    parser.add_argument("--compare", help="Earlier results file to compare with")
+    parser.add_argument("--threshold", type=float, default=10.0, help="Percent change counted as a regression")
+    parser.add_argument("--fail-on-regression", action="store_true")
+    args = parser.parse_args(argv)
+
+    results = run(args)
+    os.makedirs(args.output_dir, exist_ok=True)
+    output = os.path.join(args.output_dir, f"{results['label']}.json")
+    with open(output, "w") as f:
+        json.dump(results, f, indent=2)
+    print(f"Results written to {output}", file=sys.stderr)
+
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(json.load(f), results, args.threshold)
+        if regressions and args.fail_on_regression:
+            return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())